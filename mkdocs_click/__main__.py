@@ -0,0 +1,7 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from mkdocs_click._cli import cli
+
+if __name__ == "__main__":
+    cli(prog_name="mkdocs-click")
@@ -0,0 +1,89 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from markdown.extensions.toc import slugify
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+class AnchorRegistry:
+    """
+    Hand out unique heading anchors for all the commands documented on a page.
+
+    When two blocks document overlapping command trees, the second heading for a given command path
+    gets a `_1` suffix, the third a `_2` suffix, and so on, the same way the `toc` extension does.
+    """
+
+    def __init__(self) -> None:
+        self._used: set[str] = set()
+        self._counters: dict[str, int] = {}
+        self.claims: list[tuple[str, str]] = []
+
+    def scope(self) -> AnchorScope:
+        """Return the anchors of a new block."""
+        return AnchorScope(self)
+
+    def claim(self, slug: str) -> str:
+        anchor = _next_anchor(slug, self._used, self._counters)
+        self.claims.append((slug, anchor))
+        return anchor
+
+    def claim_all(self, claims: Sequence[tuple[str, str]]) -> bool:
+        """
+        Replay claims recorded on another page, if every slug would get the same anchor again.
+
+        Nothing is claimed otherwise.
+        """
+        used = set(self._used)
+        counters = dict(self._counters)
+        for slug, anchor in claims:
+            if _next_anchor(slug, used, counters) != anchor:
+                return False
+
+        self._used = used
+        self._counters = counters
+        self.claims.extend(claims)
+        return True
+
+
+class AnchorScope:
+    """
+    The anchors of the commands documented by a single block.
+
+    Within a block, a command path always maps to the same anchor, so that links to a command can be
+    created before its heading. Every lookup is recorded in `lookups`, in order.
+    """
+
+    def __init__(self, registry: AnchorRegistry) -> None:
+        self._registry = registry
+        self._anchors: dict[str, str] = {}
+        self.lookups: list[tuple[str, str]] = []
+
+    def anchor(self, command_path: str) -> str:
+        anchor = self._anchors.get(command_path)
+        if anchor is None:
+            anchor = self._anchors[command_path] = self._registry.claim(_slugify(command_path))
+
+        self.lookups.append((command_path, anchor))
+        return anchor
+
+
+def _next_anchor(slug: str, used: set[str], counters: dict[str, int]) -> str:
+    anchor = slug
+    while anchor in used:
+        counters[slug] = counters.get(slug, 0) + 1
+        anchor = f"{slug}_{counters[slug]}"
+
+    used.add(anchor)
+    return anchor
+
+
+@lru_cache(maxsize=65536)
+def _slugify(command_path: str) -> str:
+    return slugify(command_path, "-")  # 'git commit' -> 'git-commit'
@@ -0,0 +1,87 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from contextlib import suppress
+from typing import Generic, TypeVar
+from weakref import WeakKeyDictionary
+
+T = TypeVar("T")
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    A mapping that holds at most `maxsize` entries, evicting the least recently used ones first.
+
+    It is safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+
+            return self._data[key]
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class WeakKeyCache(Generic[T, K, V]):
+    """
+    A mapping from `(owner, key)` pairs to values, whose entries are dropped along with their owner.
+
+    Entries for owners that cannot be weakly referenced or hashed are not stored. It is safe to share
+    between threads.
+    """
+
+    def __init__(self) -> None:
+        self._data: WeakKeyDictionary[T, dict[K, V]] = WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, owner: T, key: K) -> V | None:
+        with self._lock:
+            try:
+                return self._data[owner].get(key)
+            except (KeyError, TypeError):
+                return None
+
+    def set(self, owner: T, key: K, value: V) -> None:
+        with self._lock, suppress(TypeError):
+            self._data.setdefault(owner, {})[key] = value
+
+    def discard(self, owner: T, key: K) -> None:
+        with self._lock, suppress(KeyError, TypeError):
+            del self._data[owner][key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._data.values())
@@ -0,0 +1,301 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import IO, TYPE_CHECKING, Any
+
+import click
+
+from ._daemon import DaemonServer, get_socket_path
+from ._exceptions import MkDocsClickException
+from ._extension import replace_command_docs
+from ._loader import load_command
+from ._manifest import load_manifest, parse_shard, parse_target
+from ._snapshots import make_snapshot
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+
+@click.group()
+def cli() -> None:
+    """Generate Markdown documentation for Click command line applications."""
+
+
+@cli.command()
+@click.argument("target", required=False)
+@click.option("--prog-name", help="The name to display for the command.")
+@click.option("--depth", type=int, default=0, help="Offset to add when generating headers.")
+@click.option(
+    "--style",
+    type=click.Choice(["plain", "table"]),
+    default="plain",
+    help="Style for the options section.",
+)
+@click.option("--remove-ascii-art", is_flag=True, help="Remove ASCII art from docstrings.")
+@click.option("--show-hidden", is_flag=True, help="Show hidden commands and options.")
+@click.option("--list-subcommands", is_flag=True, help="List subcommands of each command.")
+@click.option(
+    "--dedupe-options",
+    is_flag=True,
+    help="Do not repeat options inherited from parent commands, in the table style.",
+)
+@click.option(
+    "--dedupe-commands",
+    is_flag=True,
+    help="Document commands registered at several places only once.",
+)
+@click.option(
+    "--static",
+    is_flag=True,
+    help="Read commands from source instead of importing them, if possible.",
+)
+@click.option(
+    "--evaluate-defaults",
+    type=float,
+    metavar="SECONDS",
+    help="Document callable defaults by their value, giving each callable that many seconds.",
+)
+@click.option(
+    "--templates",
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory of templates for the sections of commands.",
+)
+@click.option(
+    "--attr-list",
+    "has_attr_list",
+    is_flag=True,
+    help="Show full command paths in headers, as when the `attr_list` extension is enabled.",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default="-",
+    help="File to write to, defaults to stdout.",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Render every CLI listed in a TOML, YAML or JSON manifest instead of TARGET.",
+)
+@click.option("-j", "--jobs", type=int, help="Number of processes to render a manifest with.")
+@click.option(
+    "--shard",
+    metavar="K/N",
+    help="Only render the K-th of N parts of the document, to be assembled with `merge`.",
+)
+@click.option(
+    "--shard-timings",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Balance shards by the render times recorded with --record-timings.",
+)
+@click.option(
+    "--record-timings",
+    type=click.Path(dir_okay=False),
+    help="Write the render time of each command to a JSON file.",
+)
+def render(
+    target: str | None,
+    output: str,
+    manifest: str | None,
+    jobs: int | None,
+    has_attr_list: bool,
+    record_timings: str | None,
+    **options: Any,
+) -> None:
+    """
+    Render the documentation of the command at TARGET, in the form '<module>:<command>'.
+    """
+    if (target is None) == (manifest is None):
+        raise click.UsageError("Exactly one of TARGET or --manifest must be given.")
+
+    try:
+        if manifest is not None:
+            _render_manifest(load_manifest(manifest), jobs=jobs)
+            return
+
+        module, command = parse_target(target)  # type: ignore[arg-type]
+        options = {key: value for key, value in options.items() if value is not None}
+        timings: dict[str, float] = {}
+        if record_timings is not None:
+            options["record_timings"] = timings
+
+        _render_to_file(
+            {"module": module, "command": command, "output": output, **options},
+            has_attr_list=has_attr_list,
+        )
+    except MkDocsClickException as e:
+        raise click.ClickException(str(e)) from None
+
+    if record_timings is not None:
+        with click.open_file(record_timings, "w", encoding="utf-8") as f:
+            json.dump(timings, f, indent=2, sort_keys=True)
+
+
+@cli.command()
+@click.argument("shards", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default="-",
+    help="File to write to, defaults to stdout.",
+)
+def merge(shards: tuple[str, ...], output: str) -> None:
+    """
+    Assemble the SHARDS written by `render --shard` into the document a single render gives.
+    """
+    texts = []
+    for path in shards:
+        with click.open_file(path, encoding="utf-8") as f:
+            texts.append(f.read())
+
+    try:
+        document = _merge_shards(texts)
+    except MkDocsClickException as e:
+        raise click.ClickException(str(e)) from None
+
+    with click.open_file(output, "w", encoding="utf-8") as f:
+        f.write(document)
+
+
+@cli.command()
+@click.argument("target")
+@click.option("--prog-name", help="The name to display for the command.")
+@click.option(
+    "--static",
+    is_flag=True,
+    help="Read commands from source instead of importing them, if possible.",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    default="-",
+    help="File to write to, defaults to stdout.",
+)
+def snapshot(target: str, prog_name: str | None, static: bool, output: str) -> None:
+    """
+    Write a snapshot of the command at TARGET, in the form '<module>:<command>'.
+
+    Snapshots of each version, named '<version>.json', can be documented without installing these
+    versions, with the `snapshots` and `version` options of blocks.
+    """
+    try:
+        module, command = parse_target(target)
+        command_obj = load_command(module, command, static=static)
+    except MkDocsClickException as e:
+        raise click.ClickException(str(e)) from None
+
+    data = make_snapshot(prog_name or command_obj.name or command, command_obj)
+    with click.open_file(output, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+@cli.command()
+@click.option(
+    "--socket",
+    "path",
+    type=click.Path(dir_okay=False),
+    help="Socket to listen on, defaults to the one the extension uses from the current directory.",
+)
+@click.option(
+    "--idle-timeout",
+    type=float,
+    default=1800,
+    show_default=True,
+    help="Seconds without requests after which to exit.",
+)
+def daemon(path: str | None, idle_timeout: float) -> None:
+    """
+    Render blocks for the extension, keeping commands imported between builds.
+
+    The extension starts the daemon on demand when its `daemon` option is enabled.
+    """
+    try:
+        server = DaemonServer(path or get_socket_path(), idle_timeout=idle_timeout)
+    except MkDocsClickException as e:
+        raise click.ClickException(str(e)) from None
+
+    server.run()
+    if server.restart:
+        # Modules that cannot be unloaded changed: start afresh, with the same options.
+        os.execv(sys.executable, [sys.executable, "-m", "mkdocs_click", *sys.argv[1:]])
+
+
+def _render_manifest(entries: list[dict[str, Any]], jobs: int | None) -> None:
+    for entry in entries:
+        if "output" not in entry:
+            raise MkDocsClickException(
+                f"Manifest entry for {entry.get('module')}:{entry.get('command')} has no `output`"
+            )
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for path in executor.map(_render_to_file, entries):
+            click.echo(f"Rendered {path}", err=True)
+
+
+def _render_to_file(entry: dict[str, Any], has_attr_list: bool = False) -> str:
+    options = dict(entry)
+    output = options.pop("output")
+    has_attr_list = options.pop("attr_list", has_attr_list)
+
+    # Lines are written as they are generated, so the whole document is never held in memory.
+    lines = replace_command_docs(has_attr_list=has_attr_list, cache=None, **options)
+    if "shard" in options:
+        lines = chain([_SHARD_MARKER.format(*parse_shard(options["shard"]))], lines)
+
+    with click.open_file(output, "w", encoding="utf-8") as f:
+        _write_lines(f, lines)
+
+    return output
+
+
+# The first line of shards, so that they can be merged in order and checked for completeness.
+_SHARD_MARKER = "<!-- mkdocs-click shard {}/{} -->"
+_SHARD_MARKER_PATTERN = re.compile(r"<!-- mkdocs-click shard (\d+)/(\d+) -->")
+
+
+def _merge_shards(texts: Iterable[str]) -> str:
+    shards: dict[int, str] = {}
+    counts = set()
+    for text in texts:
+        marker, _, body = text.partition("\n")
+        match = _SHARD_MARKER_PATTERN.fullmatch(marker)
+        if match is None:
+            raise MkDocsClickException(
+                "Shards must start with the line written by `render --shard`"
+            )
+
+        k, n = int(match.group(1)), int(match.group(2))
+        if k in shards:
+            raise MkDocsClickException(f"Shard {k}/{n} is given more than once")
+        shards[k] = body
+        counts.add(n)
+
+    if len(counts) != 1:
+        raise MkDocsClickException("Shards must all come from the same number of shards")
+
+    [count] = counts
+    missing = sorted(set(range(1, count + 1)) - set(shards))
+    if missing:
+        raise MkDocsClickException(f"Missing shards: {', '.join(f'{k}/{count}' for k in missing)}")
+
+    # Each shard holds whole sections, so joining their lines gives the lines of a single render.
+    return "\n".join(shards[k] for k in range(1, count + 1) if shards[k])
+
+
+def _write_lines(f: IO[str], lines: Iterable[str]) -> None:
+    for i, line in enumerate(lines):
+        if i:
+            f.write("\n")
+        f.write(line)
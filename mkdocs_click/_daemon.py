@@ -0,0 +1,275 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import subprocess
+import sys
+import tempfile
+from contextlib import suppress
+from typing import Any
+
+from ._anchors import AnchorRegistry
+from ._docs import RawHtml, reset_build_caches
+from ._exceptions import MkDocsClickException
+from ._loader import get_source_signature, track_imports, unload_modules
+
+log = logging.getLogger("mkdocs.extensions.mkdocs_click")
+
+# Unix sockets are not available on Windows, where the daemon cannot be started.
+if sys.platform == "win32":
+    _Server = socketserver.TCPServer
+else:
+    _Server = socketserver.UnixStreamServer
+
+# Documenting a large CLI from a cold daemon can take a while.
+_TIMEOUT = 120.0
+
+# Daemons are only started once per process, the blocks of that build being rendered in-process.
+_STARTED: set[str] = set()
+
+
+def get_socket_path() -> str:
+    """
+    Return the socket of the daemon for the current Python interpreter and working directory, which
+    determine what blocks import and the files they refer to.
+
+    Sockets are in a directory that only the current user can access, so that other users can neither
+    answer the extension nor send requests to the daemon.
+    """
+    path = os.environ.get("MKDOCS_CLICK_DAEMON_SOCKET")
+    if path:
+        return path
+
+    digest = hashlib.sha256(f"{sys.executable}\0{os.getcwd()}".encode()).hexdigest()[:16]
+    return os.path.join(_get_private_directory(), f"mkdocs-click-{digest}.sock")
+
+
+def _get_private_directory() -> str:
+    path = os.environ.get("XDG_RUNTIME_DIR")
+    if not path or not os.path.isdir(path):
+        path = os.path.join(tempfile.gettempdir(), f"mkdocs-click-{os.getuid()}")
+        with suppress(FileExistsError):
+            os.mkdir(path, 0o700)
+
+    # Anyone can create the directory in the shared temporary directory first.
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise MkDocsClickException(
+            f"The daemon directory {path} must be a directory that only the current user can access"
+        )
+
+    return path
+
+
+def request_block(
+    options: dict[str, Any],
+    has_attr_list: bool,
+    anchors: AnchorRegistry,
+    build: str = "",
+    start: bool = True,
+) -> list[str] | None:
+    """
+    Ask the daemon for the lines of a block, claiming the same anchors as if it was rendered here.
+
+    Blocks of the same `build` share the build caches of the daemon, which are reset for new ones.
+
+    Return `None` if the daemon is not available or fails, so that the block is rendered in-process,
+    after starting the daemon if `start` and there is none.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    request = {
+        "options": options,
+        "has_attr_list": has_attr_list,
+        "claims": anchors.claims,
+        "sys_path": sys.path,
+        "build": build,
+    }
+    try:
+        path = get_socket_path()
+        if not _is_own_socket(path):
+            log.warning(f"Rendering in-process, {path} is not a socket of the current user")
+            return None
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(_TIMEOUT)
+            sock.connect(path)
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (FileNotFoundError, ConnectionRefusedError):
+        if start:
+            start_daemon()
+        return None
+    except (OSError, ValueError) as e:
+        log.warning(f"Rendering in-process, the mkdocs-click daemon is not responding: {e}")
+        return None
+    except MkDocsClickException as e:
+        log.warning(f"Rendering in-process: {e}")
+        return None
+
+    if "error" in response:
+        return None
+
+    if not anchors.claim_all([tuple(claim) for claim in response["claims"]]):
+        return None
+
+    html = set(response["html"])
+    return [RawHtml(line) if i in html else line for i, line in enumerate(response["lines"])]
+
+
+def _is_own_socket(path: str) -> bool:
+    # Raises `FileNotFoundError` if there is no daemon yet.
+    info = os.lstat(path)
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+def start_daemon() -> None:
+    """Start the daemon in the background, for the next builds."""
+    path = get_socket_path()
+    if path in _STARTED:
+        return
+
+    _STARTED.add(path)
+    subprocess.Popen(
+        [sys.executable, "-m", "mkdocs_click", "daemon", "--socket", path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+class DaemonServer(_Server):
+    """
+    Render blocks for the extension, keeping the commands they import loaded between builds.
+
+    Requests are handled one at a time. Once a source file of the packages of the documented commands
+    changes, all of their modules are unloaded, to be imported again by the next blocks. Other modules
+    cannot be safely unloaded: once one of their source files changes, the daemon stops with `restart`
+    set, to be started again afresh.
+    """
+
+    def __init__(self, path: str, idle_timeout: float | None = None) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise MkDocsClickException("The daemon requires Unix sockets, which are not available")
+
+        _remove_stale_socket(path)
+        super().__init__(path, _Handler)
+        self.timeout = idle_timeout
+        self.idle = False
+        self.restart = False
+        self.requests = 0
+        # Modules of the packages of the documented commands, and all modules imported for blocks.
+        self._modules: set[str] = set()
+        self._imported: set[str] = set()
+        self._signature = get_source_signature(())
+        self._dependencies = get_source_signature(())
+        self._build: str | None = None
+
+    def server_bind(self) -> None:
+        super().server_bind()
+        # Only the current user may send requests, even if the socket is in a shared directory.
+        os.chmod(self.server_address, 0o600)  # type: ignore[arg-type]
+
+    def run(self) -> None:
+        """Handle requests until none came for `idle_timeout` seconds, or until it must `restart`."""
+        try:
+            while not self.idle and not self.restart:
+                self.handle_request()
+        finally:
+            self.server_close()
+
+    def handle_timeout(self) -> None:
+        self.idle = True
+
+    def server_close(self) -> None:
+        super().server_close()
+        with suppress(FileNotFoundError):
+            os.unlink(self.server_address)  # type: ignore[arg-type]
+
+    def render(self, request: dict[str, Any]) -> dict[str, Any]:
+        # Imported here, as the extension uses the client of this module.
+        from ._extension import replace_command_docs
+
+        self.requests += 1
+        if get_source_signature(self._imported - self._modules) != self._dependencies:
+            self.restart = True
+            return {"error": "A dependency of the documented commands changed, restarting"}
+
+        if request["build"] != self._build:
+            reset_build_caches()
+            self._build = request["build"]
+        if get_source_signature(self._modules) != self._signature:
+            unload_modules(self._modules)
+            self._modules.clear()
+
+        sys.path[:] = request["sys_path"]
+        anchors = AnchorRegistry()
+        anchors.claim_all([tuple(claim) for claim in request["claims"]])
+        start = len(anchors.claims)
+
+        try:
+            with track_imports() as added:
+                lines = list(
+                    replace_command_docs(
+                        has_attr_list=request["has_attr_list"],
+                        anchors=anchors,
+                        imported_modules=self._modules,
+                        **request["options"],
+                    )
+                )
+        except MkDocsClickException as e:
+            return {"error": str(e)}
+        finally:
+            self._imported.update(added)
+            self._signature = get_source_signature(self._modules)
+            self._dependencies = get_source_signature(self._imported - self._modules)
+
+        return {
+            "lines": lines,
+            "html": [i for i, line in enumerate(lines) if isinstance(line, RawHtml)],
+            "claims": anchors.claims[start:],
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: DaemonServer
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        # Connections checking whether the daemon runs send nothing.
+        if not line:
+            return
+
+        request = json.loads(line)
+        try:
+            response = self.server.render(request)
+        except Exception as e:
+            # The client renders the block in-process, reporting the error there.
+            response = {"error": f"{type(e).__name__}: {e}"}
+
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def _remove_stale_socket(path: str) -> None:
+    if not os.path.exists(path):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+
+    raise MkDocsClickException(f"A daemon is already listening on {path}")
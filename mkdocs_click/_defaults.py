@@ -0,0 +1,118 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from __future__ import annotations
+
+import copy
+import logging
+import threading
+from typing import TYPE_CHECKING, Any
+
+import click
+
+from ._cache import WeakKeyCache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+log = logging.getLogger("mkdocs.extensions.mkdocs_click")
+
+# Values of dynamic defaults, by callable, evaluated once for all blocks of a build. Callables that did not
+# return within their time budget are documented as `DYNAMIC` for the rest of the build.
+DEFAULTS_CACHE: WeakKeyCache[Callable[[], Any], None, tuple[Any]] = WeakKeyCache()
+
+# Evaluations that did not return within their time budget, by callable. They are kept across builds, so
+# that a callable never runs in more than one thread, and the next build uses their result once available.
+_EVALUATIONS: WeakKeyCache[Callable[[], Any], None, _Evaluation] = WeakKeyCache()
+_EVALUATIONS_LOCK = threading.Lock()
+
+# Commands whose dynamic defaults are evaluated, by original command and time budget, for a build. Reusing
+# the same copy for the same command keeps commands registered at several places of the tree identical.
+EVALUATED_COMMANDS: WeakKeyCache[click.Command, float, click.Command] = WeakKeyCache()
+
+
+class _DynamicDefault:
+    """Stands in for a dynamic default which could not be evaluated within its time budget."""
+
+    def __str__(self) -> str:
+        return "(dynamic)"
+
+    __repr__ = __str__
+
+
+DYNAMIC = _DynamicDefault()
+
+
+def evaluate_command_defaults(command: click.Command, budget: float) -> click.Command:
+    """
+    Return a copy of the command where callable defaults of options are replaced by their value.
+
+    Each callable gets `budget` seconds, after which its default is documented as `(dynamic)`, as are
+    callables which fail. Commands may be shared between threads, so they are never modified.
+    """
+    if not any(_has_dynamic_default(param) for param in command.params):
+        return command
+
+    evaluated = EVALUATED_COMMANDS.get(command, budget)
+    if evaluated is None:
+        evaluated = copy.copy(command)
+        evaluated.params = [
+            _evaluate_option(param, budget) if _has_dynamic_default(param) else param
+            for param in command.params
+        ]
+        EVALUATED_COMMANDS.set(command, budget, evaluated)
+
+    return evaluated
+
+
+def evaluate_default(func: Callable[[], Any], budget: float) -> Any:
+    """Call a dynamic default in the background, returning `DYNAMIC` if it takes more than `budget` seconds."""
+    cached = DEFAULTS_CACHE.get(func, None)
+    if cached is not None:
+        return cached[0]
+
+    with _EVALUATIONS_LOCK:
+        evaluation = _EVALUATIONS.get(func, None)
+        if evaluation is None:
+            evaluation = _Evaluation(func)
+            _EVALUATIONS.set(func, None, evaluation)
+
+    evaluation.thread.join(budget)
+    if evaluation.result:
+        value = evaluation.result[0]
+        _EVALUATIONS.discard(func, None)
+    else:
+        log.info(f"Documenting the default of {func!r} as dynamic, it took more than {budget}s")
+        value = DYNAMIC
+
+    DEFAULTS_CACHE.set(func, None, (value,))
+    return value
+
+
+class _Evaluation:
+    """A dynamic default being called in a background thread."""
+
+    def __init__(self, func: Callable[[], Any]) -> None:
+        self.result: list[Any] = []
+        # Daemon threads do not keep the build from exiting if the callable never returns.
+        self.thread = threading.Thread(
+            target=self._run, args=(func,), name="mkdocs-click-default", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self, func: Callable[[], Any]) -> None:
+        try:
+            self.result.append(func())
+        except Exception as e:
+            log.warning(f"Documenting the default of {func!r} as dynamic, it failed with: {e!r}")
+            self.result.append(DYNAMIC)
+
+
+def _evaluate_option(param: click.Parameter, budget: float) -> click.Parameter:
+    option = copy.copy(param)
+    option.default = evaluate_default(param.default, budget)  # type: ignore[arg-type]
+    return option
+
+
+def _has_dynamic_default(param: click.Parameter) -> bool:
+    return isinstance(param, click.Option) and callable(param.default)
@@ -3,17 +3,114 @@
 # Licensed under the Apache license (see LICENSE)
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import copy
+import hashlib
 import inspect
-from contextlib import ExitStack, contextmanager
-from typing import TYPE_CHECKING, cast
+import itertools
+import json
+import os
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from html import escape
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
 
 import click
-from markdown.extensions.toc import slugify
 
+from ._anchors import AnchorRegistry, AnchorScope
+from ._cache import LRUCache, WeakKeyCache
+from ._defaults import DEFAULTS_CACHE, EVALUATED_COMMANDS, evaluate_command_defaults
 from ._exceptions import MkDocsClickException
 
 if TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import AsyncIterator, Callable, Generator, Iterator, Mapping
+
+    from ._templates import Templates
+
+
+class Chunk(NamedTuple):
+    """The rendered lines of a command subtree, and the anchors they use."""
+
+    lines: list[str]
+    anchors: tuple[tuple[str, str], ...]
+
+
+SubtreeCache = LRUCache[tuple, Chunk]
+
+# The options already rendered by parent commands, by table row, and the context they were rendered in.
+InheritedOptions = dict[tuple[str, str, str, str], click.Context]
+
+# Rendered command subtrees, shared by all pages and rebuilds of a `mkdocs serve` session.
+SUBTREE_CACHE: SubtreeCache = LRUCache(maxsize=4096)
+
+# What groups returned from `list_commands()` (under the `None` key) and `get_command(name)`, shared
+# by all blocks of a build. Entries go away with their group, e.g. once its module is reloaded.
+RESOLUTION_CACHE: WeakKeyCache[click.Command, str | None, Any] = WeakKeyCache()
+
+
+class _Build:
+    """The build in progress, identified for the daemon to reset its build caches along with this process."""
+
+    id = 0
+
+
+_BUILDS = itertools.count(1)
+
+
+def reset_build_caches() -> None:
+    """
+    Start a new build: the sub-commands of lazy groups and dynamic defaults are evaluated again, as they may
+    change without their module changing, e.g. when they scan a directory or read a configuration file.
+
+    This is called by the plugin before each build. Without it, build caches last as long as the process.
+    """
+    RESOLUTION_CACHE.clear()
+    DEFAULTS_CACHE.clear()
+    EVALUATED_COMMANDS.clear()
+    _Build.id = next(_BUILDS)
+
+
+def get_build_id() -> str:
+    """Return an identifier of the current build, unique across processes."""
+    return f"{os.getpid()}:{_Build.id}"
+
+
+# What the rendering in progress used from the build caches, if it is tracked.
+_BUILD_DEPENDENCIES: contextvars.ContextVar[set[str] | None] = contextvars.ContextVar(
+    "mkdocs_click_build_dependencies", default=None
+)
+
+
+@contextmanager
+def track_build_dependencies() -> Iterator[set[str]]:
+    """
+    Collect what rendering within the context used from the build caches: `lazy groups` and `dynamic defaults`.
+
+    Output that used any of them is only valid for the current build.
+    """
+    dependencies: set[str] = set()
+    token = _BUILD_DEPENDENCIES.set(dependencies)
+    try:
+        yield dependencies
+    finally:
+        _BUILD_DEPENDENCIES.reset(token)
+
+
+def _evaluate_defaults(command: click.Command, budget: float) -> click.Command:
+    evaluated = evaluate_command_defaults(command, budget)
+    if evaluated is not command:
+        _add_build_dependency("dynamic defaults")
+
+    return evaluated
+
+
+def _add_build_dependency(name: str) -> None:
+    dependencies = _BUILD_DEPENDENCIES.get()
+    if dependencies is not None:
+        dependencies.add(name)
 
 
 def make_command_docs(
@@ -25,22 +122,524 @@ def make_command_docs(
     show_hidden: bool = False,
     list_subcommands: bool = False,
     has_attr_list: bool = False,
+    html: bool = False,
+    cache: SubtreeCache | None = None,
+    anchors: AnchorScope | None = None,
+    draft: bool = False,
+    draft_depth: int | None = None,
+    dedupe_options: bool = False,
+    dedupe_commands: bool = False,
+    shard: tuple[int, int] | None = None,
+    weights: Mapping[str, float] | None = None,
+    timings: dict[str, float] | None = None,
+    templates: Templates | None = None,
+    evaluate_defaults: float | None = None,
 ) -> Iterator[str]:
-    """Create the Markdown lines for a command and its sub-commands."""
-    for line in _recursively_make_command_docs(
-        prog_name,
-        command,
-        depth=depth,
+    """Create the Markdown lines for a command and its sub-commands.
+
+    With `html`, the usage and options sections are rendered directly to HTML, as `RawHtml` lines.
+
+    With `draft`, only the title, the first line of the description and the usage of each command are created,
+    and sub-commands more than `draft_depth` levels below `command` are left out.
+
+    With `dedupe_options` and the `table` style, options which are rendered exactly the same as an option of a
+    parent command are not repeated, but listed along with a link to the parent command.
+
+    With `dedupe_commands`, a command object found at several places of the tree is only documented at the first
+    one, and other places link to it. The `cache` is not used then.
+
+    If a `cache` is given, the lines of every command subtree are stored in it, keyed by the subtree's structural
+    hash, and reused as long as that subtree does not change.
+
+    Heading anchors are taken from `anchors`, so that they stay unique across all blocks of a page.
+
+    With `shard=(k, n)`, the sections of the commands, in the order of the traversal, are split into `n`
+    contiguous parts, and only the lines of the `k`-th one are created: joining the lines of all parts in order
+    gives the lines of the whole tree. Parts are balanced by the `weights` of the command paths of sections, e.g.
+    recorded render times, and by their count otherwise. The `cache` is not used then.
+
+    If a `timings` dictionary is given, the time spent creating the section of each command path is added to it.
+
+    Sections of commands which have a template in `templates` are created from it rather than from their
+    built-in layout.
+
+    With `evaluate_defaults`, callable defaults of options are documented by their value, each callable
+    being given that many seconds before its default is documented as `(dynamic)`.
+    """
+    if anchors is None:
+        anchors = AnchorRegistry().scope()
+
+    def make_docs(anchors: AnchorScope, sections: _Sections | None) -> Iterator[str]:
+        return _recursively_make_command_docs(
+            prog_name,
+            command,
+            depth=depth,
+            style=style,
+            remove_ascii_art=remove_ascii_art,
+            show_hidden=show_hidden,
+            list_subcommands=list_subcommands,
+            has_attr_list=has_attr_list,
+            html=html,
+            cache=cache,
+            fingerprints={},
+            anchors=anchors,
+            draft=draft,
+            max_depth=depth + draft_depth if draft and draft_depth is not None else None,
+            inherited_options={} if dedupe_options and style == "table" else None,
+            seen={} if dedupe_commands else None,
+            sections=sections,
+            templates=templates,
+            evaluate_defaults=evaluate_defaults,
+        )
+
+    sections = None
+    if shard is not None:
+        # Skipped sections are cheap, so the whole traversal is made once to find the sections first.
+        listing = _Sections(range(0))
+        for _ in make_docs(AnchorRegistry().scope(), listing):
+            pass
+        sections = _Sections(_get_shard(listing.paths, shard, weights), timings)
+    elif timings is not None:
+        sections = _Sections(None, timings)
+
+    for line in make_docs(anchors, sections):
+        if line.strip() == "\b":
+            continue
+
+        yield line
+
+    if sections is not None:
+        sections.finish()
+
+
+class _Sections:
+    """
+    Count the command sections of a traversal, in order, and tell which ones to render: all of them if
+    `selected` is `None`.
+
+    The time until the next section starts is added to the `timings` of each rendered section.
+    """
+
+    def __init__(
+        self, selected: range | None = None, timings: dict[str, float] | None = None
+    ) -> None:
+        self.paths: list[str] = []
+        self._selected = selected
+        self._timings = timings
+        self._started: float | None = None
+
+    def enter(self, ctx: click.Context) -> bool:
+        """Start the section of a command, and return whether to render it."""
+        self.finish()
+        selected = self._selected is None or len(self.paths) in self._selected
+        self.paths.append(ctx.command_path)
+        if selected and self._timings is not None:
+            self._started = time.perf_counter()
+        return selected
+
+    def finish(self) -> None:
+        if self._started is not None and self._timings is not None:
+            path = self.paths[-1]
+            self._timings[path] = self._timings.get(path, 0.0) + time.perf_counter() - self._started
+        self._started = None
+
+
+def _get_shard(
+    paths: list[str], shard: tuple[int, int], weights: Mapping[str, float] | None
+) -> range:
+    """Return the sections of the `k`-th of `n` contiguous parts of similar total weight."""
+    k, n = shard
+    if not 1 <= k <= n:
+        raise MkDocsClickException(f"Shard {k}/{n} must be between 1/{n} and {n}/{n}")
+
+    # Commands without a recorded weight count as an average one.
+    known = [weights[path] for path in paths if path in weights] if weights else []
+    default = sum(known) / len(known) if known else 1.0
+    totals = [0.0]
+    for path in paths:
+        weight = weights.get(path, default) if weights else default
+        totals.append(totals[-1] + weight)
+
+    # Each part ends at the section boundary closest to its share of the total weight.
+    bounds = [0]
+    for i in range(1, n):
+        target = totals[-1] * i / n
+        bound = min(bisect_left(totals, target, lo=bounds[-1]), len(paths))
+        if bound > bounds[-1] and target - totals[bound - 1] <= totals[bound] - target:
+            bound -= 1
+        bounds.append(bound)
+    bounds.append(len(paths))
+
+    return range(bounds[k - 1], bounds[k])
+
+
+async def make_command_docs_async(
+    prog_name: str,
+    command: click.Command,
+    depth: int = 0,
+    style: str = "plain",
+    remove_ascii_art: bool = False,
+    show_hidden: bool = False,
+    list_subcommands: bool = False,
+    has_attr_list: bool = False,
+    html: bool = False,
+    cache: SubtreeCache | None = None,
+    anchors: AnchorScope | None = None,
+    draft: bool = False,
+    draft_depth: int | None = None,
+    dedupe_options: bool = False,
+    dedupe_commands: bool = False,
+    shard: tuple[int, int] | None = None,
+    weights: Mapping[str, float] | None = None,
+    timings: dict[str, float] | None = None,
+    templates: Templates | None = None,
+    evaluate_defaults: float | None = None,
+) -> AsyncIterator[str]:
+    """Create the same Markdown lines as `make_command_docs`, without blocking the event loop.
+
+    Sub-commands of lazy groups are resolved first, concurrently for sibling commands: `list_commands` and
+    `get_command` are awaited if they are coroutine functions and run in worker threads otherwise. The lines
+    are then rendered in a worker thread.
+    """
+    resolved = await _resolve_command_tree(
+        command, _build_command_context(prog_name=prog_name, command=command, parent=None), {}
+    )
+
+    lines = await asyncio.to_thread(
+        list,
+        make_command_docs(
+            prog_name,
+            resolved,
+            depth=depth,
+            style=style,
+            remove_ascii_art=remove_ascii_art,
+            show_hidden=show_hidden,
+            list_subcommands=list_subcommands,
+            has_attr_list=has_attr_list,
+            html=html,
+            cache=cache,
+            anchors=anchors,
+            draft=draft,
+            draft_depth=draft_depth,
+            dedupe_options=dedupe_options,
+            dedupe_commands=dedupe_commands,
+            shard=shard,
+            weights=weights,
+            timings=timings,
+            templates=templates,
+            evaluate_defaults=evaluate_defaults,
+        ),
+    )
+    for line in lines:
+        yield line
+
+
+async def _resolve_command_tree(
+    command: click.Command, ctx: click.Context, memo: dict[int, asyncio.Task[click.Command]]
+) -> click.Command:
+    """Return a copy of the command where the sub-commands of every group are resolved.
+
+    Sub-commands are stored in the `commands` of the copies, which `_get_sub_commands` looks at first.
+    Commands registered in several places are resolved once, sharing the same copy, as `dedupe_commands`
+    recognizes them by identity.
+    """
+    subcommands = await _get_sub_commands_async(command, ctx)
+    if not subcommands:
+        return command
+
+    async def resolve(name: str, subcommand: click.Command) -> tuple[str, click.Command]:
+        key = id(subcommand)
+        if key not in memo:
+            sub_ctx = _build_command_context(cast(str, subcommand.name), subcommand, ctx)
+            memo[key] = asyncio.ensure_future(_resolve_command_tree(subcommand, sub_ctx, memo))
+        return name, await memo[key]
+
+    resolved = copy.copy(command)
+    resolved.commands = dict(  # type: ignore[attr-defined]
+        await asyncio.gather(*(resolve(name, subcommand) for name, subcommand in subcommands))
+    )
+    return resolved
+
+
+async def _get_sub_commands_async(
+    command: click.Command, ctx: click.Context
+) -> list[tuple[str, click.Command]]:
+    """Return the names and subcommands of a Click command, like `_get_sub_commands`."""
+    subcommands = getattr(command, "commands", {})
+    if subcommands:
+        return list(subcommands.items())
+
+    if not _is_command_group(command):
+        return []
+
+    group = cast(click.Group, command)
+    names = await _resolve_async(group, group.list_commands, ctx)
+    commands = await asyncio.gather(
+        *(_resolve_async(group, group.get_command, ctx, name) for name in names)
+    )
+
+    for subcommand in commands:
+        assert subcommand is not None
+
+    return list(zip(names, commands))
+
+
+async def _resolve_async(
+    group: click.Group, method: Callable[..., Any], ctx: click.Context, name: str | None = None
+) -> Any:
+    """Call `list_commands()` or `get_command(name)` of a group, unless it is in `RESOLUTION_CACHE`."""
+    _add_build_dependency("lazy groups")
+    result = RESOLUTION_CACHE.get(group, name)
+    if result is not None:
+        return result
+
+    args = (ctx,) if name is None else (ctx, name)
+    if inspect.iscoroutinefunction(method):
+        result = await method(*args)
+    else:
+        result = await asyncio.to_thread(method, *args)
+
+    if name is None:
+        result = tuple(result)
+    RESOLUTION_CACHE.set(group, name, result)
+    return result
+
+
+def make_commands_index(
+    commands: list[tuple[str, click.Command]],
+    has_attr_list: bool = False,
+    show_hidden: bool = False,
+    anchors: list[AnchorScope] | None = None,
+) -> Iterator[str]:
+    """Create the Markdown lines of an index of several documented commands.
+
+    Links use the anchors of each command's block, given in the same order as `commands`.
+    """
+    if anchors is None:
+        registry = AnchorRegistry()
+        anchors = [registry.scope() for _ in commands]
+
+    yield "**Commands**"
+    yield ""
+    for (prog_name, command), scope in zip(commands, anchors):
+        yield from make_commands_index_entry(
+            prog_name, command, has_attr_list=has_attr_list, show_hidden=show_hidden, anchors=scope
+        )
+    yield ""
+
+
+def make_commands_index_entry(
+    prog_name: str,
+    command: click.Command,
+    has_attr_list: bool = False,
+    show_hidden: bool = False,
+    anchors: AnchorScope | None = None,
+) -> Iterator[str]:
+    """Create the Markdown line of a command in an index of several commands, unless it is hidden."""
+    if anchors is None:
+        anchors = AnchorRegistry().scope()
+
+    ctx = _build_command_context(prog_name=prog_name, command=command, parent=None)
+    if ctx.command.hidden and not show_hidden:
+        return
+    yield _make_command_link(ctx, has_attr_list=has_attr_list, anchors=anchors)
+
+
+def make_command_fingerprint(prog_name: str, command: click.Command) -> str:
+    """Compute a stable hash of everything in a command tree that affects its rendered output.
+
+    The fingerprint covers command names, help texts, parameters (including their types, defaults and hidden
+    flags) and `context_settings`, but does not render anything, which makes it cheap enough to use as a cache key
+    or to check whether previously generated documentation is stale.
+    """
+    ctx = _build_command_context(prog_name=prog_name, command=command, parent=None)
+    digest = hashlib.sha256(prog_name.encode())
+    digest.update(_fingerprint_command(ctx, {}).encode())
+    return digest.hexdigest()
+
+
+def make_command_snapshot(prog_name: str, command: click.Command) -> dict[str, Any]:
+    """Describe a command tree with JSON-serializable data.
+
+    The description holds everything the documentation is rendered from, down to parameter types and defaults, so
+    that commands rendering the same documentation can be rebuilt from it without importing the CLI. Values that are
+    not JSON types are stored as their string representation.
+    """
+    ctx = _build_command_context(prog_name=prog_name, command=command, parent=None)
+    return _snapshot_command(ctx)
+
+
+class Fragment(NamedTuple):
+    """The documentation of a command subtree, loaded on demand from the page of its parent command."""
+
+    name: str
+    lines: list[str]
+
+
+class CommandPage(NamedTuple):
+    """The documentation of a single command, for a page of its own."""
+
+    # Names of the command and of its parents, below the documented command.
+    names: tuple[str, ...]
+    title: str
+    lines: list[str]
+    fragments: tuple[Fragment, ...] = ()
+
+
+def make_command_pages(
+    prog_name: str,
+    command: click.Command,
+    style: str = "plain",
+    remove_ascii_art: bool = False,
+    show_hidden: bool = False,
+    has_attr_list: bool = False,
+    cache: SubtreeCache | None = None,
+    fragment_depth: int | None = None,
+) -> Iterator[CommandPage]:
+    """Create one page per command of the tree, parents first.
+
+    Each page documents its own command and lists its sub-commands, linking to their pages: the page of
+    the command at `names` is expected at `<names>/index.md`, relative to the page of `command`.
+
+    With `fragment_depth`, only commands up to `fragment_depth` levels below `command` get a page. The
+    sub-commands of the deepest ones are documented in fragments of their page instead, in `<details>`
+    elements with a `data-mkdocs-click-fragment` attribute holding the fragment's URL, `<name>.html`.
+
+    If a `cache` is given, pages are stored in it, keyed by a hash of the command and of the sub-command
+    links, so that a page is only rendered again when something it shows changes.
+    """
+    ctx = _build_command_context(prog_name=prog_name, command=command, parent=None)
+    if ctx.command.hidden and not show_hidden:
+        return
+
+    yield from _make_command_pages(
+        ctx,
+        (),
         style=style,
         remove_ascii_art=remove_ascii_art,
         show_hidden=show_hidden,
-        list_subcommands=list_subcommands,
         has_attr_list=has_attr_list,
-    ):
-        if line.strip() == "\b":
-            continue
+        cache=cache,
+        fragment_depth=fragment_depth,
+    )
 
-        yield line
+
+def _make_command_pages(
+    ctx: click.Context,
+    names: tuple[str, ...],
+    *,
+    style: str,
+    remove_ascii_art: bool,
+    show_hidden: bool,
+    has_attr_list: bool,
+    cache: SubtreeCache | None,
+    fragment_depth: int | None,
+) -> Iterator[CommandPage]:
+    subcommands = _get_sub_commands(ctx.command, ctx)
+    subcommands.sort(key=lambda cmd: str(cmd.name))
+    sub_contexts = [
+        _build_command_context(cast(str, command.name), command, ctx) for command in subcommands
+    ]
+    sub_contexts = [
+        sub_ctx for sub_ctx in sub_contexts if show_hidden or not sub_ctx.command.hidden
+    ]
+    with_fragments = fragment_depth is not None and len(names) >= fragment_depth
+
+    # Fragments are shown on the page, so their anchors must not clash with the page's own.
+    anchors = AnchorRegistry().scope()
+    anchors.anchor(ctx.command_path)
+
+    def make_page() -> list[str]:
+        lines = [
+            line
+            for line in _make_command_tree(
+                ctx,
+                0,
+                style=style,
+                remove_ascii_art=remove_ascii_art,
+                show_hidden=show_hidden,
+                list_subcommands=False,
+                has_attr_list=has_attr_list,
+                html=False,
+                cache=None,
+                fingerprints=None,
+                anchors=AnchorRegistry().scope(),
+                max_depth=0,
+            )
+            if line.strip() != "\b"
+        ]
+        if sub_contexts:
+            lines.extend(["**Subcommands**", ""])
+            for sub_ctx in sub_contexts:
+                if with_fragments:
+                    lines.extend(_make_fragment_details(sub_ctx, f"{sub_ctx.info_name}.html"))
+                else:
+                    lines.append(_make_command_page_link(sub_ctx, f"{sub_ctx.info_name}/index.md"))
+            lines.append("")
+        return lines
+
+    if cache is None:
+        lines = make_page()
+    else:
+        key = (
+            "page",
+            _fingerprint_page(ctx, sub_contexts),
+            ctx.command_path,
+            style,
+            remove_ascii_art,
+            show_hidden,
+            has_attr_list,
+            with_fragments,
+            tuple(
+                repr(getattr(ctx, attribute, None)) for attribute in _INHERITED_CONTEXT_ATTRIBUTES
+            ),
+        )
+        chunk = cache.get(key)
+        if chunk is None:
+            chunk = Chunk(make_page(), ())
+            cache.set(key, chunk)
+        lines = chunk.lines
+
+    if with_fragments:
+        fragments = tuple(
+            Fragment(
+                cast(str, sub_ctx.info_name),
+                [
+                    line
+                    for line in _recursively_make_command_docs(
+                        cast(str, sub_ctx.info_name),
+                        sub_ctx.command,
+                        parent=ctx,
+                        depth=1,
+                        style=style,
+                        remove_ascii_art=remove_ascii_art,
+                        show_hidden=show_hidden,
+                        has_attr_list=has_attr_list,
+                        cache=cache,
+                        fingerprints={},
+                        anchors=anchors,
+                    )
+                    if line.strip() != "\b"
+                ],
+            )
+            for sub_ctx in sub_contexts
+        )
+        yield CommandPage(names, cast(str, ctx.info_name), lines, fragments)
+        return
+
+    yield CommandPage(names, cast(str, ctx.info_name), lines)
+
+    for sub_ctx in sub_contexts:
+        yield from _make_command_pages(
+            sub_ctx,
+            (*names, cast(str, sub_ctx.info_name)),
+            style=style,
+            remove_ascii_art=remove_ascii_art,
+            show_hidden=show_hidden,
+            has_attr_list=has_attr_list,
+            cache=cache,
+            fragment_depth=fragment_depth,
+        )
 
 
 def _recursively_make_command_docs(
@@ -53,17 +652,185 @@ def _recursively_make_command_docs(
     show_hidden: bool = False,
     list_subcommands: bool = False,
     has_attr_list: bool = False,
+    html: bool = False,
+    cache: SubtreeCache | None = None,
+    fingerprints: dict[int, str] | None = None,
+    anchors: AnchorScope | None = None,
+    draft: bool = False,
+    max_depth: int | None = None,
+    inherited_options: InheritedOptions | None = None,
+    seen: dict[int, click.Context] | None = None,
+    sections: _Sections | None = None,
+    templates: Templates | None = None,
+    evaluate_defaults: float | None = None,
 ) -> Iterator[str]:
     """Create the raw Markdown lines for a command and its sub-commands."""
+    if evaluate_defaults:
+        command = _evaluate_defaults(command, evaluate_defaults)
+
     ctx = _build_command_context(prog_name=prog_name, command=command, parent=parent)
 
+    if anchors is None:
+        anchors = AnchorRegistry().scope()
+
     if ctx.command.hidden and not show_hidden:
         return
 
-    yield from _make_title(ctx, depth, has_attr_list=has_attr_list)
-    yield from _make_description(ctx, remove_ascii_art=remove_ascii_art)
-    yield from _make_usage(ctx)
-    yield from _make_options(ctx, style, show_hidden=show_hidden)
+    if seen is not None:
+        original = seen.setdefault(id(ctx.command), ctx)
+        if original is not ctx:
+            lines = [
+                *_make_title(
+                    ctx, depth, has_attr_list=has_attr_list, anchors=anchors, templates=templates
+                ),
+                _make_command_reference(original, has_attr_list=has_attr_list, anchors=anchors),
+                "",
+            ]
+            if sections is None or sections.enter(ctx):
+                yield from lines
+            return
+
+    def make_tree() -> Iterator[str]:
+        return _make_command_tree(
+            ctx,
+            depth,
+            style=style,
+            remove_ascii_art=remove_ascii_art,
+            show_hidden=show_hidden,
+            list_subcommands=list_subcommands,
+            has_attr_list=has_attr_list,
+            html=html,
+            cache=cache,
+            fingerprints=fingerprints,
+            anchors=anchors,
+            draft=draft,
+            max_depth=max_depth,
+            inherited_options=inherited_options,
+            seen=seen,
+            sections=sections,
+            templates=templates,
+            evaluate_defaults=evaluate_defaults,
+        )
+
+    # Whether a subtree is documented depends on the rest of the tree, and cached subtrees have no sections.
+    if cache is None or seen is not None or sections is not None:
+        yield from make_tree()
+        return
+
+    if fingerprints is None:
+        fingerprints = {}
+
+    # Besides the subtree itself, the output depends on where it is rendered and on the settings
+    # that sub-contexts inherit from their parents.
+    key = (
+        _fingerprint_command(ctx, fingerprints, evaluate_defaults),
+        ctx.command_path,
+        depth,
+        style,
+        remove_ascii_art,
+        show_hidden,
+        list_subcommands,
+        has_attr_list,
+        html,
+        draft,
+        max_depth,
+        None
+        if inherited_options is None
+        else tuple(sorted((row, owner.command_path) for row, owner in inherited_options.items())),
+        tuple(repr(getattr(ctx, attribute, None)) for attribute in _INHERITED_CONTEXT_ATTRIBUTES),
+        None if templates is None else templates.key,
+    )
+
+    # A cached chunk can only be reused if its anchors are still free on this page.
+    chunk = cache.get(key)
+    if chunk is not None and all(
+        anchors.anchor(command_path) == anchor for command_path, anchor in chunk.anchors
+    ):
+        yield from chunk.lines
+        return
+
+    start = len(anchors.lookups)
+    lines = list(make_tree())
+    cache.set(key, Chunk(lines, tuple(dict.fromkeys(anchors.lookups[start:]))))
+
+    yield from lines
+
+
+def _make_command_tree(
+    ctx: click.Context,
+    depth: int,
+    *,
+    style: str,
+    remove_ascii_art: bool,
+    show_hidden: bool,
+    list_subcommands: bool,
+    has_attr_list: bool,
+    html: bool,
+    cache: SubtreeCache | None,
+    fingerprints: dict[int, str] | None,
+    anchors: AnchorScope,
+    draft: bool = False,
+    max_depth: int | None = None,
+    inherited_options: InheritedOptions | None = None,
+    seen: dict[int, click.Context] | None = None,
+    sections: _Sections | None = None,
+    templates: Templates | None = None,
+    evaluate_defaults: float | None = None,
+) -> Iterator[str]:
+    """Create the raw Markdown lines for the command of `ctx` and its sub-commands.
+
+    Sections left out by `sections` still claim their anchors and pass inherited options on to sub-commands,
+    so that the sections which are rendered are the same as in the whole tree.
+    """
+    rendered = sections is None or sections.enter(ctx)
+
+    title = _make_title(
+        ctx, depth, has_attr_list=has_attr_list, anchors=anchors, templates=templates
+    )
+    if rendered:
+        yield from title
+    else:
+        _consume(title)
+
+    if not rendered:
+        if inherited_options is not None and not draft:
+            inherited_options = _consume(
+                _make_deduplicated_table_options(
+                    ctx,
+                    inherited_options,
+                    show_hidden=show_hidden,
+                    html=html,
+                    has_attr_list=has_attr_list,
+                    anchors=anchors,
+                    templates=templates,
+                )
+            )
+    elif draft:
+        yield from _make_draft_description(
+            ctx, remove_ascii_art=remove_ascii_art, templates=templates
+        )
+        yield from _make_usage(ctx, html=html, templates=templates)
+    elif inherited_options is None:
+        yield from _make_description(ctx, remove_ascii_art=remove_ascii_art, templates=templates)
+        yield from _make_usage(ctx, html=html, templates=templates)
+        yield from _make_options(
+            ctx, style, show_hidden=show_hidden, html=html, templates=templates
+        )
+    else:
+        yield from _make_description(ctx, remove_ascii_art=remove_ascii_art, templates=templates)
+        yield from _make_usage(ctx, html=html, templates=templates)
+        inherited_options = yield from _make_deduplicated_table_options(
+            ctx,
+            inherited_options,
+            show_hidden=show_hidden,
+            html=html,
+            has_attr_list=has_attr_list,
+            anchors=anchors,
+            templates=templates,
+        )
+
+    if max_depth is not None and depth >= max_depth:
+        return
 
     subcommands = _get_sub_commands(ctx.command, ctx)
     if len(subcommands) == 0:
@@ -71,13 +838,19 @@ def _recursively_make_command_docs(
 
     subcommands.sort(key=lambda cmd: str(cmd.name))
 
-    if list_subcommands:
-        yield from _make_subcommands_links(
+    if list_subcommands and not draft:
+        links = _make_subcommands_links(
             subcommands,
             ctx,
             has_attr_list=has_attr_list,
             show_hidden=show_hidden,
+            anchors=anchors,
+            templates=templates,
         )
+        if rendered:
+            yield from links
+        else:
+            _consume(links)
 
     for command in subcommands:
         yield from _recursively_make_command_docs(
@@ -89,9 +862,29 @@ def _recursively_make_command_docs(
             show_hidden=show_hidden,
             list_subcommands=list_subcommands,
             has_attr_list=has_attr_list,
+            html=html,
+            cache=cache,
+            fingerprints=fingerprints,
+            anchors=anchors,
+            draft=draft,
+            max_depth=max_depth,
+            inherited_options=inherited_options,
+            seen=seen,
+            sections=sections,
+            templates=templates,
+            evaluate_defaults=evaluate_defaults,
         )
 
 
+def _consume(lines: Iterator[str]) -> Any:
+    """Run a generator of lines for its side effects and what it returns, leaving out its lines."""
+    try:
+        while True:
+            next(lines)
+    except StopIteration as e:
+        return e.value
+
+
 def _build_command_context(
     prog_name: str, command: click.Command, parent: click.Context | None
 ) -> click.Context:
@@ -104,6 +897,178 @@ def _build_command_context(
     )
 
 
+# Attributes which are not part of `to_info_dict()` but still affect the rendered output.
+_COMMAND_FINGERPRINT_ATTRIBUTES = (
+    "name",
+    "help",
+    "short_help",
+    "hidden",
+    "deprecated",
+    "options_metavar",
+    "subcommand_metavar",
+    "chain",
+)
+_PARAM_FINGERPRINT_ATTRIBUTES = ("metavar", "show_default", "show_choices", "show_envvar")
+# Attributes of commands which snapshots keep, besides their name, parameters and sub-commands.
+_SNAPSHOT_COMMAND_ATTRIBUTES = (
+    "help",
+    "short_help",
+    "epilog",
+    "hidden",
+    "deprecated",
+    "options_metavar",
+    "add_help_option",
+    "subcommand_metavar",
+    "chain",
+)
+# Context attributes which sub-contexts inherit from their parent and which affect the rendered output.
+_INHERITED_CONTEXT_ATTRIBUTES = (
+    "terminal_width",
+    "max_content_width",
+    "help_option_names",
+    "show_default",
+    "auto_envvar_prefix",
+)
+# Context settings which affect the rendered output. Others, like `obj`, may hold any object, whose `repr()`
+# is not stable across processes.
+_CONTEXT_FINGERPRINT_SETTINGS = (*_INHERITED_CONTEXT_ATTRIBUTES, "default_map")
+
+
+def _fingerprint_command(
+    ctx: click.Context, memo: dict[int, str], evaluate_defaults: float | None = None
+) -> str:
+    """Return the structural hash of the command of `ctx` and its sub-commands.
+
+    Sub-commands are hashed first, so the hash of a subtree only changes when something within that subtree changes.
+    With `evaluate_defaults`, the hash covers the values of the dynamic defaults of the whole subtree.
+    """
+    key = id(ctx.command)
+    if key in memo:
+        return memo[key]
+
+    if evaluate_defaults:
+        command = _evaluate_defaults(ctx.command, evaluate_defaults)
+        if command is not ctx.command:
+            ctx = _build_command_context(cast(str, ctx.info_name), command, ctx.parent)
+
+    description = _describe_command(ctx)
+    subcommands = _get_sub_commands(ctx.command, ctx)
+    subcommands.sort(key=lambda cmd: str(cmd.name))
+    description["commands"] = [
+        _fingerprint_command(
+            _build_command_context(cast(str, sub.name), sub, ctx), memo, evaluate_defaults
+        )
+        for sub in subcommands
+    ]
+
+    memo[key] = fingerprint = _hash_description(description)
+    return fingerprint
+
+
+def _fingerprint_page(ctx: click.Context, sub_contexts: list[click.Context]) -> str:
+    """Return the hash of what the page of a command shows: the command itself and links to its sub-commands."""
+    description = _describe_command(ctx)
+    description["commands"] = [_make_command_page_link(sub_ctx, "") for sub_ctx in sub_contexts]
+    return _hash_description(description)
+
+
+def _describe_command(ctx: click.Context) -> dict[str, object]:
+    """Return everything about the command of `ctx` itself that affects its rendered output."""
+    command = ctx.command
+    description: dict[str, object] = {
+        attribute: getattr(command, attribute, None)
+        for attribute in _COMMAND_FINGERPRINT_ATTRIBUTES
+    }
+    description["class"] = _qualified_name(type(command))
+    description["context_settings"] = {
+        setting: value
+        for setting, value in command.context_settings.items()
+        if setting in _CONTEXT_FINGERPRINT_SETTINGS
+    }
+    description["params"] = [
+        {
+            **param.to_info_dict(),
+            **{
+                attribute: getattr(param, attribute, None)
+                for attribute in _PARAM_FINGERPRINT_ATTRIBUTES
+            },
+        }
+        for param in command.get_params(ctx)
+    ]
+    return description
+
+
+def _snapshot_command(ctx: click.Context) -> dict[str, Any]:
+    command = ctx.command
+    # The help option is added again when the command is rebuilt.
+    help_option = command.get_help_option(ctx)
+
+    subcommands = _get_sub_commands(command, ctx)
+    subcommands.sort(key=lambda cmd: str(cmd.name))
+
+    return {
+        "name": command.name,
+        "group": _is_command_group(command),
+        **{
+            attribute: _snapshot_value(getattr(command, attribute, None))
+            for attribute in _SNAPSHOT_COMMAND_ATTRIBUTES
+        },
+        "context_settings": _snapshot_value(command.context_settings),
+        "params": [
+            _snapshot_value(
+                {
+                    **param.to_info_dict(),
+                    **{
+                        attribute: getattr(param, attribute, None)
+                        for attribute in _PARAM_FINGERPRINT_ATTRIBUTES
+                    },
+                }
+            )
+            for param in command.get_params(ctx)
+            if help_option is None or param.opts != help_option.opts
+        ],
+        "commands": [
+            _snapshot_command(_build_command_context(cast(str, sub.name), sub, ctx))
+            for sub in subcommands
+        ],
+    }
+
+
+def _snapshot_value(value: object) -> Any:
+    """Return a JSON-serializable version of a value, tagging tuples, callables and other objects."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _snapshot_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snapshot_value(item) for item in value]
+    if isinstance(value, tuple):
+        return {"tuple": [_snapshot_value(item) for item in value]}
+    if callable(value):
+        return {"callable": str(value)}
+
+    return {"repr": str(value)}
+
+
+def _hash_description(description: dict[str, object]) -> str:
+    serialized = json.dumps(description, sort_keys=True, default=_fingerprint_value)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _fingerprint_value(value: object) -> str:
+    # Callables (e.g. dynamic defaults) would otherwise be represented by their memory address.
+    if callable(value):
+        return _qualified_name(value)
+
+    return repr(value)
+
+
+def _qualified_name(obj: object) -> str:
+    module = getattr(obj, "__module__", None) or ""
+    name = getattr(obj, "__qualname__", None) or type(obj).__qualname__
+    return f"{module}.{name}"
+
+
 def _get_sub_commands(
     command: click.Command | click.Group, ctx: click.Context
 ) -> list[click.Command]:
@@ -119,18 +1084,47 @@ def _get_sub_commands(
 
     subcommands = []
 
-    for name in command.list_commands(ctx):
-        subcommand = command.get_command(ctx, name)
+    for name in _resolve(command, ctx):
+        subcommand = _resolve(command, ctx, name)
         assert subcommand is not None
         subcommands.append(subcommand)
 
     return subcommands
 
 
-def _make_title(ctx: click.Context, depth: int, *, has_attr_list: bool) -> Iterator[str]:
+def _resolve(group: click.Group, ctx: click.Context, name: str | None = None) -> Any:
+    """Call `list_commands()` or `get_command(name)` of a group, unless it is in `RESOLUTION_CACHE`."""
+    _add_build_dependency("lazy groups")
+    result = RESOLUTION_CACHE.get(group, name)
+    if result is None:
+        if name is None:
+            result = tuple(group.list_commands(ctx))
+        else:
+            result = group.get_command(ctx, name)
+        RESOLUTION_CACHE.set(group, name, result)
+
+    return result
+
+
+def _make_title(
+    ctx: click.Context,
+    depth: int,
+    *,
+    has_attr_list: bool,
+    anchors: AnchorScope,
+    templates: Templates | None = None,
+) -> Iterator[str]:
     """Create the Markdown heading for a command."""
-    if has_attr_list:
-        yield from _make_title_full_command_path(ctx, depth)
+    if templates is not None and "title" in templates:
+        yield from templates.render(
+            "title",
+            level="#" * (depth + 1),
+            name=cast(str, ctx.info_name),
+            command_path=ctx.command_path,
+            anchor=anchors.anchor(ctx.command_path),
+        )
+    elif has_attr_list:
+        yield from _make_title_full_command_path(ctx, depth, anchors)
     else:
         yield from _make_title_basic(ctx, depth)
 
@@ -141,7 +1135,9 @@ def _make_title_basic(ctx: click.Context, depth: int) -> Iterator[str]:
     yield ""
 
 
-def _make_title_full_command_path(ctx: click.Context, depth: int) -> Iterator[str]:
+def _make_title_full_command_path(
+    ctx: click.Context, depth: int, anchors: AnchorScope
+) -> Iterator[str]:
     """Create the markdown heading for a command, showing the full command path.
 
     This style accomodates nested commands by showing:
@@ -154,7 +1150,7 @@ def _make_title_full_command_path(ctx: click.Context, depth: int) -> Iterator[st
     See: https://github.com/mkdocs/mkdocs-click/issues/35
     """
     text = ctx.command_path  # 'git commit'
-    permalink = slugify(ctx.command_path, "-")  # 'git-commit'
+    permalink = anchors.anchor(ctx.command_path)  # 'git-commit'
     toc_label = ctx.info_name  # 'commit'
 
     # Requires `attr_list` extension, see: https://python-markdown.github.io/extensions/toc/#custom-labels
@@ -164,8 +1160,16 @@ def _make_title_full_command_path(ctx: click.Context, depth: int) -> Iterator[st
     yield ""
 
 
-def _make_description(ctx: click.Context, remove_ascii_art: bool = False) -> Iterator[str]:
+def _make_description(
+    ctx: click.Context, remove_ascii_art: bool = False, templates: Templates | None = None
+) -> Iterator[str]:
     """Create markdown lines based on the command's own description."""
+    if templates is not None and "description" in templates:
+        lines = list(_make_description(ctx, remove_ascii_art=remove_ascii_art))
+        if lines:
+            yield from templates.render("description", description="\n".join(lines).strip())
+        return
+
     help_string = ctx.command.help or ctx.command.short_help
 
     if not help_string:
@@ -193,14 +1197,34 @@ def _make_description(ctx: click.Context, remove_ascii_art: bool = False) -> Ite
     yield ""
 
 
-def _make_usage(ctx: click.Context) -> Iterator[str]:
+def _make_draft_description(
+    ctx: click.Context, remove_ascii_art: bool = False, templates: Templates | None = None
+) -> Iterator[str]:
+    """Create a markdown line with the first line of the command's description."""
+    for line in _make_description(ctx, remove_ascii_art=remove_ascii_art):
+        if line.strip() and line.strip() != "\b":
+            if templates is not None and "description" in templates:
+                yield from templates.render("description", description=line)
+            else:
+                yield line
+                yield ""
+            return
+
+
+def _make_usage(
+    ctx: click.Context, html: bool = False, templates: Templates | None = None
+) -> Iterator[str]:
     """Create the Markdown lines from the command usage string."""
+    usage = _get_usage(ctx)
 
-    # Gets the usual 'Usage' string without the prefix.
-    formatter = ctx.make_formatter()
-    pieces = ctx.command.collect_usage_pieces(ctx)
-    formatter.write_usage(ctx.command_path, " ".join(pieces), prefix="")
-    usage = formatter.getvalue().strip()
+    if templates is not None and "usage" in templates:
+        yield from templates.render("usage", usage=usage, command_path=ctx.command_path)
+        return
+
+    if html:
+        yield RawHtml(f"<p><strong>Usage:</strong></p>\n{_make_code_block_html([usage])}")
+        yield ""
+        return
 
     yield "**Usage:**"
     yield ""
@@ -210,62 +1234,95 @@ def _make_usage(ctx: click.Context) -> Iterator[str]:
     yield ""
 
 
+def _get_usage(ctx: click.Context) -> str:
+    """Get the usual 'Usage' string without the prefix."""
+    formatter = ctx.make_formatter()
+    pieces = ctx.command.collect_usage_pieces(ctx)
+    formatter.write_usage(ctx.command_path, " ".join(pieces), prefix="")
+    return formatter.getvalue().strip()
+
+
 def _make_options(
-    ctx: click.Context, style: str = "plain", show_hidden: bool = False
+    ctx: click.Context,
+    style: str = "plain",
+    show_hidden: bool = False,
+    html: bool = False,
+    templates: Templates | None = None,
 ) -> Iterator[str]:
     """Create the Markdown lines describing the options for the command."""
 
-    if style == "plain":
-        return _make_plain_options(ctx, show_hidden=show_hidden)
+    # Templated options are made of the cells of the table style, whatever the style.
+    if templates is not None and ("options" in templates or "option" in templates):
+        return _make_table_options(ctx, show_hidden=show_hidden, templates=templates)
+    elif style == "plain":
+        return _make_plain_options(ctx, show_hidden=show_hidden, html=html)
     elif style == "table":
-        return _make_table_options(ctx, show_hidden=show_hidden)
+        return _make_table_options(ctx, show_hidden=show_hidden, html=html)
     else:
         raise MkDocsClickException(
             f"{style} is not a valid option style, which must be either `plain` or `table`."
         )
 
 
-@contextmanager
-def _show_options(ctx: click.Context) -> Iterator[None]:
-    """Context manager that temporarily shows all hidden options."""
-    options = [
-        opt for opt in ctx.command.get_params(ctx) if isinstance(opt, click.Option) and opt.hidden
-    ]
+def _unhide_options(command: click.Command) -> click.Command:
+    """
+    Return a copy of the command where hidden options are shown.
 
-    try:
-        for option in options:
-            option.hidden = False
-        yield
-    finally:
-        for option in options:
-            option.hidden = True
+    Commands may be shared between threads, so they are never modified.
+    """
+    if not any(_is_hidden_option(param) for param in command.params):
+        return command
 
+    command = copy.copy(command)
+    command.params = [_unhide_option(param) for param in command.params]
+    return command
 
-def _make_plain_options(ctx: click.Context, show_hidden: bool = False) -> Iterator[str]:
-    """Create the plain style options description."""
-    with ExitStack() as stack:
-        if show_hidden:
-            stack.enter_context(_show_options(ctx))
 
-        formatter = ctx.make_formatter()
-        click.Command.format_options(ctx.command, ctx, formatter)
+def _unhide_option(param: click.Parameter) -> click.Parameter:
+    if not _is_hidden_option(param):
+        return param
 
-        option_lines = formatter.getvalue().splitlines()
+    option = cast(click.Option, copy.copy(param))
+    option.hidden = False
+    return option
 
-        # First line is redundant "Options"
-        option_lines = option_lines[1:]
 
-        # It's possible to define a command with no options, especially common when
-        # forwarding arguments to an external process.
-        if not option_lines:
-            return
+def _is_hidden_option(param: click.Parameter) -> bool:
+    return isinstance(param, click.Option) and param.hidden
 
-        yield "**Options:**"
-        yield ""
-        yield "```text"
-        yield from option_lines
-        yield "```"
+
+def _make_plain_options(
+    ctx: click.Context, show_hidden: bool = False, html: bool = False
+) -> Iterator[str]:
+    """Create the plain style options description."""
+    option_lines = _get_plain_option_lines(ctx, show_hidden=show_hidden)
+
+    # It's possible to define a command with no options, especially common when
+    # forwarding arguments to an external process.
+    if not option_lines:
+        return
+
+    if html:
+        yield RawHtml(f"<p><strong>Options:</strong></p>\n{_make_code_block_html(option_lines)}")
         yield ""
+        return
+
+    yield "**Options:**"
+    yield ""
+    yield "```text"
+    yield from option_lines
+    yield "```"
+    yield ""
+
+
+def _get_plain_option_lines(ctx: click.Context, show_hidden: bool = False) -> list[str]:
+    """Get the lines of the options section of the usual help page."""
+    command = _unhide_options(ctx.command) if show_hidden else ctx.command
+    formatter = ctx.make_formatter()
+    click.Command.format_options(command, ctx, formatter)
+
+    # First line is redundant "Options"
+    return formatter.getvalue().splitlines()[1:]
 
 
 # Unicode "Vertical Line" character (U+007C), HTML-compatible.
@@ -310,6 +1367,11 @@ def _format_table_option_type(option: click.Option) -> str:
 
 
 def _format_table_option_row(option: click.Option) -> str:
+    # -> "| `-V`, `--version` / `--show-version` | boolean | Show version info. | `False` |"
+    return f"| {' | '.join(_format_table_option_cells(option))} |"
+
+
+def _format_table_option_cells(option: click.Option) -> tuple[str, str, str, str]:
     # Example: @click.option("-V, --version/--show-version", is_flag=True, help="Show version info.")
 
     # -> "`-V`, `--version`"
@@ -330,21 +1392,43 @@ def _format_table_option_row(option: click.Option) -> str:
     none_default_msg = "_required" if option.required else "None"
     default = f"`{option.default}`" if option.default is not None else none_default_msg
 
-    # -> "| `-V`, `--version` / `--show-version` | boolean | Show version info. | `False` |"
-    return f"| {names} | {value_type} | {description} | {default} |"
+    return names, value_type, description, default
 
 
-def _make_table_options(ctx: click.Context, show_hidden: bool = False) -> Iterator[str]:
+def _make_table_options(
+    ctx: click.Context,
+    show_hidden: bool = False,
+    html: bool = False,
+    templates: Templates | None = None,
+) -> Iterator[str]:
     """Create the table style options description."""
 
+    options = _get_table_options(ctx, show_hidden=show_hidden)
+    yield from _make_table_options_section(options, html=html, templates=templates)
+
+
+def _get_table_options(ctx: click.Context, show_hidden: bool = False) -> list[click.Option]:
     options = [param for param in ctx.command.get_params(ctx) if isinstance(param, click.Option)]
-    options = [option for option in options if not option.hidden or show_hidden]
+    return [option for option in options if not option.hidden or show_hidden]
+
 
+def _make_table_options_section(
+    options: list[click.Option], html: bool = False, templates: Templates | None = None
+) -> Iterator[str]:
     # It's possible to define a command with no options, especially common when
     # forwarding arguments to an external process.
     if not options:
         return
 
+    if templates is not None and ("options" in templates or "option" in templates):
+        yield from _make_templated_options(options, templates)
+        return
+
+    if html:
+        yield RawHtml(f"<p><strong>Options:</strong></p>\n{_make_table_html(options)}")
+        yield ""
+        return
+
     option_rows = [_format_table_option_row(option) for option in options]
 
     yield "**Options:**"
@@ -355,31 +1439,201 @@ def _make_table_options(ctx: click.Context, show_hidden: bool = False) -> Iterat
     yield ""
 
 
+def _make_templated_options(options: list[click.Option], templates: Templates) -> Iterator[str]:
+    """Create the options description from the `option` and `options` templates, or the table style."""
+    if "option" in templates:
+        rows = [
+            templates.render_text(
+                "option", names=names, type=value_type, help=description, default=default
+            )
+            for names, value_type, description, default in map(_format_table_option_cells, options)
+        ]
+    else:
+        rows = [_format_table_option_row(option) for option in options]
+
+    if "options" in templates:
+        yield from templates.render("options", rows="\n".join(rows))
+        return
+
+    yield "**Options:**"
+    yield ""
+    # Rows of the `option` template are not table rows.
+    if "option" not in templates:
+        yield "| Name | Type | Description | Default |"
+        yield "| ---- | ---- | ----------- | ------- |"
+    yield from rows
+    yield ""
+
+
+def _make_deduplicated_table_options(
+    ctx: click.Context,
+    inherited_options: InheritedOptions,
+    show_hidden: bool,
+    html: bool,
+    has_attr_list: bool,
+    anchors: AnchorScope,
+    templates: Templates | None = None,
+) -> Generator[str, None, InheritedOptions]:
+    """Create the table style options description, leaving out the options rendered by a parent command.
+
+    Return the options that sub-commands inherit, including those first rendered here.
+    """
+    # The help option of each command is documented on its own. Depending on the version of Click, it may
+    # be created anew on every call, so it is recognized by its names.
+    help_option = ctx.command.get_help_option(ctx)
+    help_names = help_option.opts if help_option is not None else None
+
+    own: list[click.Option] = []
+    inherited: dict[click.Context, list[click.Option]] = {}
+    new_options = dict(inherited_options)
+
+    for option in _get_table_options(ctx, show_hidden=show_hidden):
+        row = _format_table_option_cells(option)
+        if option.opts == help_names:
+            own.append(option)
+        elif row in inherited_options:
+            inherited.setdefault(inherited_options[row], []).append(option)
+        else:
+            own.append(option)
+            new_options[row] = ctx
+
+    yield from _make_table_options_section(own, html=html, templates=templates)
+
+    for owner, options in inherited.items():
+        names = ", ".join(f"`{max(option.opts, key=len)}`" for option in options)
+        command = (
+            f"[{owner.command_path}](#{anchors.anchor(owner.command_path)})"
+            if has_attr_list
+            else f"`{owner.command_path}`"
+        )
+        yield f"**Inherited options:** {names} (see {command})"
+        yield ""
+
+    return new_options
+
+
+class RawHtml(str):
+    """
+    A line of HTML, to be stashed by the Markdown processor instead of being parsed again.
+
+    HTML sections are rendered exactly as Python-Markdown (with the `fenced_code` and `tables` extensions)
+    would render their Markdown counterpart, except that Markdown in option help texts is not interpreted.
+    """
+
+
+def _make_code_block_html(lines: list[str]) -> str:
+    code = "".join(f"{line}\n" for line in lines)
+    code = (
+        code.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    )
+    return f'<pre><code class="language-text">{code}</code></pre>'
+
+
+def _make_table_html(options: list[click.Option]) -> str:
+    header = "".join(f"<th>{name}</th>\n" for name in ("Name", "Type", "Description", "Default"))
+    rows = "".join(
+        "<tr>\n"
+        + "".join(
+            f"<td>{_table_cell_html(cell)}</td>\n" for cell in _format_table_option_cells(option)
+        )
+        + "</tr>\n"
+        for option in options
+    )
+    return f"<table>\n<thead>\n<tr>\n{header}</tr>\n</thead>\n<tbody>\n{rows}</tbody>\n</table>"
+
+
+def _table_cell_html(cell: str) -> str:
+    # Only code spans are converted, and entities such as `_HTML_PIPE` are kept.
+    parts = re.split(r"`([^`]*)`", cell.strip())
+    for i, part in enumerate(parts):
+        if i % 2:
+            part = part.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            parts[i] = f"<code>{part}</code>"
+        else:
+            part = re.sub(r"&(?!#?\w+;)", "&amp;", part)
+            parts[i] = part.replace("<", "&lt;").replace(">", "&gt;")
+    return "".join(parts)
+
+
 def _make_subcommands_links(
     subcommands: list[click.Command],
     parent: click.Context,
     has_attr_list: bool,
     show_hidden: bool,
+    anchors: AnchorScope,
+    templates: Templates | None = None,
 ) -> Iterator[str]:
-    yield "**Subcommands**"
-    yield ""
+    entries = []
     for command in subcommands:
         command_name = cast(str, command.name)
         ctx = _build_command_context(command_name, command, parent)
         if ctx.command.hidden and not show_hidden:
             continue
-        command_bullet = (
-            command_name
-            if not has_attr_list
-            else f"[{command_name}](#{slugify(ctx.command_path, '-')})"
-        )
-        help_string = ctx.command.short_help or ctx.command.help
-        if help_string is not None:
-            help_string = help_string.splitlines()[0]
+        if templates is not None and "subcommand" in templates:
+            entry = templates.render_text(
+                "subcommand",
+                name=command_name,
+                command_path=ctx.command_path,
+                anchor=anchors.anchor(ctx.command_path),
+                summary=_get_command_summary(ctx),
+            )
         else:
-            help_string = "*No description was provided with this command.*"
-        yield f"- *{command_bullet}*: {help_string}"
+            entry = _make_command_link(ctx, has_attr_list=has_attr_list, anchors=anchors)
+        entries.append(entry)
+
+    if templates is not None and "subcommands" in templates:
+        yield from templates.render("subcommands", entries="\n".join(entries))
+        return
+
+    yield "**Subcommands**"
     yield ""
+    yield from entries
+    yield ""
+
+
+def _make_command_link(ctx: click.Context, has_attr_list: bool, anchors: AnchorScope) -> str:
+    """Create the Markdown bullet describing a command, linking to its section if possible."""
+    command_bullet = (
+        ctx.info_name
+        if not has_attr_list
+        else f"[{ctx.info_name}](#{anchors.anchor(ctx.command_path)})"
+    )
+    return f"- *{command_bullet}*: {_get_command_summary(ctx)}"
+
+
+def _make_command_page_link(ctx: click.Context, url: str) -> str:
+    """Create the Markdown bullet describing a command, linking to its own page."""
+    return f"- *[{ctx.info_name}]({url})*: {_get_command_summary(ctx)}"
+
+
+def _make_fragment_details(ctx: click.Context, url: str) -> Iterator[str]:
+    """Create the HTML element which the documentation of a command is loaded into when expanded."""
+    help_string = ctx.command.short_help or ctx.command.help
+    summary = (
+        escape(help_string.splitlines()[0])
+        if help_string is not None
+        else "<em>No description was provided with this command.</em>"
+    )
+    yield f'<details class="mkdocs-click-fragment" data-mkdocs-click-fragment="{escape(url)}">'
+    yield f"<summary><em>{escape(cast(str, ctx.info_name))}</em>: {summary}</summary>"
+    yield "</details>"
+    yield ""
+
+
+def _get_command_summary(ctx: click.Context) -> str:
+    help_string = ctx.command.short_help or ctx.command.help
+    if help_string is not None:
+        return help_string.splitlines()[0]
+
+    return "*No description was provided with this command.*"
+
+
+def _make_command_reference(ctx: click.Context, has_attr_list: bool, anchors: AnchorScope) -> str:
+    """Create the Markdown line referring to the documentation of a command rendered elsewhere."""
+    if has_attr_list:
+        return f"Same as [{ctx.command_path}](#{anchors.anchor(ctx.command_path)})."
+
+    return f"Same as `{ctx.command_path}`."
 
 
 def _is_command_group(command: click.Command) -> bool:
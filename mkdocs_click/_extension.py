@@ -3,41 +3,453 @@
 # Licensed under the Apache license (see LICENSE)
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import chain
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 from markdown.extensions import Extension
 from markdown.extensions.attr_list import AttrListExtension
 from markdown.preprocessors import Preprocessor
+from markdown.util import parseBoolValue
 
-from ._docs import make_command_docs
+from ._anchors import AnchorRegistry
+from ._cache import LRUCache
+from ._daemon import request_block
+from ._docs import (
+    SUBTREE_CACHE,
+    RawHtml,
+    get_build_id,
+    make_command_docs,
+    make_commands_index,
+    make_commands_index_entry,
+    track_build_dependencies,
+)
 from ._exceptions import MkDocsClickException
-from ._loader import load_command
+from ._loader import (
+    find_console_scripts,
+    get_dependency_modules,
+    get_file_signature,
+    get_package_modules,
+    get_source_signature,
+    load_command,
+    load_console_script,
+    track_imports,
+    unload_modules,
+    wait_for_warmups,
+    warm_up,
+)
+from ._manifest import load_manifest, load_timings, parse_shard, parse_target
 from ._processing import replace_blocks
+from ._snapshots import get_snapshot_path, load_snapshot, make_changes_index
+from ._templates import get_template_files, load_templates
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
 
+    import click
+
+    from ._anchors import AnchorScope
+    from ._docs import SubtreeCache
+
+log = logging.getLogger("mkdocs.extensions.mkdocs_click")
+
+
+class _Block(NamedTuple):
+    """The rendered documentation of a block, along with what it depends on."""
+
+    lines: list[str]
+    anchors: tuple[tuple[str, str], ...]
+    signature: tuple[tuple[str, int, int], ...]
+    # The build the block is limited to, if it used lazy groups or dynamic defaults.
+    build: str | None = None
+
+    def is_valid(self) -> bool:
+        return (self.build is None or self.build == get_build_id()) and get_file_signature(
+            path for path, _, _ in self.signature
+        ) == self.signature
+
+
+# Blocks whose modules were unloaded after rendering, so that they need not be imported again.
+BLOCK_CACHE: LRUCache[tuple, _Block] = LRUCache(maxsize=256)
+
+
+class _Script(NamedTuple):
+    """The index entry and documentation of a console script, which are empty if it is not a Click command."""
+
+    link: list[str]
+    block: _Block
+
+
+# Console scripts rendered in worker processes or with modules imported for them, by block options.
+SCRIPT_CACHE: LRUCache[tuple, _Script] = LRUCache(maxsize=256)
+
+# The modules loaded when a worker process started, as workers render several scripts in turn.
+_WORKER_MODULES: set[str] = set()
+
+
+def _init_worker() -> None:
+    _WORKER_MODULES.update(sys.modules)
+
+
+def replace_command_docs(
+    has_attr_list: bool = False,
+    cache: SubtreeCache | None = SUBTREE_CACHE,
+    anchors: AnchorRegistry | None = None,
+    imported_modules: set[str] | None = None,
+    unload_dependencies: bool = False,
+    **options: Any,
+) -> Iterator[str]:
+    """
+    With `imported_modules`, the names of the modules imported to render the block from the packages of
+    its commands are added to it, to be unloaded, and the result is cached until the source files of all
+    modules imported to render it change. With `unload_dependencies`, the modules of the other packages
+    it imported are added too.
+    """
+    if anchors is None:
+        anchors = AnchorRegistry()
+
+    if imported_modules is not None and not options.get("static", False):
+        return iter(
+            _replace_command_docs_cached(
+                has_attr_list=has_attr_list,
+                cache=cache,
+                anchors=anchors,
+                imported_modules=imported_modules,
+                unload_dependencies=unload_dependencies,
+                options=options,
+            )
+        )
+
+    return _replace_command_docs(
+        has_attr_list=has_attr_list, cache=cache, anchors=anchors, **options
+    )
+
+
+def _replace_command_docs_cached(
+    has_attr_list: bool,
+    cache: SubtreeCache | None,
+    anchors: AnchorRegistry,
+    imported_modules: set[str],
+    unload_dependencies: bool,
+    options: dict[str, Any],
+) -> list[str]:
+    key = (has_attr_list, tuple(sorted(options.items())))
+    block = BLOCK_CACHE.get(key)
+    if block is not None and block.is_valid() and anchors.claim_all(block.anchors):
+        return block.lines
+
+    start = len(anchors.claims)
+    # Commands may import modules lazily, so render the whole block while tracking imports.
+    with track_imports() as added, track_build_dependencies() as dependencies:
+        lines = list(
+            _replace_command_docs(
+                has_attr_list=has_attr_list, cache=cache, anchors=anchors, **options
+            )
+        )
+
+    imported_modules.update(get_package_modules(added, _get_target_modules(options)))
+    if unload_dependencies:
+        imported_modules.update(get_dependency_modules(added))
+    # Modules that were already loaded stay loaded, so only blocks which imported something are cached.
+    if added:
+        signature = get_source_signature(added)
+        if options.get("manifest"):
+            signature = get_file_signature(
+                [*(path for path, _, _ in signature), options["manifest"]]
+            )
+        if options.get("templates"):
+            signature = get_file_signature(
+                [*(path for path, _, _ in signature), *get_template_files(options["templates"])]
+            )
+        build = get_build_id() if dependencies else None
+        BLOCK_CACHE.set(key, _Block(lines, tuple(anchors.claims[start:]), signature, build))
+
+    return lines
+
+
+def _get_target_modules(options: dict[str, Any]) -> list[str]:
+    """Return the modules of the commands that a block documents."""
+    if "distribution" in options:
+        return [module for _, module, _ in find_console_scripts(options["distribution"])]
+
+    if "manifest" in options:
+        return [
+            entry["module"] for entry in load_manifest(options["manifest"]) if "module" in entry
+        ]
+
+    if "commands" in options:
+        return [parse_target(target)[0] for target in options["commands"].split(",")]
+
+    return [options["module"]] if "module" in options else []
+
+
+def _replace_command_docs(
+    has_attr_list: bool,
+    cache: SubtreeCache | None,
+    anchors: AnchorRegistry,
+    **options: Any,
+) -> Iterator[str]:
+    if "distribution" in options:
+        return _replace_distribution_command_docs(
+            has_attr_list=has_attr_list, cache=cache, anchors=anchors, **options
+        )
+
+    if "snapshots" in options:
+        return _replace_snapshot_command_docs(
+            has_attr_list=has_attr_list, cache=cache, anchors=anchors, **options
+        )
+
+    if "commands" in options or "manifest" in options:
+        return _replace_multiple_command_docs(
+            has_attr_list=has_attr_list, cache=cache, anchors=anchors, **options
+        )
 
-def replace_command_docs(has_attr_list: bool = False, **options: Any) -> Iterator[str]:
     for option in ("module", "command"):
         if option not in options:
             raise MkDocsClickException(f"Option {option!r} is required")
 
-    module = options["module"]
-    command = options["command"]
-    prog_name = options.get("prog_name")
+    command_obj = load_command(
+        options["module"], options["command"], static=options.get("static", False)
+    )
+
+    return _make_block_docs(
+        command_obj, options, has_attr_list=has_attr_list, cache=cache, anchors=anchors.scope()
+    )
+
+
+def _replace_multiple_command_docs(
+    has_attr_list: bool,
+    cache: SubtreeCache | None,
+    anchors: AnchorRegistry,
+    **options: Any,
+) -> Iterator[str]:
+    """Document several commands, listed in `:commands:` or in a `:manifest:` file, with a shared index."""
+    commands = options.pop("commands", None)
+    manifest = options.pop("manifest", None)
+
+    if manifest:
+        entries = [{**options, **entry} for entry in load_manifest(manifest)]
+    else:
+        entries = []
+        for target in commands.split(","):
+            module, command = parse_target(target)
+            entries.append({**options, "module": module, "command": command})
+
+    for entry in entries:
+        for option in ("module", "command"):
+            if option not in entry:
+                raise MkDocsClickException(f"Option {option!r} is required for every command")
+
+    # Imports of distinct modules are independent, so let them overlap.
+    with ThreadPoolExecutor() as executor:
+        command_objs = list(
+            executor.map(
+                lambda entry: load_command(
+                    entry["module"], entry["command"], static=entry.get("static", False)
+                ),
+                entries,
+            )
+        )
+
+    scopes = [anchors.scope() for _ in entries]
+    index = make_commands_index(
+        [(_get_prog_name(obj, entry), obj) for obj, entry in zip(command_objs, entries)],
+        has_attr_list=has_attr_list,
+        show_hidden=options.get("show_hidden", False),
+        anchors=scopes,
+    )
+
+    return chain(
+        index,
+        *(
+            _make_block_docs(obj, entry, has_attr_list=has_attr_list, cache=cache, anchors=scope)
+            for obj, entry, scope in zip(command_objs, entries, scopes)
+        ),
+    )
+
+
+def _replace_snapshot_command_docs(
+    has_attr_list: bool,
+    cache: SubtreeCache | None,
+    anchors: AnchorRegistry,
+    **options: Any,
+) -> Iterator[str]:
+    """
+    Document the command of the `:version:` snapshot in `:snapshots:`, or the changes between all of them.
+    """
+    if options.get("changes", False):
+        return make_changes_index(
+            options["snapshots"],
+            depth=int(options.get("depth", 0)),
+            show_hidden=options.get("show_hidden", False),
+        )
+
+    if "version" not in options:
+        raise MkDocsClickException("Option 'version' or 'changes' is required with 'snapshots'")
+
+    prog_name, command_obj = load_snapshot(
+        get_snapshot_path(options["snapshots"], options["version"])
+    )
+    return _make_block_docs(
+        command_obj,
+        {"prog_name": prog_name, **options},
+        has_attr_list=has_attr_list,
+        cache=cache,
+        anchors=anchors.scope(),
+    )
+
+
+def _replace_distribution_command_docs(
+    has_attr_list: bool,
+    cache: SubtreeCache | None,
+    anchors: AnchorRegistry,
+    **options: Any,
+) -> Iterator[str]:
+    """
+    Document the Click commands among the console scripts of the `:distribution:`, with a shared index.
+
+    Scripts are imported and rendered in parallel worker processes, as Click commands cannot be sent between
+    processes. Their documentation is cached until the source files of the modules they imported change.
+    """
+    distribution = options.pop("distribution")
+    scripts = find_console_scripts(distribution)
+    keys = [(has_attr_list, script, tuple(sorted(options.items()))) for script in scripts]
+
+    results: list[_Script | None] = []
+    for key in keys:
+        result = SCRIPT_CACHE.get(key)
+        if result is not None and not result.block.is_valid():
+            result = None
+        results.append(result)
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    render = partial(_render_script, options=options, has_attr_list=has_attr_list)
+    if len(missing) > 1:
+        # MkDocs serves pages from threads, which forked processes would not be safe with.
+        with ProcessPoolExecutor(
+            max_workers=min(len(missing), os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        ) as executor:
+            rendered = list(executor.map(render, [scripts[i] for i in missing]))
+    else:
+        rendered = [render(scripts[i], cache=cache) for i in missing]
+
+    for i, result in zip(missing, rendered):
+        # Scripts rendered in worker processes are limited to the build of this process.
+        if result.block.build is not None:
+            result = result._replace(block=result.block._replace(build=get_build_id()))
+        results[i] = result
+        # Modules that were already loaded are not tracked, so only scripts which imported something are cached.
+        if result.block.signature:
+            SCRIPT_CACHE.set(keys[i], result)
+
+    links: list[str] = []
+    blocks: list[list[str]] = []
+    for script, result in zip(scripts, results):
+        assert result is not None
+        if not result.block.lines:
+            continue
+
+        # Other blocks of the page may already use some of the anchors.
+        if not anchors.claim_all(result.block.anchors):
+            result = render(script, cache=cache, anchors=anchors)
+
+        links.extend(result.link)
+        blocks.append(result.block.lines)
+
+    if not blocks:
+        raise MkDocsClickException(f"Distribution {distribution!r} has no Click console scripts")
+
+    return chain(["**Commands**", "", *links, ""], *blocks)
+
+
+def _render_script(
+    script: tuple[str, str, str],
+    options: dict[str, Any],
+    has_attr_list: bool,
+    cache: SubtreeCache | None = SUBTREE_CACHE,
+    anchors: AnchorRegistry | None = None,
+) -> _Script:
+    """
+    Render the index entry and documentation of a console script, named after it.
+
+    Unless `anchors` are given, the anchors are claimed from a registry of their own, to be claimed again
+    on the page.
+    """
+    name, module, attribute = script
+    registry = AnchorRegistry() if anchors is None else anchors
+    start = len(registry.claims)
+
+    with track_imports() as added, track_build_dependencies() as dependencies:
+        command_obj = load_console_script(module, attribute)
+        if command_obj is None:
+            link: list[str] = []
+            lines: list[str] = []
+        else:
+            scope = registry.scope()
+            link = list(
+                make_commands_index_entry(
+                    name,
+                    command_obj,
+                    has_attr_list=has_attr_list,
+                    show_hidden=options.get("show_hidden", False),
+                    anchors=scope,
+                )
+            )
+            lines = list(
+                _make_block_docs(
+                    command_obj,
+                    {**options, "prog_name": name},
+                    has_attr_list=has_attr_list,
+                    cache=cache,
+                    anchors=scope,
+                )
+            )
+
+    # In worker processes, the documentation also depends on the modules imported for previous scripts.
+    imported = (
+        [name for name in sys.modules if name not in _WORKER_MODULES] if _WORKER_MODULES else added
+    )
+    build = get_build_id() if dependencies else None
+    return _Script(
+        link,
+        _Block(lines, tuple(registry.claims[start:]), get_source_signature(imported), build),
+    )
+
+
+def _make_block_docs(
+    command_obj: click.Command,
+    options: dict[str, Any],
+    has_attr_list: bool,
+    cache: SubtreeCache | None,
+    anchors: AnchorScope,
+) -> Iterator[str]:
     depth = int(options.get("depth", 0))
     style = options.get("style", "plain")
     remove_ascii_art = options.get("remove_ascii_art", False)
     show_hidden = options.get("show_hidden", False)
     list_subcommands = options.get("list_subcommands", False)
-
-    command_obj = load_command(module, command)
-
-    prog_name = prog_name or command_obj.name or command
+    html = options.get("html", False)
+    draft = options.get("draft", False)
+    draft_depth = options.get("draft_depth")
+    dedupe_options = options.get("dedupe_options", False)
+    dedupe_commands = options.get("dedupe_commands", False)
+    shard = options.get("shard")
+    shard_timings = options.get("shard_timings")
+    templates = options.get("templates")
+    evaluate_defaults = options.get("evaluate_defaults")
 
     return make_command_docs(
-        prog_name=prog_name,
+        prog_name=_get_prog_name(command_obj, options),
         command=command_obj,
         depth=depth,
         style=style,
@@ -45,27 +457,192 @@ def replace_command_docs(has_attr_list: bool = False, **options: Any) -> Iterato
         show_hidden=show_hidden,
         list_subcommands=list_subcommands,
         has_attr_list=has_attr_list,
+        html=html,
+        cache=cache,
+        anchors=anchors,
+        draft=draft,
+        draft_depth=None if draft_depth is None else int(draft_depth),
+        dedupe_options=dedupe_options,
+        dedupe_commands=dedupe_commands,
+        shard=None if shard is None else parse_shard(shard),
+        weights=None if shard_timings is None else load_timings(shard_timings),
+        # Set by `mkdocs-click render --record-timings`.
+        timings=options.get("record_timings"),
+        templates=load_templates(templates) if templates else None,
+        evaluate_defaults=float(evaluate_defaults) if evaluate_defaults else None,
     )
 
 
+def _get_prog_name(command_obj: click.Command, options: dict[str, Any]) -> str:
+    return options.get("prog_name") or command_obj.name or options["command"]
+
+
 class ClickProcessor(Preprocessor):
-    def __init__(self, md: Any) -> None:
+    def __init__(
+        self,
+        md: Any,
+        unload_modules: bool = False,
+        unload_dependencies: bool = False,
+        draft: bool = False,
+        draft_depth: int | None = None,
+        templates: str = "",
+        evaluate_defaults: float = 0,
+        daemon: bool = False,
+    ) -> None:
         super().__init__(md)
         self._has_attr_list = any(
             isinstance(ext, AttrListExtension) for ext in md.registeredExtensions
         )
+        self._unload_modules = unload_modules
+        self._unload_dependencies = unload_dependencies
+        self._draft: dict[str, Any] = {"draft": True, "draft_depth": draft_depth} if draft else {}
+        # Blocks may use their own templates and time budget.
+        self._defaults: dict[str, Any] = {"templates": templates} if templates else {}
+        if evaluate_defaults:
+            self._defaults["evaluate_defaults"] = evaluate_defaults
+        self._daemon = daemon
+        self.html_blocks: list[str] = []
 
     def run(self, lines: list[str]) -> list[str]:
-        return list(
-            replace_blocks(
+        if not self._unload_modules:
+            return self._run(lines, imported_modules=None)
+
+        with _PENDING_UNLOADS.page() as imported_modules:
+            return self._run(lines, imported_modules=imported_modules)
+
+    def _run(self, lines: list[str], imported_modules: set[str] | None) -> list[str]:
+        # Anchors must be unique across all blocks of the page.
+        anchors = AnchorRegistry()
+        self.html_blocks = []
+
+        return [
+            self._mark_html(line) if isinstance(line, RawHtml) else line
+            for line in replace_blocks(
                 lines,
                 title="mkdocs-click",
-                replace=lambda **options: replace_command_docs(
-                    has_attr_list=self._has_attr_list, **options
+                replace=lambda **options: self._replace(
+                    {**self._defaults, **options, **self._draft}, anchors, imported_modules
                 ),
             )
+        ]
+
+    def _replace(
+        self, options: dict[str, Any], anchors: AnchorRegistry, imported_modules: set[str] | None
+    ) -> Iterator[str]:
+        if self._daemon:
+            lines = request_block(
+                options,
+                has_attr_list=self._has_attr_list,
+                anchors=anchors,
+                build=get_build_id(),
+            )
+            if lines is not None:
+                return iter(lines)
+
+        return replace_command_docs(
+            has_attr_list=self._has_attr_list,
+            anchors=anchors,
+            imported_modules=imported_modules,
+            unload_dependencies=self._unload_dependencies,
+            **options,
         )
 
+    def _mark_html(self, html: str) -> str:
+        self.html_blocks.append(html)
+        return _HTML_MARKER.format(len(self.html_blocks) - 1)
+
+
+class _PendingUnloads:
+    """
+    Modules imported for pages, to unload once no page is being rendered or, during a build of the
+    plugin, once the build is done.
+
+    Pages may be rendered in threads, and unloading modules while another page uses them would break it.
+    Commands documented on several pages of a build are only imported once when unloading is deferred.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pages = 0
+        self._deferred = False
+        self._modules: set[str] = set()
+
+    def defer(self) -> None:
+        """Keep the modules imported for pages loaded until `unload`."""
+        with self._lock:
+            self._deferred = True
+
+    def unload(self) -> None:
+        """Unload the modules imported for pages so far, and stop deferring."""
+        with self._lock:
+            self._deferred = False
+            if not self._pages and self._modules:
+                self._unload()
+
+    @contextmanager
+    def page(self) -> Iterator[set[str]]:
+        """Collect the modules imported to render a page, in the yielded set."""
+        with self._lock:
+            self._pages += 1
+
+        imported_modules: set[str] = set()
+        try:
+            yield imported_modules
+        finally:
+            with self._lock:
+                self._pages -= 1
+                self._modules.update(imported_modules)
+                if not self._pages and not self._deferred and self._modules:
+                    self._unload()
+
+    def _unload(self) -> None:
+        # Modules being imported in the background may have been recorded as imported for a page.
+        wait_for_warmups()
+        removed, reclaimed = unload_modules(self._modules)
+        self._modules = set()
+
+        if tracemalloc.is_tracing():
+            log.info("Unloaded %d modules, reclaimed %.1f KiB", removed, reclaimed / 1024)
+        else:
+            log.info("Unloaded %d modules, reclaimed %d memory blocks", removed, reclaimed)
+
+
+_PENDING_UNLOADS = _PendingUnloads()
+
+
+def defer_unloads() -> None:
+    """Keep the modules imported for pages loaded until the end of the build."""
+    _PENDING_UNLOADS.defer()
+
+
+def unload_pending_modules() -> None:
+    """Unload the modules imported for the pages of the build that ended."""
+    _PENDING_UNLOADS.unload()
+
+
+# Placeholders for pre-rendered HTML, as stash placeholders would not survive whitespace normalization.
+_HTML_MARKER = "mkdocs-click-html:{}"
+
+
+class ClickHtmlProcessor(Preprocessor):
+    """
+    Store the HTML pre-rendered by a `ClickProcessor` in the HTML stash, so that it is not parsed again.
+    """
+
+    def __init__(self, md: Any, processor: ClickProcessor) -> None:
+        super().__init__(md)
+        self._processor = processor
+
+    def run(self, lines: list[str]) -> list[str]:
+        html_blocks = self._processor.html_blocks
+        if not html_blocks:
+            return lines
+
+        markers = {_HTML_MARKER.format(i): html for i, html in enumerate(html_blocks)}
+        return [
+            self.md.htmlStash.store(markers[line]) if line in markers else line for line in lines
+        ]
+
 
 class MKClickExtension(Extension):
     """
@@ -78,11 +655,92 @@ class MKClickExtension(Extension):
     by Markdown documentation generated from the specified Click application.
     """
 
+    def __init__(self, **kwargs: Any) -> None:
+        self.config = {
+            "unload_modules": [
+                False,
+                (
+                    "Unload the modules imported to document commands once a page is rendered, or "
+                    "once the build is done with the mkdocs-click plugin - Default: False"
+                ),
+            ],
+            "unload_dependencies": [
+                False,
+                (
+                    "With unload_modules, also unload the modules of other packages imported to "
+                    "document commands, except the standard library - Default: False"
+                ),
+            ],
+            "draft": [
+                "false",
+                (
+                    "Only render titles, the first line of descriptions and usages: true, false, "
+                    "or 'serve' for `mkdocs serve` only. Overridden by the MKDOCS_CLICK_DRAFT "
+                    "environment variable - Default: false"
+                ),
+            ],
+            "draft_depth": [
+                1,
+                "Number of sub-command levels to render in draft mode - Default: 1",
+            ],
+            "warmup": [
+                [],
+                (
+                    "Commands to start loading in the background, as '<module>:<command>' "
+                    "- Default: []"
+                ),
+            ],
+            "daemon": [
+                False,
+                (
+                    "Render blocks in a local daemon keeping commands imported between builds, "
+                    "started on demand - Default: False"
+                ),
+            ],
+            "templates": [
+                "",
+                (
+                    "Directory of templates for the sections of commands, used by blocks without "
+                    "a `templates` option - Default: ''"
+                ),
+            ],
+            "evaluate_defaults": [
+                0,
+                (
+                    "Seconds each callable default of options may take to be evaluated and "
+                    "documented by its value, or 0 to document them as dynamic - Default: 0"
+                ),
+            ],
+        }
+        super().__init__(**kwargs)
+
+        # MkDocs configures extensions when loading its configuration, well before the first page.
+        warm_up(parse_target(target) for target in self.getConfig("warmup"))
+
     def extendMarkdown(self, md: Any) -> None:
         md.registerExtension(self)
-        processor = ClickProcessor(md)
+        processor = ClickProcessor(
+            md,
+            unload_modules=self.getConfig("unload_modules"),
+            unload_dependencies=self.getConfig("unload_dependencies"),
+            draft=_is_draft(os.environ.get("MKDOCS_CLICK_DRAFT", self.getConfig("draft"))),
+            draft_depth=self.getConfig("draft_depth"),
+            templates=self.getConfig("templates"),
+            evaluate_defaults=self.getConfig("evaluate_defaults"),
+            daemon=self.getConfig("daemon"),
+        )
         md.preprocessors.register(processor, "mk_click", 141)
+        # Runs right after `normalize_whitespace`, which would strip stash placeholders.
+        md.preprocessors.register(ClickHtmlProcessor(md, processor), "mk_click_html", 29)
+
+
+def _is_draft(setting: str | bool) -> bool:
+    if str(setting).lower() == "serve":
+        # `mkdocs serve` or `python -m mkdocs serve`.
+        return sys.argv[1:2] == ["serve"]
+
+    return bool(parseBoolValue(str(setting), fail_on_errors=False))
 
 
-def makeExtension() -> Extension:
-    return MKClickExtension()
+def makeExtension(**kwargs: Any) -> Extension:
+    return MKClickExtension(**kwargs)
@@ -3,21 +3,43 @@
 # Licensed under the Apache license (see LICENSE)
 from __future__ import annotations
 
+import gc
 import importlib
-from typing import Any
+import importlib.metadata
+import os
+import sys
+import sysconfig
+import threading
+import tracemalloc
+from contextlib import contextmanager, suppress
+from typing import TYPE_CHECKING, Any
 
 import click
 
 from ._exceptions import MkDocsClickException
+from ._static import StaticLoadError, load_command_statically
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
 
-def load_command(module: str, attribute: str) -> click.Command:
+
+def load_command(module: str, attribute: str, static: bool = False) -> click.Command:
     """
     Load and return the Click command object located at '<module>:<attribute>'.
+
+    With `static`, the command is rebuilt from the module's source if possible, which avoids importing
+    the module and its dependencies.
     """
-    command = _load_obj(module, attribute)
+    with _module_lock(module):
+        if static and module not in sys.modules:
+            try:
+                return load_command_statically(module, attribute)
+            except StaticLoadError:
+                pass
+
+        command = _load_obj(module, attribute)
 
-    if not (isinstance(command, click.Command) or hasattr(command, "context_class")):
+    if not _is_command(command):
         raise MkDocsClickException(
             f"{attribute!r} must be a 'click.Command'-like object, got {type(command)}"
         )
@@ -25,6 +47,97 @@ def load_command(module: str, attribute: str) -> click.Command:
     return command
 
 
+def find_console_scripts(distribution: str) -> list[tuple[str, str, str]]:
+    """
+    Return the name, module and attribute of the console scripts of an installed distribution, by name.
+    """
+    try:
+        entry_points = importlib.metadata.distribution(distribution).entry_points
+    except importlib.metadata.PackageNotFoundError:
+        raise MkDocsClickException(f"Distribution {distribution!r} is not installed") from None
+
+    return sorted(
+        (entry_point.name, entry_point.module, entry_point.attr)
+        for entry_point in entry_points
+        if entry_point.group == "console_scripts"
+    )
+
+
+def load_console_script(module: str, attribute: str) -> click.Command | None:
+    """
+    Load the object of a console script, or return `None` if it is not a Click command.
+
+    The attribute of an entry point may be a dotted path, e.g. `main.cli`.
+    """
+    name, *path = attribute.split(".")
+    with _module_lock(module):
+        obj = _load_obj(module, name)
+
+    for part in path:
+        obj = getattr(obj, part, None)
+
+    return obj if _is_command(obj) else None
+
+
+def warm_up(targets: Iterable[tuple[str, str]]) -> None:
+    """
+    Start loading the given `(module, attribute)` commands in background threads.
+
+    Loading holds the lock of the module, so that `load_command` waits for an import in progress instead
+    of starting it again. Errors are ignored: they are raised again when the command is actually loaded.
+    """
+    with _WARMUPS_LOCK:
+        for module, attribute in targets:
+            if (module, attribute) in _WARMUPS:
+                continue
+
+            thread = threading.Thread(
+                target=_warm_up,
+                args=(module, attribute),
+                name=f"mkdocs-click-warmup-{module}",
+                daemon=True,
+            )
+            _WARMUPS[module, attribute] = thread
+            thread.start()
+
+
+def wait_for_warmups() -> None:
+    """Wait until all the commands given to `warm_up` are loaded."""
+    with _WARMUPS_LOCK:
+        threads = list(_WARMUPS.values())
+
+    for thread in threads:
+        thread.join()
+
+
+def _warm_up(module: str, attribute: str) -> None:
+    with suppress(Exception):
+        load_command(module, attribute)
+
+
+_WARMUPS: dict[tuple[str, str], threading.Thread] = {}
+_WARMUPS_LOCK = threading.Lock()
+
+_MODULE_LOCKS: dict[str, threading.Lock] = {}
+_MODULE_LOCKS_LOCK = threading.Lock()
+
+
+def _module_lock(module: str) -> threading.Lock:
+    """
+    Return the lock held while loading commands from the given module.
+
+    The import system only locks the execution of a module. This lock also covers the check of
+    `sys.modules` and static loading, so that threads loading from the same module wait for a single
+    import instead of racing it.
+    """
+    with _MODULE_LOCKS_LOCK:
+        return _MODULE_LOCKS.setdefault(module, threading.Lock())
+
+
+def _is_command(obj: Any) -> bool:
+    return isinstance(obj, click.Command) or hasattr(obj, "context_class")
+
+
 def _load_obj(module: str, attribute: str) -> Any:
     try:
         mod = importlib.import_module(module)
@@ -35,3 +148,112 @@ def _load_obj(module: str, attribute: str) -> Any:
         return getattr(mod, attribute)
     except AttributeError:
         raise MkDocsClickException(f"Module {module!r} has no attribute {attribute!r}")
+
+
+@contextmanager
+def track_imports() -> Iterator[list[str]]:
+    """
+    Collect the names of the modules added to `sys.modules` within the context.
+    """
+    before = set(sys.modules)
+    added: list[str] = []
+    try:
+        yield added
+    finally:
+        added.extend(name for name in list(sys.modules) if name not in before)
+
+
+def get_package_modules(modules: Iterable[str], targets: Iterable[str]) -> list[str]:
+    """
+    Return the given modules that belong to the top-level package of one of the `targets` modules.
+
+    Modules imported along with a command also include its dependencies, the standard library and
+    modules imported by other threads meanwhile, which are not safe to unload.
+    """
+    packages = {target.partition(".")[0] for target in targets}
+    return [name for name in modules if name.partition(".")[0] in packages]
+
+
+# Packages that this extension and MkDocs hold on to, which must never be unloaded.
+_SHARED_PACKAGES = {"click", "markdown", "mkdocs", "mkdocs_click"}
+
+
+def get_dependency_modules(modules: Iterable[str]) -> list[str]:
+    """
+    Return the given modules that are neither built in, part of the standard library, nor shared with
+    this extension, like the dependencies of commands.
+    """
+    paths = sysconfig.get_paths()
+    stdlib = _normalize_path(paths["stdlib"])
+    site = {_normalize_path(paths["purelib"]), _normalize_path(paths["platlib"])}
+
+    dependencies = []
+    for name in modules:
+        path = getattr(sys.modules.get(name), "__file__", None)
+        if not path or name.partition(".")[0] in _SHARED_PACKAGES:
+            continue
+
+        path = _normalize_path(path)
+        if _is_within(path, stdlib) and not any(_is_within(path, directory) for directory in site):
+            continue
+
+        dependencies.append(name)
+
+    return dependencies
+
+
+def _normalize_path(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+
+def _is_within(path: str, directory: str) -> bool:
+    return path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+def get_source_signature(modules: Iterable[str]) -> tuple[tuple[str, int, int], ...]:
+    """
+    Return the path, modification time and size of the source files of the given modules.
+    """
+    paths = {getattr(sys.modules.get(name), "__file__", None) for name in modules}
+    return get_file_signature(path for path in paths if path)
+
+
+def get_file_signature(paths: Iterable[str]) -> tuple[tuple[str, int, int], ...]:
+    signature = []
+    for path in sorted(paths):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append((path, -1, -1))
+        else:
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+
+    return tuple(signature)
+
+
+def unload_modules(modules: Iterable[str]) -> tuple[int, int]:
+    """
+    Remove the given modules from `sys.modules` and collect the objects they held on to.
+
+    Return the number of modules removed and the memory reclaimed: in bytes if `tracemalloc` is
+    tracing, as a number of memory blocks otherwise.
+    """
+    tracing = tracemalloc.is_tracing()
+    before = tracemalloc.get_traced_memory()[0] if tracing else sys.getallocatedblocks()
+
+    removed = 0
+    for name in sorted(modules, reverse=True):  # Submodules first.
+        if sys.modules.pop(name, None) is None:
+            continue
+
+        removed += 1
+        # Parent packages that stay loaded still reference the submodule as an attribute.
+        parent, _, child = name.rpartition(".")
+        if parent in sys.modules:
+            sys.modules[parent].__dict__.pop(child, None)
+
+    importlib.invalidate_caches()
+    gc.collect()
+
+    after = tracemalloc.get_traced_memory()[0] if tracing else sys.getallocatedblocks()
+    return removed, max(before - after, 0)
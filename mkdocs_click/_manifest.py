@@ -0,0 +1,108 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+from ._exceptions import MkDocsClickException
+
+
+def load_manifest(path: str | Path) -> list[dict[str, Any]]:
+    """
+    Load the list of CLIs to document from a TOML, YAML or JSON manifest file.
+
+    The manifest holds a `cli` list, where each entry accepts the same options as a `mkdocs-click` block, e.g.:
+
+    [[cli]]
+    module = "app.cli"
+    command = "cli"
+    style = "table"
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+
+    if path.suffix == ".toml":
+        data = _load_toml(text)
+    elif path.suffix in {".yml", ".yaml"}:
+        data = _load_yaml(text)
+    elif path.suffix == ".json":
+        data = json.loads(text)
+    else:
+        raise MkDocsClickException(
+            f"Unsupported manifest format {path.suffix!r}, use a .toml, .yml, .yaml or .json file."
+        )
+
+    entries = data.get("cli") if isinstance(data, dict) else data
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        raise MkDocsClickException(f"Manifest {str(path)!r} must contain a list of `cli` entries")
+
+    return entries
+
+
+def parse_target(target: str) -> tuple[str, str]:
+    """
+    Split a `<module>:<command>` target into its module and command parts.
+    """
+    module, _, command = target.strip().rpartition(":")
+    if not module or not command:
+        raise MkDocsClickException(f"Target {target!r} must be in the form '<module>:<command>'")
+
+    return module, command
+
+
+def parse_shard(shard: str) -> tuple[int, int]:
+    """
+    Split a `<k>/<n>` shard into its index and count.
+    """
+    index, _, count = shard.strip().partition("/")
+    try:
+        k, n = int(index), int(count)
+    except ValueError:
+        k = n = 0
+
+    if not 1 <= k <= n:
+        raise MkDocsClickException(
+            f"Shard {shard!r} must be in the form '<k>/<n>', with 1 <= k <= n"
+        )
+
+    return k, n
+
+
+def load_timings(path: str | Path) -> dict[str, float]:
+    """
+    Load the render time of each command path from a JSON file, as written by `mkdocs-click render --record-timings`.
+    """
+    timings = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(timings, dict) or not all(
+        isinstance(value, (int, float)) for value in timings.values()
+    ):
+        raise MkDocsClickException(f"Timings {str(path)!r} must map command paths to durations")
+
+    return timings
+
+
+def _load_toml(text: str) -> Any:
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise MkDocsClickException(
+                "TOML manifests require the `tomli` package on Python < 3.11"
+            ) from None
+
+    return tomllib.loads(text)
+
+
+def _load_yaml(text: str) -> Any:
+    try:
+        import yaml
+    except ImportError:
+        raise MkDocsClickException("YAML manifests require the `PyYAML` package") from None
+
+    return yaml.safe_load(text)
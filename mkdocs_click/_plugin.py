@@ -0,0 +1,202 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from __future__ import annotations
+
+import posixpath
+from typing import TYPE_CHECKING, Any
+
+from markdown import Markdown
+from mkdocs.config import config_options as c
+from mkdocs.config.base import Config
+from mkdocs.exceptions import PluginError
+from mkdocs.plugins import BasePlugin
+from mkdocs.structure.files import File
+
+from ._cache import LRUCache
+from ._docs import SUBTREE_CACHE, make_command_pages, reset_build_caches
+from ._exceptions import MkDocsClickException
+from ._extension import defer_unloads, unload_pending_modules
+from ._loader import load_command
+
+if TYPE_CHECKING:
+    from mkdocs.config.defaults import MkDocsConfig
+    from mkdocs.structure.files import Files
+
+    from ._docs import CommandPage
+
+# Loads fragments into their `<details>` element when it is first expanded.
+_FRAGMENTS_SCRIPT = """\
+document.addEventListener("toggle", async (event) => {
+  const details = event.target;
+  const url = details.dataset && details.dataset.mkdocsClickFragment;
+  if (!url || !details.open || details.dataset.mkdocsClickLoaded) return;
+  details.dataset.mkdocsClickLoaded = "true";
+  try {
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(response.statusText);
+    details.insertAdjacentHTML("beforeend", await response.text());
+  } catch (error) {
+    delete details.dataset.mkdocsClickLoaded;
+    console.error(`Could not load ${url}:`, error);
+  }
+}, true);
+"""
+_FRAGMENTS_SCRIPT_URI = "assets/mkdocs-click/fragments.js"
+
+# Fragments converted to HTML, shared by all rebuilds of a `mkdocs serve` session.
+FRAGMENT_CACHE: LRUCache[tuple, str] = LRUCache(maxsize=4096)
+
+
+class _CommandConfig(Config):
+    module = c.Type(str)
+    command = c.Type(str)
+    path = c.Optional(c.Type(str))
+    prog_name = c.Optional(c.Type(str))
+    style = c.Choice(("plain", "table"), default="plain")
+    remove_ascii_art = c.Type(bool, default=False)
+    show_hidden = c.Type(bool, default=False)
+    static = c.Type(bool, default=False)
+    fragment_depth = c.Optional(c.Type(int))
+
+
+class _PluginConfig(Config):
+    commands = c.ListOfItems(c.SubConfig(_CommandConfig), default=[])
+
+
+class MKClickPlugin(BasePlugin[_PluginConfig]):
+    """
+    Generate one page per command of the configured Click applications, and their navigation:
+
+    plugins:
+      - mkdocs-click:
+          commands:
+            - module: example.main
+              command: cli
+              path: reference/cli
+
+    The page of `cli foo bar` is written to `reference/cli/foo/bar/index.md`, and the fragment documenting
+    `cli foo bar` on the page of `cli foo` to `reference/cli/foo/bar.html`. Requires MkDocs 1.6.
+    """
+
+    def on_pre_build(self, *, config: MkDocsConfig) -> None:
+        # Extensions have no build events: the plugin tells them when a build starts and ends.
+        reset_build_caches()
+        defer_unloads()
+
+    def on_post_build(self, *, config: MkDocsConfig) -> None:
+        unload_pending_modules()
+
+    def on_build_error(self, *, error: Exception) -> None:
+        unload_pending_modules()
+
+    def on_files(self, files: Files, *, config: MkDocsConfig) -> Files:
+        has_attr_list = "attr_list" in config.markdown_extensions
+        has_fragments = False
+
+        for entry in self.config.commands:
+            try:
+                root, pages = _make_pages(entry, has_attr_list=has_attr_list)
+            except MkDocsClickException as e:
+                raise PluginError(str(e)) from None
+
+            for page in pages:
+                _add_file(files, config, _get_page_uri(root, page), "\n".join(page.lines))
+                for fragment in page.fragments:
+                    src_uri = posixpath.join(root, *page.names, f"{fragment.name}.html")
+                    _add_file(files, config, src_uri, _convert_fragment(fragment.lines, config))
+                    has_fragments = True
+
+            if config.nav is not None and pages:
+                config.nav = _insert_nav(
+                    config.nav, _get_page_uri(root, pages[0]), _make_nav(root, pages)
+                )
+
+        if has_fragments:
+            _add_file(files, config, _FRAGMENTS_SCRIPT_URI, _FRAGMENTS_SCRIPT)
+            config.extra_javascript.append(_FRAGMENTS_SCRIPT_URI)
+
+        return files
+
+
+def _add_file(files: Files, config: MkDocsConfig, src_uri: str, content: str) -> None:
+    if files.get_file_from_path(src_uri) is not None:
+        raise PluginError(f"Cannot generate {src_uri}, which already exists")
+    files.append(File.generated(config, src_uri, content=content))
+
+
+def _convert_fragment(lines: list[str], config: MkDocsConfig) -> str:
+    """Convert the Markdown of a fragment to HTML, with the extensions configured for pages."""
+    key = (tuple(lines), tuple(config.markdown_extensions), repr(config.mdx_configs))
+    fragment = FRAGMENT_CACHE.get(key)
+    if fragment is None:
+        md = Markdown(extensions=config.markdown_extensions, extension_configs=config.mdx_configs)
+        fragment = md.convert("\n".join(lines))
+        FRAGMENT_CACHE.set(key, fragment)
+
+    return fragment
+
+
+def _make_pages(entry: _CommandConfig, has_attr_list: bool) -> tuple[str, list[CommandPage]]:
+    command = load_command(entry.module, entry.command, static=entry.static)
+    prog_name = entry.prog_name or command.name or entry.command
+
+    pages = make_command_pages(
+        prog_name,
+        command,
+        style=entry.style,
+        remove_ascii_art=entry.remove_ascii_art,
+        show_hidden=entry.show_hidden,
+        has_attr_list=has_attr_list,
+        cache=SUBTREE_CACHE,
+        fragment_depth=entry.fragment_depth,
+    )
+    return (entry.path or prog_name).strip("/"), list(pages)
+
+
+def _get_page_uri(root: str, page: CommandPage) -> str:
+    return posixpath.join(root, *page.names, "index.md")
+
+
+def _make_nav(root: str, pages: list[CommandPage]) -> dict[str, Any]:
+    """Create the navigation item of the root command, with a section for every group."""
+    children: dict[tuple[str, ...], list[CommandPage]] = {}
+    for page in pages[1:]:
+        children.setdefault(page.names[:-1], []).append(page)
+
+    def make_item(page: CommandPage) -> dict[str, Any]:
+        uri = _get_page_uri(root, page)
+        if page.names not in children:
+            return {page.title: uri}
+        return {page.title: [uri, *(make_item(child) for child in children[page.names])]}
+
+    return make_item(pages[0])
+
+
+def _insert_nav(nav: list[Any], uri: str, item: dict[str, Any]) -> list[Any]:
+    """
+    Replace the entries of `nav` pointing to the page at `uri` by the generated `item`, keeping their
+    title if they have one. The item is added at the end if there is no such entry.
+    """
+    found = False
+
+    def replace(entries: list[Any]) -> list[Any]:
+        nonlocal found
+        result = []
+        for entry in entries:
+            if entry == uri:
+                found = True
+                entry = item
+            elif isinstance(entry, dict):
+                [(title, value)] = entry.items()
+                if value == uri:
+                    found = True
+                    value = next(iter(item.values()))
+                elif isinstance(value, list):
+                    value = replace(value)
+                entry = {title: value}
+            result.append(entry)
+        return result
+
+    nav = replace(nav)
+    return nav if found else [*nav, item]
@@ -0,0 +1,372 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+"""
+Store command trees in JSON snapshots, to document past versions of a CLI without installing them.
+
+A snapshot directory holds one `<version>.json` file per version, as written by `mkdocs-click snapshot`.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import click
+
+from ._cache import LRUCache
+from ._defaults import DYNAMIC
+from ._docs import make_command_snapshot
+from ._exceptions import MkDocsClickException
+from ._loader import get_file_signature
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+SNAPSHOT_FORMAT = 1
+
+# Commands rebuilt from snapshots, shared by all blocks and rebuilds until their file changes. Rendering
+# every version from the same objects lets the subtree cache share the parts that did not change.
+SNAPSHOT_CACHE: LRUCache[tuple, tuple[str, click.Command]] = LRUCache(maxsize=64)
+
+_BASIC_TYPES = {
+    "String": click.STRING,
+    "Int": click.INT,
+    "Float": click.FLOAT,
+    "Bool": click.BOOL,
+    "UUID": click.UUID,
+    "Unprocessed": click.UNPROCESSED,
+}
+
+
+def make_snapshot(prog_name: str, command: click.Command) -> dict[str, Any]:
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "prog_name": prog_name,
+        "command": make_command_snapshot(prog_name, command),
+    }
+
+
+def load_snapshot(path: str | Path) -> tuple[str, click.Command]:
+    """
+    Rebuild the program name and the command tree of a snapshot.
+    """
+    key = get_file_signature([str(path)])
+    result = SNAPSHOT_CACHE.get(key)
+    if result is None:
+        data = load_snapshot_data(path)
+        result = (data["prog_name"], _load_command(data["command"]))
+        SNAPSHOT_CACHE.set(key, result)
+
+    return result
+
+
+def load_snapshot_data(path: str | Path) -> dict[str, Any]:
+    path = Path(path)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise MkDocsClickException(f"Snapshot {str(path)!r} does not exist") from None
+
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+        raise MkDocsClickException(
+            f"Snapshot {str(path)!r} was not written by `mkdocs-click snapshot`, or by an "
+            "incompatible version"
+        )
+
+    return data
+
+
+def get_snapshot_path(directory: str | Path, version: str) -> Path:
+    path = Path(directory, f"{version}.json")
+    if not path.is_file():
+        versions = ", ".join(version for version, _ in find_snapshots(directory))
+        raise MkDocsClickException(
+            f"No snapshot of version {version!r} in {str(directory)!r}, available versions: "
+            f"{versions or 'none'}"
+        )
+
+    return path
+
+
+def find_snapshots(directory: str | Path) -> list[tuple[str, Path]]:
+    """Return the versions of the snapshots of a directory, oldest first, along with their path."""
+    paths = Path(directory).glob("*.json")
+    return sorted(((path.stem, path) for path in paths), key=lambda item: _version_key(item[0]))
+
+
+def make_changes_index(
+    directory: str | Path, depth: int = 0, show_hidden: bool = False
+) -> Iterator[str]:
+    """
+    Create the Markdown lines listing the commands added, removed and changed by each version, newest first.
+    """
+    snapshots = find_snapshots(directory)
+    if not snapshots:
+        raise MkDocsClickException(f"No snapshots found in {str(directory)!r}")
+
+    trees = [
+        (version, _flatten(load_snapshot_data(path), show_hidden)) for version, path in snapshots
+    ]
+    for (version, tree), (_, previous) in reversed(list(zip(trees[1:], trees))):
+        yield f"{'#' * (depth + 1)} {version}"
+        yield ""
+        yield from _compare(previous, tree) or ["No changes to the command line interface."]
+        yield ""
+
+
+def _load_command(node: dict[str, Any]) -> click.Command:
+    kwargs = {
+        "name": node["name"],
+        "params": [_load_param(info) for info in node["params"]],
+        "help": node["help"],
+        "short_help": node["short_help"],
+        "epilog": node["epilog"],
+        "hidden": node["hidden"],
+        "deprecated": node["deprecated"],
+        "options_metavar": node["options_metavar"],
+        "add_help_option": node["add_help_option"],
+        "context_settings": node["context_settings"],
+    }
+    if not node["group"]:
+        return click.Command(**kwargs)
+
+    return click.Group(
+        commands=[_load_command(child) for child in node["commands"]],
+        subcommand_metavar=node["subcommand_metavar"],
+        chain=node["chain"],
+        **kwargs,
+    )
+
+
+def _load_param(info: dict[str, Any]) -> click.Parameter:
+    param_type = _load_type(info["type"])
+    default = _load_value(info["default"])
+
+    if info["param_type_name"] == "argument":
+        return click.Argument(
+            [info["name"]],
+            type=param_type,
+            required=info["required"],
+            nargs=info["nargs"],
+            default=default,
+            envvar=info["envvar"],
+            metavar=info["metavar"],
+        )
+
+    # Secondary options are declared along with the last option, e.g. `--shout/--no-shout`.
+    opts, secondary_opts = info["opts"], info["secondary_opts"]
+    decls = [info["name"], *opts]
+    if secondary_opts:
+        decls[-1] = f"{opts[-1]}/{secondary_opts[0]}"
+        decls.extend(f" /{opt}" for opt in secondary_opts[1:])
+
+    kwargs: dict[str, Any] = {}
+    if info["is_flag"] and not secondary_opts:
+        kwargs["flag_value"] = _load_value(info["flag_value"])
+    if info["nargs"] != 1:
+        kwargs["nargs"] = info["nargs"]
+    if info["prompt"] is not None:
+        kwargs["prompt"] = info["prompt"]
+
+    return click.Option(
+        decls,
+        type=param_type,
+        required=info["required"],
+        multiple=info["multiple"],
+        default=default,
+        envvar=info["envvar"],
+        help=info["help"],
+        hidden=info["hidden"],
+        is_flag=info["is_flag"],
+        count=info["count"],
+        metavar=info["metavar"],
+        show_default=info["show_default"],
+        show_choices=info["show_choices"],
+        show_envvar=info["show_envvar"],
+        **kwargs,
+    )
+
+
+def _load_type(info: dict[str, Any]) -> click.ParamType:
+    kind = info.get("param_type")
+    values = {key: _load_value(value) for key, value in info.items()}
+
+    if kind in _BASIC_TYPES:
+        return _BASIC_TYPES[kind]
+    if kind == "Choice":
+        return click.Choice(list(values["choices"]), case_sensitive=values["case_sensitive"])
+    if kind == "DateTime":
+        return click.DateTime(list(values["formats"]))
+    if kind in {"IntRange", "FloatRange"}:
+        range_type = click.IntRange if kind == "IntRange" else click.FloatRange
+        return range_type(
+            min=values["min"],
+            max=values["max"],
+            min_open=values["min_open"],
+            max_open=values["max_open"],
+            clamp=values["clamp"],
+        )
+    if kind == "Path":
+        return click.Path(
+            **{
+                key: values[key]
+                for key in ("exists", "file_okay", "dir_okay", "writable", "readable", "allow_dash")
+                if key in values
+            }
+        )
+    if kind == "File":
+        return click.File(mode=values["mode"], encoding=values["encoding"])
+    if kind == "Tuple":
+        return click.Tuple([_load_type(item) for item in info["types"]])
+
+    return _SnapshotType(values["name"])
+
+
+def _load_value(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_load_value(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "tuple" in value:
+        return tuple(_load_value(item) for item in value["tuple"])
+    if "callable" in value:
+        return _make_function(value["callable"])
+    if "repr" in value:
+        return _Literal(value["repr"])
+
+    return {key: _load_value(item) for key, item in value.items()}
+
+
+class _SnapshotType(click.ParamType):
+    """A custom parameter type, of which snapshots only keep the name."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class _Literal:
+    """A value that is not a JSON type, of which snapshots only keep the string representation."""
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+
+    def __repr__(self) -> str:
+        return self._text
+
+
+def _make_function(text: str) -> Callable[[], Any]:
+    """
+    Stand in for a callable value, e.g. a dynamic default, which Click only recognizes if it is a function.
+    """
+
+    # Evaluating it documents the default as dynamic, as the value it had is unknown.
+    def function() -> Any:
+        return DYNAMIC
+
+    match = re.fullmatch(r"<function (\S+) at 0x[0-9a-f]+>", text)
+    if match is not None:
+        function.__qualname__ = function.__name__ = match.group(1)
+
+    return function
+
+
+def _flatten(data: dict[str, Any], show_hidden: bool) -> dict[str, dict[str, Any]]:
+    """Return the commands of a snapshot by command path, without their sub-commands and hidden options."""
+    commands = {}
+
+    def visit(node: dict[str, Any], command_path: str) -> None:
+        if node["hidden"] and not show_hidden:
+            return
+
+        commands[command_path] = {
+            **node,
+            "params": [info for info in node["params"] if show_hidden or not info.get("hidden")],
+            "commands": None,
+        }
+        for child in node["commands"]:
+            visit(child, f"{command_path} {child['name']}")
+
+    visit(data["command"], data["prog_name"])
+    return commands
+
+
+def _compare(previous: dict[str, dict[str, Any]], current: dict[str, dict[str, Any]]) -> list[str]:
+    changes = [f"- Added `{path}`" for path in current if path not in previous]
+    changes.extend(f"- Removed `{path}`" for path in previous if path not in current)
+
+    for path, node in current.items():
+        if path not in previous or previous[path] == node:
+            continue
+
+        before = {_get_param_name(info): info for info in previous[path]["params"]}
+        after = {_get_param_name(info): info for info in node["params"]}
+        details = [
+            f"{change} {', '.join(f'`{name}`' for name in names)}"
+            for change, names in (
+                ("added", [name for name in after if name not in before]),
+                ("removed", [name for name in before if name not in after]),
+                (
+                    "changed",
+                    [name for name in after if name in before and before[name] != after[name]],
+                ),
+            )
+            if names
+        ]
+        if _without_params(previous[path]) != _without_params(node):
+            details.insert(0, "changed description")
+        changes.append(f"- Changed `{path}`{': ' if details else ''}{'; '.join(details)}")
+
+    return changes
+
+
+def _without_params(node: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in node.items() if key != "params"}
+
+
+def _get_param_name(info: dict[str, Any]) -> str:
+    if info["param_type_name"] == "argument":
+        return str(info["name"]).upper()
+
+    return max(info["opts"], key=len)
+
+
+# Ranks of the tags of development and pre-releases, as in PEP 440.
+_PRE_RELEASE_TAGS = {
+    "dev": 0,
+    "a": 1,
+    "alpha": 1,
+    "b": 2,
+    "beta": 2,
+    "c": 3,
+    "pre": 3,
+    "preview": 3,
+    "rc": 3,
+}
+_POST_RELEASE_TAGS = {"post", "rev", "r"}
+
+
+def _version_key(
+    version: str,
+) -> tuple[tuple[tuple[int, int, str], ...], tuple[tuple[int, int, str], ...]]:
+    # Local versions come after the public version they are based on.
+    public, _, local = version.partition("+")
+    return _version_parts_key(public), _version_parts_key(local) if local else ()
+
+
+def _version_parts_key(version: str) -> tuple[tuple[int, int, str], ...]:
+    # Numeric parts are compared as numbers, so that `1.10` comes after `1.9`. Tags come before the end of the
+    # version, so that `1.0rc1` comes before `1.0`, except post-release tags, which come after it.
+    key = []
+    for part in re.findall(r"\d+|[^\W\d_]+", version.lower()):
+        if part.isdigit():
+            key.append((3, int(part), ""))
+        elif part in _POST_RELEASE_TAGS:
+            key.append((2, 0, part))
+        else:
+            key.append((0, _PRE_RELEASE_TAGS.get(part, len(_PRE_RELEASE_TAGS)), part))
+
+    key.append((1, 0, ""))
+    return tuple(key)
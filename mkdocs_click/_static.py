@@ -0,0 +1,536 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+"""
+Rebuild Click commands from the source of their module, without importing it.
+
+Only the common, static ways of defining a CLI are supported: `@click.command()`, `@click.group()`,
+`@<group>.command()` and `@click.option()`-style decorators with literal arguments, `<group>.add_command()`
+calls and imports of other modules of the same package. Imported modules of the package are analyzed when
+imported, as the interpreter would run them, since they may register sub-commands as a side effect. Anything
+else raises `StaticLoadError`, so that callers can fall back to a real import: other calls may change the
+commands they are given or reach, which are then considered unknown.
+"""
+
+from __future__ import annotations
+
+import ast
+import builtins
+from importlib.machinery import PathFinder
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, cast
+
+import click
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+
+class StaticLoadError(Exception):
+    """
+    The source of a module cannot be understood without importing it.
+    """
+
+
+def load_command_statically(module: str, attribute: str) -> click.Command:
+    """
+    Rebuild the Click command object located at '<module>:<attribute>' from source.
+    """
+    command = _Analyzer(module.split(".")[0]).lookup(module, attribute)
+
+    if not isinstance(command, click.Command):
+        raise StaticLoadError(f"{module}:{attribute} is not a command")
+
+    return command
+
+
+# Click attributes that may be used as decorators, and as values (parameter types).
+_CLICK_DECORATORS = {
+    "argument",
+    "command",
+    "confirmation_option",
+    "group",
+    "help_option",
+    "option",
+    "pass_context",
+    "pass_obj",
+    "password_option",
+    "version_option",
+}
+_CLICK_VALUES = {
+    "BOOL",
+    "Choice",
+    "DateTime",
+    "File",
+    "FLOAT",
+    "FloatRange",
+    "INT",
+    "IntRange",
+    "Path",
+    "STRING",
+    "Tuple",
+    "UUID",
+}
+_BUILTIN_VALUES = {"bool", "dict", "float", "int", "str"}
+
+
+class _Unknown:
+    """A name whose value could not be analyzed."""
+
+
+_UNKNOWN = _Unknown()
+
+
+class _ClickModule:
+    """A name bound to the `click` module."""
+
+
+_CLICK = _ClickModule()
+
+
+class _ClickAttribute:
+    """A name imported from the `click` module."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class _LocalModule:
+    """A name bound to a module of the analyzed package."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class _LocalAttribute:
+    """A name imported from a module of the analyzed package, which is only looked up when used."""
+
+    def __init__(self, module: str, name: str) -> None:
+        self.module = module
+        self.name = name
+
+
+class _Analyzer:
+    def __init__(self, package: str) -> None:
+        self._package = package
+        self._namespaces: dict[str, dict[str, Any]] = {}
+        # Including the namespaces of modules being analyzed.
+        self._all_namespaces: list[dict[str, Any]] = []
+
+    def load(self, module: str) -> dict[str, Any]:
+        """Analyze a module of the package, after its parent packages, unless it already was."""
+        namespace = self._namespaces.get(module)
+        if namespace is None:
+            parts = module.split(".")
+            for i in range(1, len(parts)):
+                parent = ".".join(parts[:i])
+                if parent not in self._namespaces and self.is_module(parent):
+                    self.load(parent)
+
+            module_analyzer = _ModuleAnalyzer(self, module)
+            # Modules being analyzed only hold the names defined so far, as during an import cycle.
+            namespace = self._namespaces[module] = module_analyzer.namespace
+            module_analyzer.run()
+
+        return namespace
+
+    def lookup(self, module: str, name: str) -> Any:
+        namespace = self.load(module)
+        if name not in namespace:
+            raise StaticLoadError(f"{module}:{name} could not be found")
+
+        return self.resolve(namespace[name])
+
+    def resolve(self, value: Any) -> Any:
+        if isinstance(value, _LocalAttribute):
+            if self.is_module(f"{value.module}.{value.name}"):
+                return _LocalModule(f"{value.module}.{value.name}")
+            return self.lookup(value.module, value.name)
+
+        if value is _UNKNOWN:
+            raise StaticLoadError("value could not be analyzed")
+
+        return value
+
+    def add_namespace(self, namespace: dict[str, Any]) -> None:
+        self._all_namespaces.append(namespace)
+
+    def forget(self, commands: Iterable[click.Command]) -> None:
+        """Mark the names bound to these commands or to their sub-commands, in all modules, as unknown."""
+        forgotten: set[int] = set()
+        pending = list(commands)
+        while pending:
+            command = pending.pop()
+            if id(command) not in forgotten:
+                forgotten.add(id(command))
+                if isinstance(command, click.Group):
+                    pending.extend(command.commands.values())
+
+        for namespace in self._all_namespaces:
+            for name, value in namespace.items():
+                if id(value) in forgotten:
+                    namespace[name] = _UNKNOWN
+
+    def is_local(self, module: str) -> bool:
+        return module.split(".")[0] == self._package
+
+    def is_module(self, module: str) -> bool:
+        try:
+            _find_source(module)
+        except StaticLoadError:
+            return False
+
+        return True
+
+
+class _ModuleAnalyzer:
+    def __init__(self, analyzer: _Analyzer, module: str) -> None:
+        self._analyzer = analyzer
+        self._module = module
+        self._path = _find_source(module)
+        self._namespace: dict[str, Any] = {}
+        self.namespace = self._namespace
+        # Functions without decorators, whose calls may reach the commands they refer to.
+        self._functions: dict[str, ast.FunctionDef | ast.AsyncFunctionDef] = {}
+        analyzer.add_namespace(self._namespace)
+
+    def run(self) -> None:
+        tree = ast.parse(self._path.read_text(encoding="utf-8"), str(self._path))
+
+        for node in tree.body:
+            self._visit(node)
+
+    def _visit(self, node: ast.stmt) -> None:
+        if isinstance(node, ast.Import):
+            self._visit_import(node)
+        elif isinstance(node, ast.ImportFrom):
+            self._visit_import_from(node)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            self._visit_function(node)
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1:
+            self._assign(node.targets[0], node.value)
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            self._assign(node.target, node.value)
+        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+            self._visit_call(node.value)
+        elif not _is_main_guard(node) and not isinstance(node, (ast.Expr, ast.Pass)):
+            # Anything defined or changed by other statements cannot be trusted.
+            self._invalidate(node)
+
+    def _visit_import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if alias.name == "click":
+                self._namespace[alias.asname or "click"] = _CLICK
+            elif self._analyzer.is_local(alias.name):
+                self._import(alias.name)
+                name = alias.name if alias.asname else alias.name.split(".")[0]
+                self._namespace[alias.asname or name] = _LocalModule(name)
+            else:
+                self._namespace[alias.asname or alias.name.split(".")[0]] = _UNKNOWN
+
+    def _visit_import_from(self, node: ast.ImportFrom) -> None:
+        module = self._absolute_module(node)
+        if self._analyzer.is_local(module):
+            self._import(module)
+
+        for alias in node.names:
+            name = alias.asname or alias.name
+            if module == "click":
+                self._namespace[name] = _ClickAttribute(alias.name)
+            elif self._analyzer.is_local(module) and alias.name != "*":
+                self._import(f"{module}.{alias.name}")
+                self._namespace[name] = _LocalAttribute(module, alias.name)
+            else:
+                self._namespace[name] = _UNKNOWN
+
+    def _import(self, module: str) -> None:
+        """Analyze a module of the package when it is imported, as it may register commands when it runs."""
+        if self._analyzer.is_module(module):
+            self._analyzer.load(module)
+
+    def _absolute_module(self, node: ast.ImportFrom) -> str:
+        if not node.level:
+            return node.module or ""
+
+        package = self._module.split(".")
+        if self._path.name != "__init__.py":
+            package = package[:-1]
+        if node.level > 1:
+            package = package[: -(node.level - 1)]
+
+        return ".".join([*package, node.module] if node.module else package)
+
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        if not node.decorator_list:
+            self._namespace[node.name] = _UNKNOWN
+            self._functions[node.name] = node
+            return
+
+        self._functions.pop(node.name, None)
+
+        registering_groups = [
+            decorator.value.id
+            for decorator in (_callee(d) for d in node.decorator_list)
+            if isinstance(decorator, ast.Attribute) and isinstance(decorator.value, ast.Name)
+        ]
+
+        try:
+            decorators = [self._evaluate_decorator(d) for d in node.decorator_list]
+            obj: Any = _make_callback(node, self._module)
+            for decorator in reversed(decorators):
+                obj = decorator(obj)
+        except (StaticLoadError, TypeError, ValueError):
+            # The function may have been registered as a sub-command of a group, e.g. of another module.
+            self._analyzer.forget(
+                group
+                for group in map(self._namespace.get, registering_groups)
+                if isinstance(group, click.Group)
+            )
+            # Unknown decorators are called with the function, and may change what they reach.
+            self._forget_called(list(node.decorator_list))
+            obj = _UNKNOWN
+
+        self._namespace[node.name] = obj
+
+    def _evaluate_decorator(self, node: ast.expr) -> Callable[..., Any]:
+        decorator = self._evaluate_callee(_callee(node))
+        if isinstance(node, ast.Call):
+            args, kwargs = self._evaluate_arguments(node)
+            decorator = decorator(*args, **kwargs)
+
+        return decorator
+
+    def _evaluate_callee(self, node: ast.expr) -> Callable[..., Any]:
+        if isinstance(node, ast.Attribute):
+            value = self._evaluate_name_or_attribute(node.value)
+            if value is _CLICK and node.attr in _CLICK_DECORATORS:
+                return getattr(click, node.attr)
+            if isinstance(value, click.Group) and node.attr in {"command", "group"}:
+                return getattr(value, node.attr)
+        elif isinstance(node, ast.Name):
+            value = self._namespace.get(node.id)
+            if isinstance(value, _ClickAttribute) and value.name in _CLICK_DECORATORS:
+                return getattr(click, value.name)
+
+        raise StaticLoadError(f"unsupported decorator at line {node.lineno}")
+
+    def _visit_call(self, node: ast.Call) -> None:
+        func = node.func
+        if (
+            isinstance(func, ast.Attribute)
+            and isinstance(func.value, ast.Name)
+            and func.attr == "add_command"
+        ):
+            group = self._namespace.get(func.value.id)
+            if isinstance(group, click.Group):
+                try:
+                    args, kwargs = self._evaluate_arguments(node)
+                    group.add_command(*args, **kwargs)
+                    return
+                except (StaticLoadError, TypeError, ValueError):
+                    pass
+
+        # E.g. `plugins.register(cli)` or `app.cli.add_command(sub)`.
+        self._forget_reached(node)
+
+    def _forget_reached(self, node: ast.AST) -> None:
+        """Mark the commands that the calls made by `node` may change as unknown."""
+        self._forget_called(
+            [child for child in _walk_executed(node) if isinstance(child, ast.Call)]
+        )
+
+    def _forget_called(self, calls: list[ast.expr]) -> None:
+        """
+        Mark the commands that these calls may change as unknown: the commands in their callees and arguments,
+        and those that the functions of this module they call refer to.
+        """
+        commands = []
+        functions: set[str] = set()
+        while calls:
+            for child in _walk_executed(calls.pop()):
+                if isinstance(child, ast.Name) and child.id in self._functions:
+                    if child.id not in functions:
+                        functions.add(child.id)
+                        calls.extend(
+                            call
+                            for statement in self._functions[child.id].body
+                            for call in _walk_executed(statement)
+                            if isinstance(call, ast.Call)
+                        )
+                elif isinstance(child, (ast.Name, ast.Attribute)):
+                    try:
+                        value = self._evaluate_name_or_attribute(child)
+                    except StaticLoadError:
+                        continue
+                    if isinstance(value, click.Command):
+                        commands.append(value)
+
+        self._analyzer.forget(commands)
+
+    def _assign(self, target: ast.expr, value: ast.expr) -> None:
+        if not isinstance(target, ast.Name):
+            self._invalidate(target)
+            return
+
+        try:
+            self._namespace[target.id] = self._evaluate(value)
+        except (StaticLoadError, TypeError, ValueError):
+            self._forget_reached(value)
+            self._namespace[target.id] = _UNKNOWN
+
+    def _invalidate(self, node: ast.AST) -> None:
+        self._forget_reached(node)
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+                self._namespace[child.id] = _UNKNOWN
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                self._namespace[child.name] = _UNKNOWN
+            elif isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name):
+                # E.g. `cli.add_command(...)` or `@cli.command()` in a conditional block.
+                value = self._namespace.get(child.value.id)
+                if isinstance(value, click.Command):
+                    self._analyzer.forget([value])
+
+    def _evaluate_arguments(self, node: ast.Call) -> tuple[list[Any], dict[str, Any]]:
+        args = []
+        for arg in node.args:
+            if isinstance(arg, ast.Starred):
+                raise StaticLoadError(f"unsupported argument unpacking at line {node.lineno}")
+            args.append(self._evaluate(arg))
+
+        kwargs = {}
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                raise StaticLoadError(f"unsupported argument unpacking at line {node.lineno}")
+            kwargs[keyword.arg] = self._evaluate(keyword.value)
+
+        return args, kwargs
+
+    def _evaluate(self, node: ast.expr) -> Any:
+        if isinstance(node, ast.Constant):
+            return node.value
+
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            values = self._evaluate_all(node.elts)
+            return {ast.List: list, ast.Tuple: tuple, ast.Set: set}[type(node)](values)
+
+        if isinstance(node, ast.Dict) and None not in node.keys:
+            return dict(
+                zip(self._evaluate_all(node.keys), self._evaluate_all(node.values))  # type: ignore[arg-type]
+            )
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = self._evaluate(node.operand)
+            if isinstance(operand, (int, float)):
+                return -operand if isinstance(node.op, ast.USub) else operand
+
+        if isinstance(node, (ast.Name, ast.Attribute)):
+            value = self._evaluate_name_or_attribute(node)
+            if not isinstance(value, (_ClickModule, _LocalModule)):
+                return value
+
+        if isinstance(node, ast.Call):
+            func = self._evaluate_name_or_attribute(node.func)
+            if func is dict or (isinstance(func, type) and issubclass(func, click.ParamType)):
+                args, kwargs = self._evaluate_arguments(node)
+                return func(*args, **kwargs)
+
+        raise StaticLoadError(f"unsupported expression at line {node.lineno}")
+
+    def _evaluate_all(self, nodes: Iterable[ast.expr]) -> list[Any]:
+        values = []
+        for node in nodes:
+            if isinstance(node, ast.Starred):
+                raise StaticLoadError(f"unsupported unpacking at line {node.lineno}")
+            values.append(self._evaluate(node))
+
+        return values
+
+    def _evaluate_name_or_attribute(self, node: ast.expr) -> Any:
+        if isinstance(node, ast.Name):
+            if node.id in self._namespace:
+                value = self._analyzer.resolve(self._namespace[node.id])
+                if isinstance(value, _ClickAttribute):
+                    return self._click_value(value.name, node)
+                return value
+            if node.id in _BUILTIN_VALUES:
+                return getattr(builtins, node.id)
+
+        elif isinstance(node, ast.Attribute):
+            value = self._evaluate_name_or_attribute(node.value)
+            if value is _CLICK:
+                return self._click_value(node.attr, node)
+            if isinstance(value, _LocalModule):
+                return self._analyzer.resolve(_LocalAttribute(value.name, node.attr))
+
+        raise StaticLoadError(f"unsupported expression at line {node.lineno}")
+
+    def _click_value(self, name: str, node: ast.expr) -> Any:
+        if name not in _CLICK_VALUES:
+            raise StaticLoadError(f"unsupported use of click.{name} at line {node.lineno}")
+
+        return getattr(click, name)
+
+
+def _callee(node: ast.expr) -> ast.expr:
+    return node.func if isinstance(node, ast.Call) else node
+
+
+def _walk_executed(node: ast.AST) -> Iterator[ast.AST]:
+    """Walk the nodes of `node` like `ast.walk`, except for the bodies of functions, which run when called."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        yield node
+        pending.extend(
+            child
+            for child in ast.iter_child_nodes(node)
+            if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda))
+        )
+
+
+def _is_main_guard(node: ast.stmt) -> bool:
+    # if __name__ == "__main__":
+    return (
+        isinstance(node, ast.If)
+        and isinstance(node.test, ast.Compare)
+        and isinstance(node.test.left, ast.Name)
+        and node.test.left.id == "__name__"
+    )
+
+
+def _make_callback(node: ast.FunctionDef | ast.AsyncFunctionDef, module: str) -> Callable[..., Any]:
+    """Create a function with the same name and docstring as the one defined by `node`."""
+    body: list[ast.stmt] = [ast.Pass()]
+    docstring = ast.get_docstring(node, clean=False)
+    if docstring is not None:
+        # Compile the docstring, so that `__doc__` is processed the same way the interpreter would.
+        body.insert(0, node.body[0])
+
+    tree = ast.parse("def callback(*args, **kwargs): pass")
+    function = cast(ast.FunctionDef, tree.body[0])
+    function.name = node.name
+    function.body = body
+    tree = ast.fix_missing_locations(tree)
+
+    namespace: dict[str, Any] = {"__name__": module}
+    exec(compile(tree, f"<{module}>", "exec"), namespace)
+    return namespace[node.name]
+
+
+def _find_source(module: str) -> Path:
+    """Locate the source file of a module without importing it, nor its parent packages."""
+    search_path = None
+    spec = None
+    parts = module.split(".")
+
+    for i in range(len(parts)):
+        spec = PathFinder.find_spec(".".join(parts[: i + 1]), search_path)
+        if spec is None:
+            raise StaticLoadError(f"module {module!r} could not be found")
+        search_path = spec.submodule_search_locations
+
+    if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+        raise StaticLoadError(f"module {module!r} has no Python source")
+
+    return Path(spec.origin)
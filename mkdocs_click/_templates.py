@@ -0,0 +1,98 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+from __future__ import annotations
+
+from pathlib import Path
+from string import Template
+
+from ._cache import LRUCache
+from ._exceptions import MkDocsClickException
+from ._loader import get_file_signature
+
+# The fields available to the template of each section.
+FIELDS = {
+    "title": ("level", "name", "command_path", "anchor"),
+    "description": ("description",),
+    "usage": ("usage", "command_path"),
+    "options": ("rows",),
+    "option": ("names", "type", "help", "default"),
+    "subcommands": ("entries",),
+    "subcommand": ("name", "command_path", "anchor", "summary"),
+}
+
+# Compiled templates, by directory, shared by all blocks and rebuilds until their files change.
+TEMPLATES_CACHE: LRUCache[tuple, Templates] = LRUCache(maxsize=16)
+
+
+class Templates:
+    """
+    Layouts of the sections of commands, as `string.Template` sources by section name.
+
+    Sections without a template keep their built-in layout. The `option` and `subcommand` templates are
+    applied to each entry of the `options` and `subcommands` sections, whose `$rows` and `$entries` hold
+    the entries one per line.
+    """
+
+    def __init__(self, sources: dict[str, str]) -> None:
+        for name, source in sources.items():
+            if name not in FIELDS:
+                raise MkDocsClickException(
+                    f"Unknown template {name!r}, expected one of: {', '.join(FIELDS)}"
+                )
+            _validate(name, source)
+
+        # Used in cache keys, since the rendered output depends on it.
+        self.key = tuple(sorted(sources.items()))
+        self._templates = {name: Template(source) for name, source in sources.items()}
+
+    def __contains__(self, section: str) -> bool:
+        return section in self._templates
+
+    def render(self, section: str, **fields: str) -> list[str]:
+        """Create the Markdown lines of a section, followed by an empty line."""
+        return [*self.render_text(section, **fields).splitlines(), ""]
+
+    def render_text(self, section: str, **fields: str) -> str:
+        return self._templates[section].substitute(fields)
+
+
+def load_templates(path: str | Path) -> Templates:
+    """
+    Load the templates of a directory, where the template of each section is in a `<section>.md` file.
+
+    Templates are only compiled again when the files of the directory change.
+    """
+    path = Path(path)
+    if not path.is_dir():
+        raise MkDocsClickException(f"Templates directory {str(path)!r} does not exist")
+
+    files = get_template_files(path)
+    key = (str(path.resolve()), get_file_signature(files))
+    templates = TEMPLATES_CACHE.get(key)
+    if templates is None:
+        templates = Templates(
+            {
+                Path(file).stem: Path(file).read_text(encoding="utf-8").rstrip("\n")
+                for file in files[1:]
+            }
+        )
+        TEMPLATES_CACHE.set(key, templates)
+
+    return templates
+
+
+def get_template_files(path: str | Path) -> list[str]:
+    """Return the templates directory, whose signature changes when files are added, and its templates."""
+    return [str(path), *sorted(str(file) for file in Path(path).glob("*.md"))]
+
+
+def _validate(name: str, source: str) -> None:
+    try:
+        Template(source).substitute(dict.fromkeys(FIELDS[name], ""))
+    except KeyError as e:
+        raise MkDocsClickException(
+            f"Template {name!r} uses unknown field {e.args[0]!r}, expected one of: {', '.join(FIELDS[name])}"
+        ) from None
+    except ValueError as e:
+        raise MkDocsClickException(f"Template {name!r} is invalid: {e}") from None
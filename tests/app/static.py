@@ -0,0 +1,93 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+"""
+A CLI that can only be documented by reading its source: importing it fails.
+"""
+
+import click
+import mkdocs_click_tests_not_installed  # noqa: F401
+
+from . import cli as app_cli
+from .cli import hello
+
+CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
+
+
+@click.group(context_settings=CONTEXT_SETTINGS)
+@click.option("-v", "--verbose", is_flag=True, help="Show more output.")
+def cli(verbose):
+    """Main entrypoint for this dummy program"""
+
+
+@cli.command()
+@click.argument("path", type=click.Path(exists=True))
+@click.option("--level", type=click.IntRange(0, 10), default=3, show_default=True)
+@click.option("--mode", type=click.Choice(["fast", "slow"]), help="How to run.")
+@click.pass_context
+def run(ctx, path, level, mode):
+    """
+    Run the thing.
+
+    More details.
+    """
+
+
+cli.add_command(hello)
+
+
+def plugin_decorator(f):
+    return f  # pragma: no cover
+
+
+@click.group()
+def plugins():
+    """Plugins of this dummy program"""
+
+
+@plugins.command()
+@plugin_decorator
+def dynamic():
+    """A command defined with an unknown decorator."""
+
+
+@click.command()
+def standalone():
+    """A command which does not belong to a group."""
+
+
+@click.group()
+def registered():
+    """A group which a helper adds commands to"""
+
+
+@registered.command()
+def extra():
+    """A command added with a decorator."""
+
+
+def register(group):
+    group.add_command(standalone)  # pragma: no cover
+
+
+register(registered)
+
+
+@click.group()
+def configured():
+    """A group which a helper adds commands to, without being given the group"""
+
+
+def configure():
+    configured.add_command(standalone)  # pragma: no cover
+
+
+configure()
+
+
+@click.command()
+def chained():
+    """A command added to a group of another module."""
+
+
+app_cli.cli.add_command(chained)
@@ -0,0 +1,68 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+import importlib
+import os
+import sys
+
+import pytest
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Deselect the slow soak tests, unless selected with `-m soak` or given `MKDOCS_CLICK_SOAK_ITERATIONS`.
+    """
+    if os.environ.get("MKDOCS_CLICK_SOAK_ITERATIONS") or "soak" in config.getoption("markexpr"):
+        return
+
+    deselected = [item for item in items if item.get_closest_marker("soak")]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if not item.get_closest_marker("soak")]
+
+
+LAZY_CLI = """
+import click
+
+REGISTRY = ["a"]
+CALLS = []
+
+
+class LazyGroup(click.Group):
+    def list_commands(self, ctx):
+        CALLS.append("list_commands")
+        return list(REGISTRY)
+
+    def get_command(self, ctx, name):
+        CALLS.append(name)
+        return click.Command(name, help=f"Command {name}.") if name in REGISTRY else None
+
+
+cli = LazyGroup("cli")
+"""
+
+
+@pytest.fixture
+def lazy_cli(tmp_path, monkeypatch):
+    """A lazy group listing the commands of a registry, which changes without the module changing."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "mkdocs_click_lazy_cli.py").write_text(LAZY_CLI)
+    yield importlib.import_module("mkdocs_click_lazy_cli")
+    sys.modules.pop("mkdocs_click_lazy_cli", None)
+
+
+@pytest.fixture
+def import_source(tmp_path, monkeypatch):
+    """Import modules written from their source, e.g. by `tests.synthetic.write_source`."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    imported = []
+
+    def import_source(name, source):
+        (tmp_path / f"{name}.py").write_text(source)
+        imported.append(name)
+        return importlib.import_module(name)
+
+    yield import_source
+
+    for name in imported:
+        sys.modules.pop(name, None)
@@ -0,0 +1,165 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+"""
+Generate random command trees, as the source of modules defining them.
+"""
+
+from textwrap import indent
+
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet kilo lima mike november oscar papa "
+    "quebec romeo sierra tango uniform victor whiskey xray yankee zulu"
+).split()
+
+ASCII_ART = ["  ___  ", " / _ \\ ", "| |_| |", " \\___/ "]
+
+
+class _Source(str):
+    """A value written as is in the generated source, rather than as its `repr()`."""
+
+
+def _words(rng, low=1, high=6):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def _sentence(rng):
+    return f"{_words(rng).capitalize()}."
+
+
+def _make_help(rng):
+    paragraphs = [_sentence(rng) for _ in range(rng.randint(1, 3))]
+    if rng.random() < 0.3:
+        paragraphs.insert(0, "\b\n" + "\n".join(ASCII_ART))
+    return "\n\n".join(paragraphs)
+
+
+def _make_option(rng, index):
+    name = f"--{rng.choice(WORDS)}-{index}"
+    decls = [name, f"-{chr(ord('a') + index)}"] if rng.random() < 0.3 else [name]
+    kwargs = {"help": _sentence(rng)} if rng.random() < 0.8 else {}
+
+    kind = rng.choice(
+        ["str", "int", "flag", "choice", "datetime", "intrange", "floatrange", "path"]
+    )
+    if kind == "str":
+        if rng.random() < 0.5:
+            kwargs["default"] = rng.choice(WORDS)
+    elif kind == "int":
+        kwargs["type"] = _Source("int")
+        kwargs["default"] = rng.randint(0, 100)
+    elif kind == "flag":
+        kwargs["is_flag"] = True
+    elif kind == "choice":
+        choices = sorted(set(rng.sample(WORDS, rng.randint(2, 4))))
+        kwargs["type"] = _Source(f"click.Choice({choices!r})")
+        if rng.random() < 0.5:
+            kwargs["default"] = choices[0]
+    elif kind == "datetime":
+        kwargs["type"] = _Source("click.DateTime()")
+        if rng.random() < 0.5:
+            kwargs["default"] = "2020-01-01"
+    elif kind == "intrange":
+        low = rng.randint(-5, 5)
+        kwargs["type"] = _Source(f"click.IntRange({low}, {low + rng.randint(1, 20)})")
+        kwargs["default"] = low
+    elif kind == "floatrange":
+        kwargs["type"] = _Source(f"click.FloatRange(min=0.5, clamp={rng.random() < 0.5})")
+    else:
+        kwargs["type"] = _Source("click.Path(exists=False)")
+
+    if rng.random() < 0.2:
+        kwargs["required"] = True
+    if rng.random() < 0.2 and kind not in ("flag", "intrange"):
+        kwargs["multiple"] = True
+        kwargs.pop("default", None)
+    if rng.random() < 0.3:
+        kwargs["show_default"] = True
+    if rng.random() < 0.25:
+        kwargs["hidden"] = True
+
+    return {"kind": "option", "decls": decls, "kwargs": kwargs}
+
+
+def make_command(rng, name, depth, counter, inherited=()):
+    """Return the specification of a random command tree, to be written with `write_source`."""
+    counter[0] += 1
+    spec = {
+        "name": name,
+        "function": f"command_{counter[0]}" if depth else name,
+        "group": depth == 0 or (depth < 3 and rng.random() < 0.6),
+        "kwargs": {},
+        "help": _make_help(rng) if rng.random() < 0.85 else None,
+        "params": [_make_option(rng, i) for i in range(rng.randint(0, 5))],
+        "children": [],
+    }
+
+    # Options shared with parent commands, e.g. through a common decorator.
+    names = {decl for param in spec["params"] for decl in param["decls"]}
+    for param in inherited:
+        if rng.random() < 0.5 and not names.intersection(param["decls"]):
+            spec["params"].append(param)
+            names.update(param["decls"])
+
+    if rng.random() < 0.3:
+        spec["params"].append({"kind": "argument", "decls": [f"{rng.choice(WORDS)}"], "kwargs": {}})
+    if depth and rng.random() < 0.15:
+        spec["kwargs"]["hidden"] = True
+    if rng.random() < 0.2:
+        spec["kwargs"]["short_help"] = _sentence(rng)
+    if rng.random() < 0.2:
+        spec["kwargs"]["context_settings"] = {"max_content_width": rng.randint(40, 120)}
+
+    if spec["group"]:
+        names = sorted(set(rng.sample(WORDS, rng.randint(1, 4))))
+        inherited = [param for param in spec["params"] if param["kind"] == "option"]
+        spec["children"] = [
+            make_command(rng, child, depth + 1, counter, inherited) for child in names
+        ]
+
+    return spec
+
+
+def write_source(spec, reveal=False):
+    """Write the module source defining the command tree of `spec`, with nothing hidden if `reveal`."""
+
+    def write_value(value):
+        return value if isinstance(value, _Source) else repr(value)
+
+    def write_kwargs(kwargs):
+        return ", ".join(
+            f"{key}={write_value(value)}"
+            for key, value in kwargs.items()
+            if not (reveal and key == "hidden")
+        )
+
+    def write_command(spec, parent):
+        decorator = "group" if spec["group"] else "command"
+        args = ", ".join(filter(None, [repr(spec["name"]), write_kwargs(spec["kwargs"])]))
+        lines = [f"@{parent}.{decorator}({args})"]
+        for param in spec["params"]:
+            args = ", ".join(
+                filter(None, [*map(repr, param["decls"]), write_kwargs(param["kwargs"])])
+            )
+            lines.append(f"@click.{param['kind']}({args})")
+        lines.append(f"def {spec['function']}(**kwargs):")
+        lines.append(indent(repr(spec["help"]) if spec["help"] is not None else "pass", "    "))
+        lines.append("")
+        for child in spec["children"]:
+            lines.extend(write_command(child, spec["function"]))
+        return lines
+
+    return "\n".join(["import click", "", *write_command(spec, "click")])
+
+
+def make_options(rng):
+    """Return random options of `make_command_docs`, except those that change the layout of pages."""
+    return {
+        "style": rng.choice(["plain", "table"]),
+        "remove_ascii_art": rng.random() < 0.5,
+        "show_hidden": rng.random() < 0.5,
+        "list_subcommands": rng.random() < 0.5,
+        "has_attr_list": rng.random() < 0.5,
+        "dedupe_options": rng.random() < 0.5,
+        "dedupe_commands": rng.random() < 0.5,
+    }
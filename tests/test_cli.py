@@ -0,0 +1,144 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+import json
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from mkdocs_click._cli import cli
+
+EXPECTED = (Path(__file__).parent / "app" / "expected.md").read_text()
+EXPECTED_SUB = (Path(__file__).parent / "app" / "expected-sub.md").read_text()
+
+
+def test_render_stdout():
+    result = CliRunner().invoke(cli, ["render", "tests.app.cli:cli"])
+    assert result.exit_code == 0, result.output
+    assert result.output == EXPECTED
+
+
+def test_render_options(tmp_path):
+    output = tmp_path / "cli.md"
+    result = CliRunner().invoke(
+        cli,
+        ["render", "tests.app.cli:cli", "--list-subcommands", "-o", str(output)],
+    )
+    assert result.exit_code == 0, result.output
+    assert output.read_text() == EXPECTED_SUB
+
+
+def test_render_attr_list():
+    result = CliRunner().invoke(cli, ["render", "tests.app.cli:cli", "--attr-list"])
+    assert result.exit_code == 0, result.output
+    assert "## cli bar { #cli-bar data-toc-label='bar' }" in result.output
+
+
+def test_render_invalid_target():
+    result = CliRunner().invoke(cli, ["render", "tests.app.cli"])
+    assert result.exit_code == 1
+    assert "must be in the form '<module>:<command>'" in result.output
+
+
+def test_render_manifest(tmp_path):
+    manifest = tmp_path / "manifest.toml"
+    manifest.write_text(
+        f"""
+[[cli]]
+module = "tests.app.cli"
+command = "cli"
+output = "{(tmp_path / "cli.md").as_posix()}"
+
+[[cli]]
+module = "tests.app.cli"
+command = "group"
+prog_name = "custom"
+output = "{(tmp_path / "group.md").as_posix()}"
+"""
+    )
+
+    result = CliRunner().invoke(cli, ["render", "--manifest", str(manifest), "-j", "2"])
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "cli.md").read_text() == EXPECTED
+    assert (tmp_path / "group.md").read_text() == EXPECTED.replace("cli", "custom")
+
+
+def test_render_shards(tmp_path):
+    timings = tmp_path / "timings.json"
+    result = CliRunner().invoke(
+        cli, ["render", "tests.app.cli:cli", "--record-timings", str(timings), "-o", "-"]
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(json.loads(timings.read_text())) == ["cli", "cli bar", "cli bar hello", "cli foo"]
+
+    # More shards than commands, so that some are empty.
+    shards = [tmp_path / f"shard-{k}.md" for k in range(1, 6)]
+    for k, shard in enumerate(shards, 1):
+        result = CliRunner().invoke(
+            cli,
+            [
+                "render",
+                "tests.app.cli:cli",
+                "--shard",
+                f"{k}/5",
+                "--shard-timings",
+                str(timings),
+                "-o",
+                str(shard),
+            ],
+        )
+        assert result.exit_code == 0, result.output
+        assert shard.read_text().startswith(f"<!-- mkdocs-click shard {k}/5 -->")
+
+    result = CliRunner().invoke(cli, ["merge", *map(str, reversed(shards))])
+    assert result.exit_code == 0, result.output
+    assert result.output == EXPECTED
+
+    result = CliRunner().invoke(cli, ["merge", *map(str, shards[1:])])
+    assert result.exit_code == 1
+    assert "Missing shards: 1/5" in result.output
+
+
+def test_render_invalid_shard():
+    result = CliRunner().invoke(cli, ["render", "tests.app.cli:cli", "--shard", "6/5"])
+    assert result.exit_code == 1
+    assert "must be in the form '<k>/<n>'" in result.output
+
+
+def test_render_templates(tmp_path):
+    (tmp_path / "title.md").write_text("$level `$command_path`\n")
+    result = CliRunner().invoke(cli, ["render", "tests.app.cli:cli", "--templates", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("# `cli`\n")
+    assert "## `cli bar`" in result.output
+
+    result = CliRunner().invoke(
+        cli, ["render", "tests.app.cli:cli", "--templates", str(tmp_path / "missing")]
+    )
+    assert result.exit_code == 2
+    assert "does not exist" in result.output
+
+
+def test_render_evaluate_defaults(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "mkdocs_click_cli_defaults.py").write_text(
+        "import click\n\n@click.command()\n@click.option('--user', default=lambda: 'alice')\n"
+        "def cli(user):\n    pass\n"
+    )
+    try:
+        result = CliRunner().invoke(
+            cli,
+            [
+                "render",
+                "mkdocs_click_cli_defaults:cli",
+                "--style",
+                "table",
+                "--evaluate-defaults",
+                "1",
+            ],
+        )
+    finally:
+        sys.modules.pop("mkdocs_click_cli_defaults", None)
+    assert result.exit_code == 0, result.output
+    assert "| `--user` | text | N/A | `alice` |" in result.output
@@ -0,0 +1,202 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+import os
+import socket
+import stat
+import sys
+import tempfile
+import threading
+from textwrap import dedent
+
+import pytest
+from markdown import Markdown
+
+import mkdocs_click
+import mkdocs_click._daemon
+from mkdocs_click._daemon import DaemonServer, get_socket_path
+from mkdocs_click._docs import reset_build_caches
+from mkdocs_click._exceptions import MkDocsClickException
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Requires Unix sockets")
+
+SOURCE = dedent(
+    """
+    ::: mkdocs-click
+        :module: tests.app.cli
+        :command: cli
+
+    ::: mkdocs-click
+        :module: tests.app.cli
+        :command: cli
+        :html: True
+    """
+)
+
+
+def _convert(source, **config):
+    md = Markdown(extensions=["attr_list", "fenced_code", mkdocs_click.makeExtension(**config)])
+    return md.convert(source)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    path = str(tmp_path / "daemon.sock")
+    monkeypatch.setenv("MKDOCS_CLICK_DAEMON_SOCKET", path)
+    server = DaemonServer(path)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    thread.join()
+    server.server_close()
+
+
+def test_daemon(server):
+    """
+    Blocks rendered by the daemon are the same as in-process, with anchors unique on the page.
+    """
+    assert _convert(SOURCE, daemon=True) == _convert(SOURCE)
+    assert server.requests == 2
+    assert stat.S_IMODE(os.stat(server.server_address).st_mode) == 0o600
+
+
+def test_daemon_reloads(server, tmp_path, monkeypatch):
+    """
+    The daemon imports commands again once their source changes.
+    """
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = tmp_path / "mkdocs_click_daemon_cli.py"
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :module: mkdocs_click_daemon_cli
+            :command: cli
+        """
+    )
+
+    try:
+        module.write_text("import click\n\n@click.command()\ndef cli():\n    'Before.'\n")
+        assert "Before." in _convert(source, daemon=True)
+
+        module.write_text("import click\n\n@click.command()\ndef cli():\n    'After, changed.'\n")
+        assert "After, changed." in _convert(source, daemon=True)
+        assert server.requests == 2
+    finally:
+        sys.modules.pop("mkdocs_click_daemon_cli", None)
+
+
+def test_daemon_restarts(tmp_path, monkeypatch):
+    """
+    The daemon stops to be restarted once the source of a module it cannot unload changes.
+    """
+    monkeypatch.syspath_prepend(str(tmp_path))
+    path = str(tmp_path / "daemon.sock")
+    monkeypatch.setenv("MKDOCS_CLICK_DAEMON_SOCKET", path)
+    package = tmp_path / "mkdocs_click_daemon_app"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "cli.py").write_text(
+        "import click\nimport mkdocs_click_daemon_helpers\n\n"
+        "@click.command(help=mkdocs_click_daemon_helpers.TEXT)\ndef cli():\n    pass\n"
+    )
+    helpers = tmp_path / "mkdocs_click_daemon_helpers.py"
+    helpers.write_text("TEXT = 'Before.'\n")
+    source = "::: mkdocs-click\n    :module: mkdocs_click_daemon_app.cli\n    :command: cli\n"
+
+    server = DaemonServer(path, idle_timeout=10)
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    try:
+        assert "Before." in _convert(source, daemon=True)
+
+        helpers.write_text("TEXT = 'After, changed.'\n")
+        os.utime(helpers, ns=(0, 0))
+        _convert(source, daemon=True)
+        thread.join(5)
+        assert not thread.is_alive()
+        assert server.restart
+        assert server.requests == 2
+        assert not os.path.exists(path)
+    finally:
+        server.idle = True
+        thread.join()
+        for name in [
+            "mkdocs_click_daemon_helpers",
+            "mkdocs_click_daemon_app.cli",
+            "mkdocs_click_daemon_app",
+        ]:
+            sys.modules.pop(name, None)
+
+
+def test_daemon_lazy_group_rebuild(server, lazy_cli):
+    """
+    The daemon resolves the sub-commands of lazy groups again for each build.
+    """
+    source = "::: mkdocs-click\n    :module: mkdocs_click_lazy_cli\n    :command: cli\n"
+    assert "Command a." in _convert(source, daemon=True)
+
+    lazy_cli.REGISTRY[:] = ["b"]
+    reset_build_caches()
+    html = _convert(source, daemon=True)
+    assert "Command b." in html
+    assert "Command a." not in html
+    assert server.requests == 2
+
+
+def test_daemon_errors(server):
+    """
+    Errors are reported by rendering the block in-process.
+    """
+    source = "::: mkdocs-click\n    :module: tests.app.cli\n"
+    with pytest.raises(MkDocsClickException, match="Option 'command' is required"):
+        _convert(source, daemon=True)
+    assert server.requests == 1
+
+
+def test_daemon_absent(tmp_path, monkeypatch):
+    """
+    Without a daemon, blocks are rendered in-process, and a daemon is started for the next builds.
+    """
+    monkeypatch.setenv("MKDOCS_CLICK_DAEMON_SOCKET", str(tmp_path / "daemon.sock"))
+    started = []
+    monkeypatch.setattr(mkdocs_click._daemon, "start_daemon", lambda: started.append(True))
+
+    assert _convert(SOURCE, daemon=True) == _convert(SOURCE)
+    assert started == [True, True]
+
+
+def test_daemon_already_running(server):
+    with pytest.raises(MkDocsClickException, match="already listening"):
+        DaemonServer(server.server_address)
+
+
+def test_daemon_foreign_socket(server, monkeypatch):
+    """
+    Sockets of other users are not trusted, nor replaced by a new daemon.
+    """
+    uid = os.getuid()
+    monkeypatch.setattr(mkdocs_click._daemon.os, "getuid", lambda: uid + 1)
+    started = []
+    monkeypatch.setattr(mkdocs_click._daemon, "start_daemon", lambda: started.append(True))
+
+    assert _convert(SOURCE, daemon=True) == _convert(SOURCE)
+    assert server.requests == 0
+    assert started == []
+
+
+def test_socket_path(tmp_path, monkeypatch):
+    monkeypatch.delenv("MKDOCS_CLICK_DAEMON_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    directory = os.path.dirname(get_socket_path())
+    assert directory == str(tmp_path / f"mkdocs-click-{os.getuid()}")
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+    # A directory that others can write to may hold a socket of theirs.
+    os.chmod(directory, 0o777)
+    with pytest.raises(MkDocsClickException, match="only the current user can access"):
+        get_socket_path()
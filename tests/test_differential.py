@@ -0,0 +1,190 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+"""
+Check that every alternative way of rendering a command gives the same output as the reference renderer,
+on randomly generated command trees.
+"""
+
+import asyncio
+import copy
+import random
+from concurrent.futures import ThreadPoolExecutor
+from textwrap import dedent
+
+import click
+import pytest
+from markdown import Markdown
+
+import mkdocs_click
+from mkdocs_click._cache import LRUCache
+from mkdocs_click._docs import make_command_docs, make_command_docs_async
+from mkdocs_click._static import load_command_statically
+from tests.synthetic import make_command, make_options, write_source
+
+SEEDS = range(20)
+
+
+class _LazyGroup(click.Group):
+    def list_commands(self, ctx):
+        return list(self.lazy_commands)
+
+    def get_command(self, ctx, name):
+        return self.lazy_commands.get(name)
+
+
+def _make_lazy(command, memo=None):
+    """
+    Return a copy of the command tree where groups resolve their subcommands lazily, with one copy of
+    groups registered in several places.
+    """
+    if not isinstance(command, click.Group):
+        return command
+
+    memo = {} if memo is None else memo
+    if id(command) not in memo:
+        lazy = memo[id(command)] = copy.copy(command)
+        lazy.__class__ = _LazyGroup
+        lazy.lazy_commands = {name: _make_lazy(sub, memo) for name, sub in command.commands.items()}
+        lazy.commands = {}
+    return memo[id(command)]
+
+
+def _render(command, **options):
+    return "\n".join(make_command_docs("cli", command, **options))
+
+
+def _make_option_sets(rng, count=3):
+    """Return random option sets, each followed by a copy that only differs by one option."""
+    option_sets = []
+    for _ in range(count):
+        options = make_options(rng)
+        key = rng.choice([key for key in options if key != "style"])
+        option_sets.extend([options, {**options, key: not options[key]}])
+    return option_sets
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_differential(seed, import_source):
+    """
+    The subtree cache, the async API, threads, lazy groups, static loading and shards render the same as
+    the reference renderer.
+
+    Every reference is rendered from a fresh import, while the other renderers share the same commands
+    and cache for all option sets, so that leaks between renders are detected.
+    """
+    rng = random.Random(seed)
+    source = write_source(make_command(rng, "cli", 0, [0]))
+    option_sets = _make_option_sets(rng)
+    references = [
+        _render(import_source(f"mkdocs_click_reference_{seed}_{i}", source).cli, **options)
+        for i, options in enumerate(option_sets)
+    ]
+
+    module = f"mkdocs_click_differential_{seed}"
+    command = import_source(module, source).cli
+    lazy = _make_lazy(command)
+    static = load_command_statically(module, "cli")
+    assert static is not command
+
+    cache = LRUCache(maxsize=4096)
+
+    async def render_async(options):
+        return "\n".join(
+            [line async for line in make_command_docs_async("cli", command, **options)]
+        )
+
+    for options, reference in zip(option_sets, references):
+        assert _render(command, **options) == reference, "sync"
+        assert _render(command, cache=cache, **options) == reference, "cold cache"
+        assert _render(command, cache=cache, **options) == reference, "warm cache"
+        assert asyncio.run(render_async(options)) == reference, "async"
+        assert _render(lazy, **options) == reference, "lazy groups"
+        assert _render(lazy, cache=cache, **options) == reference, "lazy groups, cached"
+        assert _render(static, **options) == reference, "static"
+        shards = [make_command_docs("cli", command, shard=(k, 3), **options) for k in (1, 2, 3)]
+        assert "\n".join(line for shard in shards for line in shard) == reference, "shards"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda options: _render(command, **options), option_sets * 4))
+    assert results == references * 4, "threads"
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_differential_shared_subgroup(seed, import_source):
+    """
+    A group registered in several places is rendered the same by the async API, with lazy groups too,
+    including when `dedupe_commands` links its later occurrences to the first one.
+    """
+    rng = random.Random(seed)
+    counter = [0]
+    spec = make_command(rng, "cli", 0, counter)
+    shared_spec = {**make_command(rng, "shared", 1, counter), "group": True}
+    source = write_source(spec) + "\n\n" + write_source(shared_spec)
+    options = {**make_options(rng), "dedupe_commands": True}
+
+    def load(name):
+        module = import_source(name, source)
+        shared = getattr(module, shared_spec["function"])
+        db = click.Group("db", help="Database.")
+        db.add_command(shared)
+        module.cli.add_command(db)
+        module.cli.add_command(shared)
+        return module.cli
+
+    reference = _render(load(f"mkdocs_click_shared_reference_{seed}"), **options)
+    command = load(f"mkdocs_click_shared_{seed}")
+
+    async def render_async(command):
+        return "\n".join(
+            [line async for line in make_command_docs_async("cli", command, **options)]
+        )
+
+    assert asyncio.run(render_async(command)) == reference, "async"
+    assert _render(_make_lazy(command), **options) == reference, "lazy groups"
+    assert asyncio.run(render_async(_make_lazy(command))) == reference, "lazy groups, async"
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_differential_show_hidden(seed, import_source):
+    """
+    With `show_hidden`, the output is the same as for the same commands without anything hidden.
+    """
+    rng = random.Random(seed)
+    spec = make_command(rng, "cli", 0, [0])
+    options = {**make_options(rng), "show_hidden": True}
+
+    command = import_source(f"mkdocs_click_hidden_{seed}", write_source(spec)).cli
+    revealed = import_source(f"mkdocs_click_revealed_{seed}", write_source(spec, reveal=True)).cli
+
+    assert _render(command, **options) == _render(revealed, **options)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_differential_html(seed, import_source):
+    """
+    With `html`, pages are the same as when usage and options are rendered by Python-Markdown.
+    """
+    rng = random.Random(seed)
+    spec = make_command(rng, "cli", 0, [0])
+    import_source(f"mkdocs_click_html_{seed}", write_source(spec))
+    options = make_options(rng)
+
+    extensions = ["fenced_code", "tables"]
+    if options.pop("has_attr_list"):
+        extensions.insert(0, "attr_list")
+
+    block = dedent(
+        f"""
+        ::: mkdocs-click
+            :module: mkdocs_click_html_{seed}
+            :command: cli
+        """
+    ) + "".join(f"    :{key}: {value}\n" for key, value in options.items())
+
+    def convert(source):
+        md = Markdown(extensions=extensions)
+        md.registerExtensions([mkdocs_click.makeExtension()], {})
+        return md.convert(source)
+
+    assert convert(block + "    :html: True\n") == convert(block)
@@ -1,14 +1,31 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under the Apache license (see LICENSE)
+import asyncio
+import gc
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from textwrap import dedent
 from typing import cast
 
 import click
 import pytest
 
-from mkdocs_click._docs import _show_options, make_command_docs
+import mkdocs_click._docs
+from mkdocs_click._cache import LRUCache
+from mkdocs_click._docs import (
+    _unhide_options,
+    make_command_docs,
+    make_command_docs_async,
+    make_command_fingerprint,
+    make_command_pages,
+    reset_build_caches,
+)
 from mkdocs_click._exceptions import MkDocsClickException
+from mkdocs_click._templates import Templates, load_templates
+from tests.app.cli import cli as app_cli
 
 
 @click.command()
@@ -356,7 +373,7 @@ def test_show_hidden_group(show_hidden):
     assert (output != "") == show_hidden
 
 
-def test_show_options():
+def test_unhide_options():
     @click.command()
     @click.option("--hidden", hidden=True)
     @click.option("--normal", hidden=False)
@@ -370,9 +387,746 @@ def test_show_options():
     assert opt_hidden.hidden
     assert not opt_normal.hidden
 
-    with _show_options(ctx):
-        assert not opt_hidden.hidden
-        assert not opt_normal.hidden
+    command = _unhide_options(ctx.command)
+    assert command is not ctx.command
+    assert not any(cast(click.Option, param).hidden for param in command.params)
+    assert command.params[1] is opt_normal
 
+    # The original command is left untouched.
     assert opt_hidden.hidden
     assert not opt_normal.hidden
+    assert _unhide_options(command) is command
+
+
+def test_fingerprint_stable():
+    assert make_command_fingerprint("hello", hello) == make_command_fingerprint("hello", hello)
+    assert make_command_fingerprint("hello", hello) != make_command_fingerprint("hi", hello)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        pytest.param(lambda cmd: setattr(cmd, "help", "Changed"), id="help"),
+        pytest.param(lambda cmd: setattr(cmd.params[0], "default", "x"), id="default"),
+        pytest.param(lambda cmd: setattr(cmd.params[0], "hidden", True), id="hidden"),
+        pytest.param(lambda cmd: cmd.context_settings.update(max_content_width=40), id="settings"),
+        pytest.param(
+            lambda cmd: cmd.context_settings.update(default_map={"opt": "b"}), id="default-map"
+        ),
+    ],
+)
+def test_fingerprint_changes(change):
+    @click.group()
+    def _test_group():
+        """Test group."""
+
+    @_test_group.command()
+    @click.option("--opt", type=click.Choice(["a", "b"]), default="a", help="An option.")
+    def _test_cmd(opt):
+        """Test cmd."""
+
+    before = make_command_fingerprint("_test_group", _test_group)
+    change(_test_cmd)
+    assert make_command_fingerprint("_test_group", _test_group) != before
+
+
+def test_fingerprint_ignores_unrendered_settings():
+    """
+    Settings that do not affect the output, like `obj`, may hold objects whose `repr()` changes between
+    processes.
+    """
+    first = click.Command("hello", context_settings={"obj": object()})
+    second = click.Command("hello", context_settings={"obj": object()})
+    assert make_command_fingerprint("hello", first) == make_command_fingerprint("hello", second)
+
+
+def test_fingerprint_ignores_registration_order():
+    first = click.Group("group", commands=[hello, hello_minimal])
+    second = click.Group("group", commands=[hello_minimal, hello])
+    assert make_command_fingerprint("group", first) == make_command_fingerprint("group", second)
+
+
+def test_cache_reuses_unchanged_subtrees(monkeypatch):
+    @click.group()
+    def _test_group():
+        """Test group."""
+
+    @_test_group.command()
+    def first():
+        """First command."""
+
+    @_test_group.command()
+    def second():
+        """Second command."""
+
+    rendered = []
+    make_usage = mkdocs_click._docs._make_usage
+
+    def _make_usage(ctx, **kwargs):
+        rendered.append(ctx.command_path)
+        return make_usage(ctx, **kwargs)
+
+    monkeypatch.setattr(mkdocs_click._docs, "_make_usage", _make_usage)
+
+    cache = LRUCache(maxsize=16)
+    reference = "\n".join(make_command_docs("_test_group", _test_group, list_subcommands=True))
+    output = "\n".join(
+        make_command_docs("_test_group", _test_group, list_subcommands=True, cache=cache)
+    )
+    assert output == reference
+
+    rendered.clear()
+    first.help = "Changed."
+    output = "\n".join(
+        make_command_docs("_test_group", _test_group, list_subcommands=True, cache=cache)
+    )
+    assert output == reference.replace("First command.", "Changed.")
+    assert rendered == ["_test_group", "_test_group first"]
+
+
+def test_render_in_threads():
+    """
+    Rendering the same commands from many threads at once gives the same output as rendering them one
+    at a time.
+    """
+    cache = LRUCache(maxsize=4096)
+    variants = [
+        {"style": style, "show_hidden": show_hidden, "list_subcommands": True, "cache": cache_}
+        for style in ("plain", "table")
+        for show_hidden in (False, True)
+        for cache_ in (None, cache)
+    ]
+
+    def render(options):
+        return "\n".join(make_command_docs("cli", app_cli, **options))
+
+    expected = [render({**options, "cache": None}) for options in variants]
+
+    # Switch threads as often as possible to surface races.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(render, variants * 50))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert results == expected * 50
+
+
+class _ConcurrencyProbe:
+    """Record how many calls are running at the same time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def enter(self):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+    def exit(self):
+        with self.lock:
+            self.running -= 1
+
+
+class _SlowLazyGroup(click.Group):
+    """A group resolving its subcommands from a slow plugin registry."""
+
+    def __init__(self, *args, registry, probe, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.registry = registry
+        self.probe = probe
+
+    def list_commands(self, ctx):
+        return sorted(self.registry)
+
+    def get_command(self, ctx, name):
+        self.probe.enter()
+        time.sleep(0.05)
+        self.probe.exit()
+        return self.registry[name]
+
+
+class _AsyncLazyGroup(_SlowLazyGroup):
+    async def list_commands(self, ctx):
+        return sorted(self.registry)
+
+    async def get_command(self, ctx, name):
+        self.probe.enter()
+        await asyncio.sleep(0.05)
+        self.probe.exit()
+        return self.registry[name]
+
+
+@pytest.mark.parametrize("group_class", [_SlowLazyGroup, _AsyncLazyGroup])
+def test_make_command_docs_async(group_class):
+    """
+    The async API resolves sibling subcommands concurrently and creates the same lines as the sync one.
+    """
+    probe = _ConcurrencyProbe()
+
+    def make_commands():
+        commands = {
+            name: click.Command(name, help=f"The {name} command.")
+            for name in ("one", "two", "three")
+        }
+        commands["four"] = click.Command("four", hidden=True)
+        return commands
+
+    nested = make_commands()
+    commands = make_commands()
+    commands["nested"] = group_class("nested", registry=nested, probe=probe, help="Nested plugins.")
+    group = group_class("plugins", registry=commands, probe=probe, help="Plugins.")
+
+    reference_commands = {
+        **commands,
+        "nested": click.Group("nested", commands=nested, help="Nested plugins."),
+    }
+    reference = click.Group("plugins", commands=reference_commands, help="Plugins.")
+
+    async def render():
+        return [
+            line async for line in make_command_docs_async("plugins", group, list_subcommands=True)
+        ]
+
+    assert asyncio.run(render()) == list(
+        make_command_docs("plugins", reference, list_subcommands=True)
+    )
+    assert probe.max_running > 1
+
+
+def test_make_command_docs_async_options():
+    """
+    The async API takes the same options as the sync one.
+    """
+
+    @click.group()
+    def cli():
+        """Main."""
+
+    @cli.command()
+    @click.option("--region", default=lambda: "eu-west-1", help="The region.")
+    def deploy(region):
+        """Deploy."""
+
+    @cli.command()
+    def status():
+        """Show the status."""
+
+    options = {
+        "style": "table",
+        "shard": (1, 2),
+        "weights": {"cli": 1, "cli deploy": 1, "cli status": 2},
+        "templates": Templates({"option": "- $names: $default"}),
+        "evaluate_defaults": 1,
+    }
+    timings: dict = {}
+    expected_timings: dict = {}
+
+    async def render():
+        return [
+            line async for line in make_command_docs_async("cli", cli, timings=timings, **options)
+        ]
+
+    output = asyncio.run(render())
+    assert output == list(make_command_docs("cli", cli, timings=expected_timings, **options))
+    assert "- `--region`: `eu-west-1`" in output
+    assert "Show the status." not in "\n".join(output)
+    assert timings.keys() == expected_timings.keys() == {"cli", "cli deploy"}
+
+
+def test_resolution_cache():
+    """
+    Subcommands of lazy groups are resolved once for all blocks of a build, until the group is replaced.
+    """
+    calls = []
+
+    class _CountingGroup(click.Group):
+        def list_commands(self, ctx):
+            calls.append("list")
+            return ["hello"]
+
+        def get_command(self, ctx, name):
+            calls.append(name)
+            return hello
+
+    group = _CountingGroup("group", help="Group help")
+    reference = list(make_command_docs("group", group))
+    assert calls == ["list", "hello"]
+
+    # Another block, documenting the same group in a different place.
+    assert list(make_command_docs("group", group, depth=1, style="table"))
+    assert calls == ["list", "hello"]
+
+    # A reloaded module creates new groups.
+    del group
+    gc.collect()
+    group = _CountingGroup("group", help="Group help")
+    assert list(make_command_docs("group", group)) == reference
+    assert calls == ["list", "hello", "list", "hello"]
+
+    # The next build resolves them again, as lazy groups may find other commands.
+    reset_build_caches()
+    assert list(make_command_docs("group", group)) == reference
+    assert calls == ["list", "hello", "list", "hello", "list", "hello"]
+
+
+def test_draft():
+    """
+    Drafts only contain titles, the first line of descriptions and usages, down to `draft_depth`.
+    """
+
+    @click.group()
+    @click.option("--debug", help="Include debug output")
+    def cli():
+        """
+        Main entrypoint.
+
+        More details.
+        """
+
+    @cli.group()
+    def sub():
+        """Subgroup."""
+
+    @sub.command()
+    def leaf():
+        """Leaf command."""
+
+    expected = dedent(
+        """
+        # cli
+
+        Main entrypoint.
+
+        **Usage:**
+
+        ```text
+        cli [OPTIONS] COMMAND [ARGS]...
+        ```
+
+        ## sub
+
+        Subgroup.
+
+        **Usage:**
+
+        ```text
+        cli sub [OPTIONS] COMMAND [ARGS]...
+        ```
+        """
+    ).lstrip()
+
+    output = "\n".join(make_command_docs("cli", cli, draft=True, draft_depth=1))
+    assert output == expected
+
+    # Without `draft_depth`, all levels are rendered.
+    output = "\n".join(make_command_docs("cli", cli, draft=True))
+    assert output.startswith(expected)
+    assert "### leaf" in output
+
+
+def _global_options(f):
+    f = click.option("--debug", is_flag=True, help="Include debug output.")(f)
+    return click.option("-c", "--config", help="Configuration file.")(f)
+
+
+@click.group()
+@_global_options
+def _global_options_cli(debug, config):
+    """Main entrypoint."""
+
+
+@_global_options_cli.group()
+@_global_options
+def _global_options_sub(debug, config):
+    """Subgroup."""
+
+
+@_global_options_sub.command()
+@click.option("--debug", is_flag=True, help="Include debug output.")
+@click.option("-c", "--config", help="Greeting configuration.")
+@click.option("--name", help="Name to greet.")
+def _global_options_hello(debug, config, name):
+    """Say hello."""
+
+
+@pytest.mark.parametrize("has_attr_list", [False, True])
+def test_dedupe_options(has_attr_list):
+    """
+    With `dedupe_options`, options rendered by a parent command are not repeated by its sub-commands.
+    """
+    output = "\n".join(
+        make_command_docs(
+            "cli",
+            _global_options_cli,
+            style="table",
+            has_attr_list=has_attr_list,
+            dedupe_options=True,
+        )
+    )
+    link = "[cli](#cli)" if has_attr_list else "`cli`"
+
+    # Rendered once by the root command, and the help option by every command.
+    assert output.count("| `-c`, `--config` | text | Configuration file. | None |") == 1
+    assert output.count("| `--debug` | boolean | Include debug output. | `False` |") == 1
+    assert output.count("| `--help` | boolean | Show this message and exit. | `False` |") == 3
+    assert output.count(f"**Inherited options:** `--config`, `--debug` (see {link})") == 1
+    # Options that differ from the parent's are kept.
+    assert "| `-c`, `--config` | text | Greeting configuration. | None |" in output
+    assert output.count(f"**Inherited options:** `--debug` (see {link})") == 1
+
+
+def test_dedupe_options_plain():
+    """
+    The `dedupe_options` option only applies to the `table` style.
+    """
+    assert list(make_command_docs("cli", _global_options_cli, dedupe_options=True)) == list(
+        make_command_docs("cli", _global_options_cli)
+    )
+
+
+@pytest.mark.parametrize("has_attr_list", [False, True])
+def test_dedupe_commands(has_attr_list):
+    """
+    With `dedupe_commands`, commands registered at several places are documented once.
+    """
+
+    @click.command()
+    @click.option("--to", help="Target revision.")
+    def migrate(to):
+        """Migrate the database."""
+
+    @click.group()
+    def tools():
+        """Tools."""
+
+    tools.add_command(migrate)
+
+    @click.group()
+    def db():
+        """Database commands."""
+
+    db.add_command(migrate)
+    db.add_command(tools)
+
+    @click.group()
+    def cli():
+        """Main entrypoint."""
+
+    cli.add_command(db)
+    cli.add_command(migrate)
+    cli.add_command(tools)
+
+    output = "\n".join(
+        make_command_docs("cli", cli, has_attr_list=has_attr_list, dedupe_commands=True)
+    )
+
+    assert output.count("Migrate the database.") == 1
+    assert output.count("Target revision.") == 1
+    assert output.count("Tools.") == 1
+    if has_attr_list:
+        assert output.count("Same as [cli db migrate](#cli-db-migrate).") == 2
+        assert output.count("Same as [cli db tools](#cli-db-tools).") == 1
+        assert "## cli migrate { #cli-migrate data-toc-label='migrate' }" in output
+    else:
+        assert output.count("Same as `cli db migrate`.") == 2
+        assert output.count("Same as `cli db tools`.") == 1
+        assert "## migrate" in output
+
+    assert "\n".join(make_command_docs("cli", cli)).count("Migrate the database.") == 4
+
+
+def test_make_command_pages():
+    leaf = click.Command("leaf", help="Leaf command.")
+    other = click.Command("other", help="Other command.")
+    cli = click.Group("cli", commands=[leaf, other], help="Main entrypoint.")
+
+    cache = LRUCache(maxsize=16)
+    first = {page.names: page for page in make_command_pages("cli", cli, cache=cache)}
+    assert list(first) == [(), ("leaf",), ("other",)]
+    assert first[()].title == "cli"
+    assert first[()].lines[0] == "# cli"
+    assert "- *[leaf](leaf/index.md)*: Leaf command." in first[()].lines
+    assert "Other command." not in "\n".join(first[("leaf",)].lines)
+    assert "cli leaf [OPTIONS]" in first[("leaf",)].lines
+
+    # Only the pages showing something that changed are rendered again.
+    leaf.params.append(click.Option(["--new"]))
+    second = {page.names: page for page in make_command_pages("cli", cli, cache=cache)}
+    assert second[()].lines is first[()].lines
+    assert second[("other",)].lines is first[("other",)].lines
+    assert any("--new" in line for line in second[("leaf",)].lines)
+
+    leaf.help = "Changed."
+    third = {page.names: page for page in make_command_pages("cli", cli, cache=cache)}
+    assert "- *[leaf](leaf/index.md)*: Changed." in third[()].lines
+    assert third[("other",)].lines is first[("other",)].lines
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        pytest.param({}, id="plain"),
+        pytest.param({"has_attr_list": True, "list_subcommands": True}, id="links"),
+        pytest.param(
+            {"style": "table", "dedupe_options": True, "has_attr_list": True}, id="dedupe"
+        ),
+        pytest.param({"dedupe_commands": True, "draft": True, "draft_depth": 1}, id="draft"),
+    ],
+)
+def test_shard(options):
+    full = list(make_command_docs("cli", app_cli, **options))
+
+    for count in range(1, 6):
+        shards = [
+            list(make_command_docs("cli", app_cli, shard=(k, count), **options))
+            for k in range(1, count + 1)
+        ]
+        assert [line for shard in shards for line in shard] == full
+
+    # Every shard starts with a whole section.
+    shards = [list(make_command_docs("cli", app_cli, shard=(k, 2), **options)) for k in (1, 2)]
+    assert shards[1][0].startswith("#")
+
+
+def test_shard_weights():
+    def first_titles(weights):
+        return [
+            next(iter(make_command_docs("cli", app_cli, shard=(k, 2), weights=weights)))
+            for k in (1, 2)
+        ]
+
+    # Sections are `cli`, `cli bar`, `cli bar hello` and `cli foo`.
+    assert first_titles(None) == ["# cli", "### hello"]
+    assert first_titles({"cli": 9.0, "cli bar": 1.0, "cli foo": 1.0}) == ["# cli", "## bar"]
+    assert first_titles({"cli": 1.0, "cli bar": 1.0, "cli foo": 9.0}) == ["# cli", "## foo"]
+
+    with pytest.raises(MkDocsClickException, match="between 1/2 and 2/2"):
+        list(make_command_docs("cli", app_cli, shard=(3, 2)))
+
+
+def test_timings():
+    timings = {}
+    list(make_command_docs("cli", app_cli, timings=timings))
+    assert sorted(timings) == ["cli", "cli bar", "cli bar hello", "cli foo"]
+    assert all(duration > 0 for duration in timings.values())
+
+    # Only rendered sections are timed.
+    timings = {}
+    list(make_command_docs("cli", app_cli, shard=(2, 2), timings=timings))
+    assert sorted(timings) == ["cli bar hello", "cli foo"]
+
+
+def test_templates():
+    templates = Templates(
+        {
+            "title": "$level `$command_path` {#$anchor}",
+            "description": "> $description",
+            "usage": "    $usage",
+            "option": "- $names ($type): $help",
+            "subcommand": "- [$name](#$anchor)",
+        }
+    )
+    output = "\n".join(
+        make_command_docs("cli", app_cli, list_subcommands=True, templates=templates)
+    )
+
+    assert output.startswith(
+        dedent(
+            """
+            # `cli` {#cli}
+
+            > Main entrypoint for this dummy program
+
+                cli [OPTIONS] COMMAND [ARGS]...
+
+            **Options:**
+
+            - `--help` (boolean): Show this message and exit.
+
+            **Subcommands**
+
+            - [bar](#cli-bar)
+            - [foo](#cli-foo)
+
+            ## `cli bar` {#cli-bar}
+            """
+        ).lstrip()
+    )
+
+    # Templates are part of the cache key.
+    cache = LRUCache(maxsize=64)
+    assert "\n".join(
+        make_command_docs("cli", app_cli, cache=cache, templates=templates)
+    ) != "\n".join(make_command_docs("cli", app_cli, cache=cache))
+
+
+def test_templates_sections():
+    templates = Templates({"options": "Options:\n$rows", "subcommands": "Commands: $entries"})
+    output = "\n".join(
+        make_command_docs("cli", app_cli, list_subcommands=True, templates=templates)
+    )
+
+    # Entries without a template keep their built-in layout.
+    assert "Options:\n| `--help` | boolean | Show this message and exit. | `False` |\n" in output
+    assert "Commands: - *bar*: The bar command\n- *foo*:" in output
+
+
+def test_templates_invalid():
+    with pytest.raises(MkDocsClickException, match="Unknown template 'header'"):
+        Templates({"header": "$name"})
+
+    with pytest.raises(MkDocsClickException, match="Template 'usage' uses unknown field 'name'"):
+        Templates({"usage": "$name"})
+
+
+def test_load_templates(tmp_path):
+    (tmp_path / "title.md").write_text("# $name\n")
+    templates = load_templates(tmp_path)
+    assert load_templates(tmp_path) is templates
+    assert templates.render("title", level="#", name="cli", command_path="cli", anchor="cli") == [
+        "# cli",
+        "",
+    ]
+
+    # Templates are compiled again once changed.
+    (tmp_path / "usage.md").write_text("$usage")
+    assert "usage" in load_templates(tmp_path)
+
+    with pytest.raises(MkDocsClickException, match="does not exist"):
+        load_templates(tmp_path / "missing")
+
+
+def test_evaluate_defaults():
+    calls = []
+    region = "eu-west-1"
+
+    def get_region():
+        calls.append(True)
+        return region
+
+    @click.group()
+    @click.option("--region", default=get_region, show_default=True)
+    def cli(region):
+        """CLI."""
+
+    @cli.command()
+    @click.option("--region", default=get_region)
+    def sub(region):
+        """Sub."""
+
+    table = "\n".join(make_command_docs("cli", cli, style="table", evaluate_defaults=1))
+    assert "| `--region` | text | N/A | `eu-west-1` |" in table
+    plain = "\n".join(make_command_docs("cli", cli, evaluate_defaults=1))
+    assert "[default: eu-west-1]" in plain
+
+    # Callables are evaluated once per build, and the commands are left untouched.
+    assert calls == [True]
+    assert cli.params[0].default is get_region
+    assert "<function" in "\n".join(make_command_docs("cli", cli, style="table"))
+
+    region = "us-east-1"
+    reset_build_caches()
+    table = "\n".join(make_command_docs("cli", cli, style="table", evaluate_defaults=1))
+    assert "| `--region` | text | N/A | `us-east-1` |" in table
+    assert calls == [True, True]
+
+
+def test_evaluate_defaults_cached_subtree():
+    """
+    Cached sub-trees are only reused while the dynamic defaults of all their commands are unchanged.
+    """
+    region = "eu"
+
+    @click.group()
+    def cli():
+        """CLI."""
+
+    @cli.command()
+    @click.option("--region", default=lambda: region)
+    def sub(region):
+        """Sub."""
+
+    cache = LRUCache(maxsize=16)
+    output = "\n".join(
+        make_command_docs("cli", cli, style="table", evaluate_defaults=1, cache=cache)
+    )
+    assert "| `--region` | text | N/A | `eu` |" in output
+
+    region = "us"
+    reset_build_caches()
+    output = "\n".join(
+        make_command_docs("cli", cli, style="table", evaluate_defaults=1, cache=cache)
+    )
+    assert "| `--region` | text | N/A | `us` |" in output
+    assert "`eu`" not in output
+
+
+def test_evaluate_defaults_fallback():
+    done = threading.Event()
+
+    def slow():
+        done.wait(5)
+        return "late"
+
+    def failing():
+        raise OSError("no config")
+
+    @click.command()
+    @click.option("--slow", default=slow)
+    @click.option("--failing", default=failing)
+    def cli(slow, failing):
+        """CLI."""
+
+    try:
+        start = time.perf_counter()
+        output = "\n".join(make_command_docs("cli", cli, style="table", evaluate_defaults=0.05))
+        assert time.perf_counter() - start < 1
+    finally:
+        done.set()
+
+    assert "| `--slow` | text | N/A | `(dynamic)` |" in output
+    assert "| `--failing` | text | N/A | `(dynamic)` |" in output
+
+    # Callables that timed out keep running, and their result is used by the next build.
+    reset_build_caches()
+    output = "\n".join(make_command_docs("cli", cli, style="table", evaluate_defaults=1))
+    assert "| `--slow` | text | N/A | `late` |" in output
+
+
+def test_evaluate_defaults_shared_timeout():
+    """
+    A callable shared by many commands runs in a single thread, and only makes the first one wait.
+    """
+    calls = []
+    done = threading.Event()
+
+    def slow():
+        calls.append(True)
+        done.wait(5)
+
+    @click.group()
+    def cli():
+        """CLI."""
+
+    for i in range(10):
+        cli.command(f"command-{i}")(click.option("--region", default=slow)(lambda region: None))
+
+    try:
+        start = time.perf_counter()
+        output = "\n".join(make_command_docs("cli", cli, style="table", evaluate_defaults=0.2))
+        elapsed = time.perf_counter() - start
+        threads = [
+            thread for thread in threading.enumerate() if thread.name == "mkdocs-click-default"
+        ]
+    finally:
+        done.set()
+
+    assert output.count("| `--region` | text | N/A | `(dynamic)` |") == 10
+    assert calls == [True]
+    assert elapsed < 1
+    assert len(threads) == 1
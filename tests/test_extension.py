@@ -1,6 +1,10 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under the Apache license (see LICENSE)
+import os
+import re
+import sys
+import time
 from pathlib import Path
 from textwrap import dedent
 
@@ -8,6 +12,9 @@ import pytest
 from markdown import Markdown
 
 import mkdocs_click
+import mkdocs_click._extension
+from mkdocs_click._cache import LRUCache
+from mkdocs_click._docs import reset_build_caches
 
 EXPECTED = (Path(__file__).parent / "app" / "expected.md").read_text()
 EXPECTED_ENHANCED = (Path(__file__).parent / "app" / "expected-enhanced.md").read_text()
@@ -187,3 +194,469 @@ def test_enhanced_titles_with_subcommand(command, expected_name):
     expected = EXPECTED_SUB_ENHANCED.replace("cli", expected_name)
 
     assert md.convert(source) == md.convert(expected)
+
+
+INDEX = dedent(
+    """
+    **Commands**
+
+    - *cli*: Main entrypoint for this dummy program
+    - *group*: Main entrypoint for this dummy program
+
+    """
+).lstrip()
+
+
+def test_multiple_commands():
+    """
+    The :commands: attribute documents several commands after a generated index.
+    """
+    md = Markdown(extensions=[mkdocs_click.makeExtension()])
+
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :commands: tests.app.cli:cli, tests.app.cli:group_named
+        """
+    )
+
+    expected = f"{INDEX}{EXPECTED}\n{EXPECTED.replace('cli', 'group')}"
+
+    assert md.convert(source) == md.convert(expected)
+
+
+def test_manifest(tmp_path):
+    """
+    The :manifest: attribute documents every command listed in a manifest file.
+    """
+    manifest = tmp_path / "manifest.yml"
+    manifest.write_text(
+        dedent(
+            """
+            cli:
+              - module: tests.app.cli
+                command: cli
+              - module: tests.app.cli
+                command: group
+            """
+        )
+    )
+
+    md = Markdown(extensions=[mkdocs_click.makeExtension()])
+
+    source = dedent(
+        f"""
+        ::: mkdocs-click
+            :manifest: {manifest}
+            :depth: 1
+        """
+    )
+
+    expected = f"{INDEX}{EXPECTED}\n{EXPECTED.replace('cli', 'group')}".replace("# ", "## ")
+
+    assert md.convert(source) == md.convert(expected)
+
+
+def test_templates(tmp_path):
+    """
+    Sections are rendered from the templates of the :templates: directory, or of the extension's.
+    """
+    (tmp_path / "title.md").write_text("$level Command `$command_path`\n")
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :module: tests.app.cli
+            :command: cli
+        """
+    )
+    expected = EXPECTED
+    for title, command_path in [
+        ("# cli", "cli"),
+        ("## bar", "cli bar"),
+        ("### hello", "cli bar hello"),
+        ("## foo", "cli foo"),
+    ]:
+        level = title.split()[0]
+        expected = expected.replace(f"{title}\n", f"{level} Command `{command_path}`\n")
+
+    md = Markdown(extensions=[mkdocs_click.makeExtension(templates=str(tmp_path))])
+    assert md.convert(source) == md.convert(expected)
+
+    md = Markdown(extensions=[mkdocs_click.makeExtension()])
+    assert md.convert(f"{source}    :templates: {tmp_path}\n") == md.convert(expected)
+
+
+def test_lazy_group_rebuild(lazy_cli):
+    """
+    The sub-commands of lazy groups are resolved once for all pages of a build, and again by the next build.
+    """
+    source = "::: mkdocs-click\n    :module: mkdocs_click_lazy_cli\n    :command: cli\n"
+    reset_build_caches()
+    for _ in range(3):
+        assert "Command a." in Markdown(extensions=[mkdocs_click.makeExtension()]).convert(source)
+    assert lazy_cli.CALLS == ["list_commands", "a"]
+
+    lazy_cli.REGISTRY[:] = ["b"]
+    reset_build_caches()
+    html = Markdown(extensions=[mkdocs_click.makeExtension()]).convert(source)
+    assert "Command b." in html
+    assert "Command a." not in html
+
+
+def test_lazy_group_rebuild_unload_modules(tmp_path, monkeypatch):
+    """
+    Blocks whose modules were unloaded are reused within a build, and lazy groups resolved again by the next.
+    """
+    plugins = tmp_path / "plugins"
+    plugins.mkdir()
+    (plugins / "a").touch()
+    (tmp_path / "mkdocs_click_scanning_cli.py").write_text(
+        dedent(
+            f"""
+            import os
+
+            import click
+
+
+            class ScanningGroup(click.Group):
+                def list_commands(self, ctx):
+                    return sorted(os.listdir({str(plugins)!r}))
+
+                def get_command(self, ctx, name):
+                    return click.Command(name, help=f"Command {{name}}.")
+
+
+            cli = ScanningGroup("cli")
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    source = "::: mkdocs-click\n    :module: mkdocs_click_scanning_cli\n    :command: cli\n"
+
+    def convert():
+        return Markdown(extensions=[mkdocs_click.makeExtension(unload_modules=True)]).convert(
+            source
+        )
+
+    reset_build_caches()
+    assert "Command a." in convert()
+    assert "mkdocs_click_scanning_cli" not in sys.modules
+
+    (plugins / "b").touch()
+    assert "Command b." not in convert()
+
+    reset_build_caches()
+    assert "Command b." in convert()
+
+
+def test_evaluate_defaults(tmp_path, monkeypatch):
+    """
+    Callable defaults are documented by their value with :evaluate_defaults:, or the extension's.
+    """
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "mkdocs_click_defaults_cli.py").write_text(
+        dedent(
+            """
+            import click
+
+            @click.command()
+            @click.option("--user", default=lambda: "alice")
+            def cli(user):
+                \"\"\"CLI.\"\"\"
+            """
+        )
+    )
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :module: mkdocs_click_defaults_cli
+            :command: cli
+            :style: table
+        """
+    )
+
+    try:
+        md = Markdown(extensions=["tables", mkdocs_click.makeExtension(evaluate_defaults=0.5)])
+        assert "<code>alice</code>" in md.convert(source)
+
+        md = Markdown(extensions=["tables", mkdocs_click.makeExtension()])
+        assert "alice" not in md.convert(source)
+        assert "<code>alice</code>" in md.convert(f"{source}    :evaluate_defaults: 0.5\n")
+    finally:
+        sys.modules.pop("mkdocs_click_defaults_cli", None)
+
+
+@pytest.fixture
+def distribution(tmp_path, monkeypatch):
+    """An installed distribution with console scripts, only some of which are Click commands."""
+    dist_info = tmp_path / "mkdocs_click_scripts-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: mkdocs-click-scripts\nVersion: 1.0\n"
+    )
+    (dist_info / "entry_points.txt").write_text(
+        dedent(
+            """
+            [console_scripts]
+            group = tests.app.cli:group
+            cli = tests.app.cli:cli
+            not-click = os:getcwd
+
+            [mkdocs.plugins]
+            other = tests.app.cli:group_named
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(mkdocs_click._extension, "SCRIPT_CACHE", LRUCache(maxsize=16))
+    return "mkdocs-click-scripts"
+
+
+def test_distribution(distribution, monkeypatch):
+    """
+    The :distribution: attribute documents the Click commands among the console scripts of a distribution.
+    """
+    md = Markdown(extensions=[mkdocs_click.makeExtension()])
+
+    source = dedent(
+        f"""
+        ::: mkdocs-click
+            :distribution: {distribution}
+        """
+    )
+
+    expected = f"{INDEX}{EXPECTED}\n{EXPECTED.replace('cli', 'group')}"
+
+    assert md.convert(source) == md.convert(expected)
+
+    # Click commands are rendered from the cache afterwards, without worker processes.
+    monkeypatch.setattr(mkdocs_click._extension, "ProcessPoolExecutor", None)
+    assert md.convert(source) == md.convert(expected)
+
+
+def test_distribution_unique_anchors(distribution):
+    """
+    Scripts are rendered again when other blocks of the page already use their anchors.
+    """
+
+    def convert(block):
+        md = Markdown(extensions=["attr_list"])
+        md.registerExtensions([mkdocs_click.makeExtension()], {})
+        source = dedent(
+            """
+            ::: mkdocs-click
+                :module: tests.app.cli
+                :command: cli
+                :list_subcommands: True
+
+            """
+        )
+        return md.convert(source + block)
+
+    options = "    :list_subcommands: True\n"
+    assert convert(f"::: mkdocs-click\n    :distribution: {distribution}\n{options}") == convert(
+        f"::: mkdocs-click\n    :commands: tests.app.cli:cli, tests.app.cli:group\n{options}"
+    )
+
+
+def test_distribution_not_installed():
+    md = Markdown(extensions=[mkdocs_click.makeExtension()])
+
+    with pytest.raises(mkdocs_click.MkDocsClickException, match="is not installed"):
+        md.convert("::: mkdocs-click\n    :distribution: mkdocs-click-not-installed\n")
+
+
+def test_enhanced_titles_unique_anchors():
+    """
+    Anchors stay unique when several blocks of a page document overlapping command trees.
+    """
+    md = Markdown(extensions=["attr_list"])
+    md.registerExtensions([mkdocs_click.makeExtension()], {})
+
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :module: tests.app.cli
+            :command: cli
+            :list_subcommands: True
+
+        ::: mkdocs-click
+            :module: tests.app.cli
+            :command: cli
+            :list_subcommands: True
+        """
+    )
+
+    second = re.sub(r"#(cli[\w-]*)", r"#\1_1", EXPECTED_SUB_ENHANCED)
+    expected = f"{EXPECTED_SUB_ENHANCED}\n{second}"
+
+    assert md.convert(source) == md.convert(expected)
+
+
+@pytest.mark.parametrize("style", ["plain", "table"])
+def test_html(style):
+    """
+    With the :html: attribute, sections are rendered to HTML as Python-Markdown would render them.
+    """
+    md = Markdown(extensions=["attr_list", "fenced_code", "tables", "toc"])
+    md.registerExtensions([mkdocs_click.makeExtension()], {})
+
+    source = dedent(
+        f"""
+        ::: mkdocs-click
+            :module: tests.app.cli
+            :command: cli
+            :style: {style}
+            :list_subcommands: True
+        """
+    )
+    expected = md.convert(source)
+    toc_tokens = md.toc_tokens
+
+    source += "    :html: True\n"
+    assert md.convert(source) == expected
+    assert md.toc_tokens == toc_tokens
+
+
+@pytest.mark.parametrize("unload_dependencies", [False, True])
+def test_unload_modules(tmp_path, monkeypatch, unload_dependencies):
+    """
+    With `unload_modules`, modules imported for a page are unloaded, and their docs are reused until
+    their source changes. With `unload_dependencies`, modules of other packages are unloaded too.
+    """
+    package = tmp_path / "mkdocs_click_unload_app"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "helpers.py").write_text("HELP = 'Say hello.'\n")
+    (tmp_path / "mkdocs_click_unload_dependency.py").write_text("")
+    cli_file = package / "cli.py"
+    imports = tmp_path / "imports.log"
+    cli_file.write_text(
+        dedent(
+            f"""
+            import click
+            import colorsys
+            import mkdocs_click_unload_dependency
+
+            from .helpers import HELP
+
+            with open({str(imports)!r}, "a") as f:
+                f.write("imported\\n")
+
+            @click.command(help=HELP)
+            def hello():
+                pass
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    monkeypatch.setattr(mkdocs_click._extension, "BLOCK_CACHE", LRUCache(maxsize=16))
+
+    md = Markdown(
+        extensions=[
+            mkdocs_click.makeExtension(unload_modules=True, unload_dependencies=unload_dependencies)
+        ]
+    )
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :module: mkdocs_click_unload_app.cli
+            :command: hello
+        """
+    )
+
+    html = md.convert(source)
+    assert "Say hello." in html
+    assert not any(name.startswith("mkdocs_click_unload_app") for name in sys.modules)
+    # The standard library stays loaded, and other packages unless `unload_dependencies`.
+    assert "colorsys" in sys.modules
+    dependency = sys.modules.pop("mkdocs_click_unload_dependency", None)
+    assert (dependency is None) is unload_dependencies
+
+    assert md.convert(source) == html
+    assert imports.read_text() == "imported\n"
+
+    cli_file.write_text(cli_file.read_text().replace("help=HELP", "help='Say goodbye.'"))
+    os.utime(cli_file, ns=(0, 0))
+
+    assert "Say goodbye." in md.convert(source)
+    assert imports.read_text() == "imported\nimported\n"
+    assert "mkdocs_click_unload_app.cli" not in sys.modules
+    sys.modules.pop("mkdocs_click_unload_dependency", None)
+
+
+@pytest.mark.parametrize(
+    "config, environ, argv, draft",
+    [
+        pytest.param({}, None, ["mkdocs", "serve"], False, id="default"),
+        pytest.param({"draft": True}, None, ["mkdocs", "build"], True, id="on"),
+        pytest.param({"draft": "serve"}, None, ["mkdocs", "serve"], True, id="serve"),
+        pytest.param({"draft": "serve"}, None, ["mkdocs", "build"], False, id="build"),
+        pytest.param({}, "1", ["mkdocs", "build"], True, id="environ-on"),
+        pytest.param({"draft": "serve"}, "false", ["mkdocs", "serve"], False, id="environ-off"),
+    ],
+)
+def test_draft(monkeypatch, config, environ, argv, draft):
+    """
+    Draft mode is enabled by the `draft` setting, when serving, or by the MKDOCS_CLICK_DRAFT variable.
+    """
+    if environ is None:
+        monkeypatch.delenv("MKDOCS_CLICK_DRAFT", raising=False)
+    else:
+        monkeypatch.setenv("MKDOCS_CLICK_DRAFT", environ)
+    monkeypatch.setattr(sys, "argv", argv)
+
+    md = Markdown(extensions=[mkdocs_click.makeExtension(draft_depth=0, **config)])
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :module: tests.app.cli
+            :command: cli
+        """
+    )
+    html = md.convert(source)
+
+    assert ("Options:" not in html) == draft
+    assert ("<h2>" not in html) == draft
+
+
+def test_warmup(tmp_path, monkeypatch):
+    """
+    Commands listed in `warmup` are imported in the background, and blocks wait for that import.
+    """
+    imports = tmp_path / "imports.log"
+    (tmp_path / "mkdocs_click_warmup_app.py").write_text(
+        dedent(
+            f"""
+            import threading
+            import time
+
+            import click
+
+            time.sleep(0.2)
+            with open({str(imports)!r}, "a") as f:
+                f.write(threading.current_thread().name + "\\n")
+
+            @click.command()
+            def hello():
+                '''Say hello.'''
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    md = Markdown(extensions=[mkdocs_click.makeExtension(warmup=["mkdocs_click_warmup_app:hello"])])
+    # Let the import start, it is still in progress when the block is rendered.
+    time.sleep(0.05)
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :module: mkdocs_click_warmup_app
+            :command: hello
+        """
+    )
+
+    assert "Say hello." in md.convert(source)
+    assert imports.read_text() == "mkdocs-click-warmup-mkdocs_click_warmup_app\n"
+    sys.modules.pop("mkdocs_click_warmup_app", None)
@@ -1,12 +1,15 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under the Apache license (see LICENSE)
+import sys
 from contextlib import nullcontext
 
 import pytest
 
+from mkdocs_click._docs import make_command_docs
 from mkdocs_click._exceptions import MkDocsClickException
 from mkdocs_click._loader import load_command
+from mkdocs_click._static import StaticLoadError, _Analyzer, load_command_statically
 
 
 @pytest.mark.parametrize(
@@ -23,3 +26,92 @@ from mkdocs_click._loader import load_command
 def test_load_command(module: str, command: str, exc):
     with pytest.raises(exc) if exc is not None else nullcontext():
         load_command(module, command)
+
+
+def test_load_command_static():
+    """
+    Commands can be loaded without importing their module.
+    """
+    command = load_command("tests.app.static", "cli", static=True)
+    assert "tests.app.static" not in sys.modules
+
+    output = "\n".join(make_command_docs("cli", command, style="table"))
+    assert "## hello" in output
+    assert "## run" in output
+    assert "Run the thing.\n\nMore details." in output
+    assert "| `--level` | integer range (between `0` and `10`) | N/A | `3` |" in output
+    # Context settings are kept, the order of help option names is not deterministic.
+    assert "`-h`" in output
+
+
+@pytest.mark.parametrize("name", ["cli", "cli_named", "bar", "hello"])
+def test_load_command_static_same_docs(name):
+    """
+    Statically loaded commands are documented the same way as imported ones.
+    """
+    command = load_command_statically("tests.app.cli", name)
+    expected = load_command("tests.app.cli", name)
+
+    for style in ("plain", "table"):
+        output = list(make_command_docs(name, command, style=style, show_hidden=True))
+        assert output == list(make_command_docs(name, expected, style=style, show_hidden=True))
+
+
+def test_load_command_static_unsupported():
+    """
+    Groups that could not be fully analyzed fall back to an import.
+    """
+    with pytest.raises(StaticLoadError):
+        load_command_statically("tests.app.static", "plugins")
+
+    with pytest.raises(ImportError):
+        load_command("tests.app.static", "plugins", static=True)
+
+
+@pytest.mark.parametrize("name", ["registered", "extra", "configured", "chained"])
+def test_load_command_static_unknown_calls(name):
+    """
+    Commands that other calls may change fall back to an import.
+    """
+    with pytest.raises(StaticLoadError):
+        load_command_statically("tests.app.static", name)
+
+
+def test_load_command_static_attribute_chain():
+    """
+    Commands of other modules that calls reach through attributes fall back to an import.
+    """
+    analyzer = _Analyzer("tests")
+    analyzer.lookup("tests.app.static", "cli")
+    with pytest.raises(StaticLoadError):
+        analyzer.lookup("tests.app.cli", "cli")
+
+
+@pytest.mark.parametrize(
+    "statement", ["from . import commands", "import mkdocs_click_side_effects.commands"]
+)
+def test_load_command_static_side_effect_import(statement, tmp_path, monkeypatch):
+    """
+    Modules of the package that register sub-commands when imported are analyzed, even if unused.
+    """
+    package = tmp_path / "mkdocs_click_side_effects"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "cli.py").write_text(
+        f"import click\n\n\n@click.group()\ndef cli():\n    pass\n\n\n{statement}  # noqa: F401\n"
+    )
+    commands = package / "commands.py"
+    commands.write_text(
+        "from .cli import cli\n\n\n@cli.command()\ndef sub():\n    '''A sub-command.'''\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    command = load_command_statically("mkdocs_click_side_effects.cli", "cli")
+    assert list(command.commands) == ["sub"]
+    assert "mkdocs_click_side_effects" not in sys.modules
+
+    commands.write_text(
+        "from .cli import cli\n\n\n@cli.command()\n@unknown\ndef sub():\n    '''A sub-command.'''\n"
+    )
+    with pytest.raises(StaticLoadError):
+        load_command_statically("mkdocs_click_side_effects.cli", "cli")
@@ -0,0 +1,201 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+import sys
+
+import pytest
+
+pytest.importorskip("mkdocs", minversion="1.6")
+
+from markdown import Markdown
+from mkdocs.config.defaults import MkDocsConfig
+from mkdocs.exceptions import PluginError
+from mkdocs.structure.files import Files, get_files
+from mkdocs.structure.nav import get_navigation
+
+import mkdocs_click
+from mkdocs_click._plugin import MKClickPlugin
+
+
+def _load_config(tmp_path, **options):
+    (tmp_path / "docs").mkdir(exist_ok=True)
+    config = MkDocsConfig()
+    config.load_dict(
+        {
+            "site_name": "Test",
+            "docs_dir": str(tmp_path / "docs"),
+            "site_dir": str(tmp_path / "site"),
+            **options,
+        }
+    )
+    errors, _ = config.validate()
+    assert not errors
+    return config
+
+
+def _generate(config, files, **options):
+    plugin = MKClickPlugin()
+    errors, _ = plugin.load_config(
+        {"commands": [{"module": "tests.app.cli", "command": "cli", **options}]}
+    )
+    assert not errors
+
+    config.plugins["mkdocs-click"] = plugin
+    return config.plugins.on_files(files, config=config)
+
+
+def test_plugin_pages(tmp_path):
+    config = _load_config(tmp_path, markdown_extensions=["attr_list"])
+    files = _generate(config, Files([]), path="reference/cli/")
+
+    # Hidden commands get no page.
+    pages = {file.src_uri: file.content_string for file in files}
+    assert sorted(pages) == [
+        "reference/cli/bar/hello/index.md",
+        "reference/cli/bar/index.md",
+        "reference/cli/foo/index.md",
+        "reference/cli/index.md",
+    ]
+
+    root = pages["reference/cli/index.md"]
+    assert root.startswith("# cli { #cli data-toc-label='cli' }")
+    assert "- *[bar](bar/index.md)*: The bar command" in root
+    assert "- *[foo](foo/index.md)*: *No description was provided with this command.*" in root
+    assert "hidden" not in root
+    # Sub-commands are only documented on their own page.
+    assert "hello" not in root
+
+    bar = pages["reference/cli/bar/index.md"]
+    assert bar.startswith("# cli bar { #cli-bar data-toc-label='bar' }")
+    assert "[hello](hello/index.md)" in bar
+    assert "cli bar hello [OPTIONS]" in pages["reference/cli/bar/hello/index.md"]
+
+
+def test_plugin_nav(tmp_path):
+    config = _load_config(
+        tmp_path, nav=["index.md", {"Reference": [{"CLI": "cli/index.md"}]}, "about.md"]
+    )
+    (tmp_path / "docs" / "index.md").write_text("# Home")
+    (tmp_path / "docs" / "about.md").write_text("# About")
+    files = _generate(config, get_files(config), show_hidden=True)
+
+    assert config.nav == [
+        "index.md",
+        {
+            "Reference": [
+                {
+                    "CLI": [
+                        "cli/index.md",
+                        {
+                            "bar": [
+                                "cli/bar/index.md",
+                                {"hello": "cli/bar/hello/index.md"},
+                            ]
+                        },
+                        {"foo": "cli/foo/index.md"},
+                        {"hidden": "cli/hidden/index.md"},
+                    ]
+                }
+            ]
+        },
+        "about.md",
+    ]
+    assert len(get_navigation(files, config).pages) == 7
+
+
+def test_plugin_nav_missing(tmp_path):
+    config = _load_config(tmp_path, nav=["index.md"])
+    _generate(config, Files([]))
+
+    assert config.nav[0] == "index.md"
+    assert list(config.nav[1]) == ["cli"]
+
+
+def test_plugin_conflict(tmp_path):
+    config = _load_config(tmp_path)
+    (tmp_path / "docs" / "cli" / "foo").mkdir(parents=True)
+    (tmp_path / "docs" / "cli" / "foo" / "index.md").write_text("# Foo")
+
+    with pytest.raises(PluginError, match="cli/foo/index.md"):
+        _generate(config, get_files(config))
+
+
+def test_plugin_fragments(tmp_path):
+    config = _load_config(tmp_path, markdown_extensions=["attr_list", "fenced_code"])
+    files = _generate(config, Files([]), fragment_depth=0)
+
+    files = {file.src_uri: file.content_string for file in files}
+    assert sorted(files) == [
+        "assets/mkdocs-click/fragments.js",
+        "cli/bar.html",
+        "cli/foo.html",
+        "cli/index.md",
+    ]
+    assert config.extra_javascript == ["assets/mkdocs-click/fragments.js"]
+
+    root = files["cli/index.md"]
+    assert '<details class="mkdocs-click-fragment" data-mkdocs-click-fragment="bar.html">' in root
+    assert "<summary><em>bar</em>: The bar command</summary>" in root
+    assert "hello" not in root
+
+    # Fragments document the whole subtree, with anchors unique on the page.
+    bar = files["cli/bar.html"]
+    assert bar.startswith('<h2 id="cli-bar">cli bar</h2>')
+    assert '<h3 id="cli-bar-hello">cli bar hello</h3>' in bar
+    assert '<code class="language-text">cli bar hello [OPTIONS]' in bar
+
+
+def test_plugin_fragment_depth(tmp_path):
+    config = _load_config(tmp_path)
+    files = _generate(config, Files([]), fragment_depth=1)
+
+    assert sorted(file.src_uri for file in files) == [
+        "assets/mkdocs-click/fragments.js",
+        "cli/bar/hello.html",
+        "cli/bar/index.md",
+        "cli/foo/index.md",
+        "cli/index.md",
+    ]
+    assert "[bar](bar/index.md)" in files.get_file_from_path("cli/index.md").content_string
+
+
+def test_plugin_build_boundary(tmp_path, lazy_cli):
+    """
+    Lazy groups are resolved once for all pages of a build, and again for the next build.
+    """
+    config = _load_config(tmp_path)
+    plugin = MKClickPlugin()
+    source = "::: mkdocs-click\n    :module: mkdocs_click_lazy_cli\n    :command: cli\n"
+
+    for _ in range(2):
+        plugin.on_pre_build(config=config)
+        for _ in range(3):
+            Markdown(extensions=[mkdocs_click.makeExtension()]).convert(source)
+
+    assert lazy_cli.CALLS == ["list_commands", "a"] * 2
+
+
+def test_plugin_unload_modules(tmp_path, monkeypatch):
+    """
+    With the plugin, modules are unloaded once the build is done, so that commands documented on several
+    pages are imported once per build.
+    """
+    monkeypatch.syspath_prepend(str(tmp_path))
+    imports = tmp_path / "imports.log"
+    (tmp_path / "mkdocs_click_plugin_unload.py").write_text(
+        f"import click\n\nwith open({str(imports)!r}, 'a') as f:\n    f.write('imported\\n')\n\n"
+        "@click.command()\ndef hello():\n    'Say hello.'\n"
+    )
+    config = _load_config(tmp_path)
+    plugin = MKClickPlugin()
+    source = "::: mkdocs-click\n    :module: mkdocs_click_plugin_unload\n    :command: hello\n"
+
+    plugin.on_pre_build(config=config)
+    for style in ("plain", "table"):
+        md = Markdown(extensions=[mkdocs_click.makeExtension(unload_modules=True)])
+        assert "Say hello." in md.convert(f"{source}    :style: {style}\n")
+        assert "mkdocs_click_plugin_unload" in sys.modules
+
+    plugin.on_post_build(config=config)
+    assert "mkdocs_click_plugin_unload" not in sys.modules
+    assert imports.read_text() == "imported\n"
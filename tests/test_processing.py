@@ -16,13 +16,14 @@ foo
 \t:option3:
     :option4:\x20
     :option5: 1
+    :option6: module:command
 bar
 """.strip()
 
     expected = """
 # Some content
 foo
-{'option1': 'value1', 'optiøn2': 'val ue2', 'option3': '', 'option4': '', 'option5': '1'}
+{'option1': 'value1', 'optiøn2': 'val ue2', 'option3': '', 'option4': '', 'option5': '1', 'option6': 'module:command'}
 bar
 """.strip()
 
@@ -0,0 +1,230 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+import json
+import random
+from textwrap import dedent
+
+import click
+import pytest
+from click.testing import CliRunner
+from markdown import Markdown
+
+import mkdocs_click
+from mkdocs_click._cli import cli as mkdocs_click_cli
+from mkdocs_click._docs import SUBTREE_CACHE, make_command_docs
+from mkdocs_click._exceptions import MkDocsClickException
+from mkdocs_click._snapshots import find_snapshots, load_snapshot, make_changes_index, make_snapshot
+from tests.app.cli import cli
+from tests.synthetic import make_command, make_options, write_source
+
+
+def _write_snapshot(path, prog_name, command):
+    path.write_text(json.dumps(make_snapshot(prog_name, command)))
+    return path
+
+
+def _convert(source):
+    md = Markdown(extensions=["attr_list", mkdocs_click.makeExtension()])
+    return md.convert(source)
+
+
+@click.group()
+def old_cli():
+    """Old CLI."""
+
+
+@old_cli.command()
+@click.option("--name", help="The name.")
+@click.option("--count", type=int, default=1)
+def hello(name, count):
+    """Say hello."""
+
+
+@old_cli.command()
+def bye():
+    """Say goodbye."""
+
+
+@click.group()
+def new_cli():
+    """New CLI."""
+
+
+@new_cli.command()
+@click.option("--name", help="The name to greet.")
+@click.option("--shout/--no-shout")
+@click.argument("greeting", required=False)
+def hello_new(name, shout, greeting):
+    """Say hello."""
+
+
+hello_new.name = "hello"
+
+
+@new_cli.command()
+def init():
+    """Initialize."""
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    directory = tmp_path / "snapshots"
+    directory.mkdir()
+    _write_snapshot(directory / "1.9.json", "tool", old_cli)
+    _write_snapshot(directory / "1.10.json", "tool", new_cli)
+    _write_snapshot(directory / "1.11.json", "tool", new_cli)
+    return directory
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_snapshot_round_trip(seed, tmp_path, import_source):
+    """
+    Commands rebuilt from snapshots are documented the same as the original commands.
+    """
+    rng = random.Random(seed)
+    command = (
+        cli
+        if seed == 0
+        else import_source(
+            f"mkdocs_click_snapshot_{seed}", write_source(make_command(rng, "cli", 0, [0]))
+        ).cli
+    )
+    prog_name, rebuilt = load_snapshot(_write_snapshot(tmp_path / "cli.json", "cli", command))
+
+    assert prog_name == "cli"
+    for options in [{}, *(make_options(rng) for _ in range(4))]:
+        options = {**options, "style": "plain"}
+        assert list(make_command_docs("cli", rebuilt, **options)) == list(
+            make_command_docs("cli", command, **options)
+        )
+
+
+def test_version(snapshots):
+    source = dedent(
+        """
+        ::: mkdocs-click
+            :snapshots: {directory}
+            :version: 1.9
+            :depth: 1
+
+        ::: mkdocs-click
+            :snapshots: {directory}
+            :version: 1.10
+            :depth: 1
+        """
+    ).format(directory=snapshots)
+
+    html = _convert(source)
+    assert 'id="tool">tool</h2>' in html
+    assert 'id="tool_1">tool</h2>' in html
+    assert "Old CLI." in html
+    assert "New CLI." in html
+    assert "--shout" in html
+
+
+def test_find_snapshots_order(tmp_path):
+    """
+    Versions are sorted as in PEP 440: development and pre-releases before their release, post-releases
+    and local versions after it.
+    """
+    versions = [
+        "0.9",
+        "1.0.0.dev1",
+        "1.0.0a1",
+        "1.0.0b2",
+        "1.0.0rc1",
+        "1.0.0",
+        "1.0.0+local",
+        "1.0.0.post1",
+        "1.0.1",
+        "1.1.0b2",
+        "1.1.0",
+        "1.10.0",
+    ]
+    for version in versions:
+        (tmp_path / f"{version}.json").write_text("{}")
+
+    assert [version for version, _ in find_snapshots(tmp_path)] == versions
+
+
+def test_version_shares_cache(snapshots):
+    """
+    The parts of command trees that did not change between versions are only rendered once.
+    """
+    SUBTREE_CACHE.clear()
+    for version in ["1.10", "1.11"]:
+        _convert(f"::: mkdocs-click\n    :snapshots: {snapshots}\n    :version: {version}\n")
+        if version == "1.10":
+            size = len(SUBTREE_CACHE)
+
+    assert len(SUBTREE_CACHE) == size
+
+
+def test_changes(snapshots):
+    assert list(make_changes_index(snapshots, depth=1)) == [
+        "## 1.11",
+        "",
+        "No changes to the command line interface.",
+        "",
+        "## 1.10",
+        "",
+        "- Added `tool init`",
+        "- Removed `tool bye`",
+        "- Changed `tool`: changed description",
+        "- Changed `tool hello`: added `--shout`, `GREETING`; removed `--count`; changed `--name`",
+        "",
+    ]
+
+
+def test_changes_block(snapshots):
+    html = _convert(f"::: mkdocs-click\n    :snapshots: {snapshots}\n    :changes: true\n")
+    assert "<h1>1.11</h1>" in html
+    assert "Added <code>tool init</code>" in html
+
+
+def test_errors(snapshots, tmp_path):
+    with pytest.raises(MkDocsClickException, match="Option 'version' or 'changes' is required"):
+        _convert(f"::: mkdocs-click\n    :snapshots: {snapshots}\n")
+
+    with pytest.raises(MkDocsClickException, match="available versions: 1.9, 1.10, 1.11"):
+        _convert(f"::: mkdocs-click\n    :snapshots: {snapshots}\n    :version: 2.0\n")
+
+    invalid = tmp_path / "invalid.json"
+    invalid.write_text('{"format": 0}')
+    with pytest.raises(MkDocsClickException, match="incompatible version"):
+        load_snapshot(invalid)
+
+
+def test_cli_snapshot(tmp_path):
+    output = tmp_path / "cli.json"
+    result = CliRunner().invoke(
+        mkdocs_click_cli, ["snapshot", "tests.app.cli:cli", "--prog-name", "app", "-o", str(output)]
+    )
+    assert result.exit_code == 0, result.output
+
+    prog_name, command = load_snapshot(output)
+    assert prog_name == "app"
+    assert list(make_command_docs("app", command)) == list(make_command_docs("app", cli))
+
+
+def test_cli_render_versions(snapshots, tmp_path):
+    """
+    Versions are rendered in parallel from a manifest.
+    """
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"snapshots": str(snapshots), "version": version, "output": str(tmp_path / version)}
+                for version in ["1.9", "1.10"]
+            ]
+        )
+    )
+
+    result = CliRunner().invoke(
+        mkdocs_click_cli, ["render", "--manifest", str(manifest), "-j", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Old CLI." in (tmp_path / "1.9").read_text()
+    assert "New CLI." in (tmp_path / "1.10").read_text()
@@ -0,0 +1,129 @@
+# (C) Datadog, Inc. 2020-present
+# All rights reserved
+# Licensed under the Apache license (see LICENSE)
+"""
+Check that memory does not grow over repeated builds, as in a long `mkdocs serve` session.
+
+These tests are slow, and only run with `-m soak`, or when `MKDOCS_CLICK_SOAK_ITERATIONS` is set to soak for
+longer than the default number of iterations.
+"""
+
+import gc
+import os
+import random
+import sys
+import tracemalloc
+import types
+from pathlib import Path
+from textwrap import dedent
+
+import click
+import pytest
+from markdown import Markdown
+
+import mkdocs_click
+from tests.synthetic import make_command, write_source
+
+# Rebuilds cycle through every version of every synthetic CLI, so that memory is compared between
+# rebuilds which have the same modules loaded.
+CYCLE = 6
+ITERATIONS = int(os.environ.get("MKDOCS_CLICK_SOAK_ITERATIONS", "12")) // CYCLE * CYCLE or CYCLE
+WARMUP = CYCLE
+
+# Caches are bounded, and fill up during the warm-up: any growth after that is retained by mistake.
+MAX_GROWTH = 256 * 1024
+
+PACKAGE = str(Path(mkdocs_click.__file__).parent)
+
+
+def _count_live_objects():
+    """Count the objects that must not outlive a conversion: contexts and the generators of mkdocs-click."""
+    gc.collect()
+    contexts = generators = 0
+    for obj in gc.get_objects():
+        if isinstance(obj, click.Context):
+            contexts += 1
+        elif isinstance(obj, types.GeneratorType) and obj.gi_code.co_filename.startswith(PACKAGE):
+            generators += 1
+    return contexts, generators
+
+
+def _retained_size(snapshot, baseline):
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return sum(stat.size_diff for stat in snapshot.compare_to(baseline, "filename"))
+
+
+@pytest.fixture
+def synthetic_clis(tmp_path, monkeypatch):
+    """Write modules with synthetic command trees, each in two versions to switch between."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    versions = {}
+    for seed in range(CYCLE // 2):
+        name = f"mkdocs_click_soak_{seed}"
+        versions[name] = [
+            write_source(make_command(random.Random(seed + offset), "cli", 0, [0]))
+            for offset in (0, 100)
+        ]
+        (tmp_path / f"{name}.py").write_text(versions[name][0])
+
+    yield tmp_path, versions
+
+    for name in versions:
+        sys.modules.pop(name, None)
+
+
+@pytest.mark.soak
+@pytest.mark.parametrize("unload_modules", [False, True])
+def test_soak(synthetic_clis, unload_modules):
+    """
+    Rebuilds of the same pages, while CLIs are edited back and forth, retain no contexts nor generators,
+    and memory stops growing once caches are warm.
+    """
+    tmp_path, versions = synthetic_clis
+    blocks = ["tests.app.cli", *versions]
+    source = "".join(
+        dedent(
+            f"""
+            ::: mkdocs-click
+                :module: {module}
+                :command: cli
+                :style: table
+                :list_subcommands: True
+            """
+        )
+        for module in blocks
+    )
+
+    def rebuild(iteration):
+        # Every other rebuild sees the second version of a CLI, which is then reloaded.
+        name = list(versions)[iteration % len(versions)]
+        (tmp_path / f"{name}.py").write_text(versions[name][iteration % 2])
+        if not unload_modules:
+            sys.modules.pop(name, None)
+
+        # MkDocs creates a new Markdown instance for every page of every build.
+        md = Markdown(
+            extensions=["attr_list", mkdocs_click.makeExtension(unload_modules=unload_modules)]
+        )
+        assert "<h1" in md.convert(source)
+
+    tracemalloc.start()
+    try:
+        for iteration in range(WARMUP):
+            rebuild(iteration)
+
+        assert _count_live_objects() == (0, 0)
+        baseline = tracemalloc.take_snapshot()
+        modules = set(sys.modules)
+
+        for iteration in range(WARMUP, WARMUP + ITERATIONS):
+            rebuild(iteration)
+            assert _count_live_objects() == (0, 0), f"iteration {iteration}"
+
+        growth = _retained_size(tracemalloc.take_snapshot(), baseline)
+    finally:
+        tracemalloc.stop()
+
+    assert set(sys.modules) == modules
+
+    assert growth < MAX_GROWTH, f"{growth} bytes retained over {ITERATIONS} rebuilds"